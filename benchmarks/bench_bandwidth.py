@@ -0,0 +1,140 @@
+"""
+Benchmark bandwidth and latency of big list pages through the store client.
+
+Fetches PAGES pages of 100 orders three ways through server.py's tenant session:
+  identity:    Accept-Encoding: identity (no compression)
+  compressed:  the client's negotiated encodings (gzip, deflate, br if installed)
+  revalidated: woo_get() on expired cache entries, sending If-None-Match /
+               If-Modified-Since; only useful when the store sends validators
+Bytes on the wire and decoded bytes come from the tenant's per-endpoint transfer
+counters, which is also what get_tenants reports.
+
+By default the store in .env (WORDPRESS_SITE_URL, WOCOMMERCE_CONSUMER_KEY,
+WOCOMMERCE_CONSUMER_SECRET) is used. With --local, or when no store is
+configured, a local server answers with synthetic orders over a link throttled
+to --mbps, honouring gzip and ETags like a store behind a typical CDN.
+
+Run from the repository root:
+    python benchmarks/bench_bandwidth.py [--local] [--mbps 20] [--pages 5]
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+os.chdir(ROOT)
+
+import server  # noqa: E402
+from bench_memory import order  # noqa: E402
+
+
+def local_store(mbps):
+    """Start a throttled local store serving /wp-json/wc/v3/orders; returns its site URL."""
+    pages = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_HEAD(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_GET(self):
+            page = int(parse_qs(urlparse(self.path).query).get("page", ["1"])[0])
+            if page not in pages:
+                body = json.dumps([order(page * 100 + i) for i in range(100)]).encode()
+                pages[page] = (body, gzip.compress(body, 6), '"%s"' % hashlib.md5(body).hexdigest())
+            body, compressed, etag = pages[page]
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+            payload = compressed if gzipped else body
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("ETag", etag)
+            if gzipped:
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            chunk = 16384
+            for start in range(0, len(payload), chunk):
+                self.wfile.write(payload[start:start + chunk])
+                time.sleep(min(chunk, len(payload) - start) * 8 / (mbps * 1e6))
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{httpd.server_address[1]}"
+
+
+def measure(tenant, fetch, pages):
+    tenant.transfer.clear()
+    start = time.perf_counter()
+    for page in range(1, pages + 1):
+        fetch(page)
+    elapsed = (time.perf_counter() - start) / pages * 1000
+    counts = tenant.transfer.get("wc/v3/orders", {})
+    return counts.get("wire_bytes", 0) / pages, counts.get("body_bytes", 0) / pages, counts.get("not_modified", 0), elapsed
+
+
+def run():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--local", action="store_true")
+    parser.add_argument("--mbps", type=float, default=20)
+    parser.add_argument("--pages", type=int, default=5)
+    args = parser.parse_args()
+    if args.local or not server.DEFAULT_SITE_URL:
+        site_url, key, secret = local_store(args.mbps), "ck_benchmark", "cs_benchmark"
+        print(f"local store, {args.mbps:g} Mbit/s link")
+    else:
+        site_url, key, secret = server.DEFAULT_SITE_URL, None, None
+        print(f"store {site_url}")
+    base_url, headers = server.get_woo_client(site_url, key, secret)
+    tenant = server.tenants.for_url(base_url)
+    url = f"{base_url}/orders"
+
+    def get(page, encoding):
+        response = tenant.request("GET", url, params={"per_page": 100, "page": page},
+                                  headers={**headers, "Accept-Encoding": encoding})
+        response.raise_for_status()
+
+    def revalidate(page):
+        # With a zero TTL every entry is expired, so woo_get sends its validators
+        server.woo_get(url, headers, {"per_page": 100, "page": page})
+
+    server.entity_cache.ttl = 0
+    for page in range(1, args.pages + 1):
+        server.woo_get(url, headers, {"per_page": 100, "page": page})
+    rows = {
+        "identity": measure(tenant, lambda page: get(page, "identity"), args.pages),
+        "compressed": measure(tenant, lambda page: get(page, server.ACCEPT_ENCODING), args.pages),
+        "revalidated": measure(tenant, revalidate, args.pages),
+    }
+    print(f"encodings offered: {server.ACCEPT_ENCODING}")
+    print(f"{'mode':<12} {'wire KB/page':>13} {'decoded KB/page':>16} {'304s':>5} {'ms/page':>8}")
+    for name, (wire, body, not_modified, ms) in rows.items():
+        print(f"{name:<12} {wire / 1024:>13.1f} {body / 1024:>16.1f} {not_modified:>5} {ms:>8.1f}")
+    identity, compressed = rows["identity"], rows["compressed"]
+    if identity[0] and compressed[0]:
+        print(f"compression saves {1 - compressed[0] / identity[0]:.0%} of the bytes and "
+              f"{1 - compressed[3] / identity[3]:.0%} of the time per page")
+
+
+if __name__ == "__main__":
+    run()
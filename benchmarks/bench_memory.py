@@ -0,0 +1,111 @@
+"""
+Benchmark the memory held per cached order, product and customer.
+
+Compares the nested dicts from response.json() (what the entity cache used to
+hold) with server.compact() records, and checks that server.expand() gives the
+same dicts back. Memory is measured with tracemalloc as the bytes still
+allocated after building COUNT entities of each kind from JSON text shaped like
+WooCommerce REST API v3 responses.
+
+Run from the repository root:
+    python benchmarks/bench_memory.py
+"""
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import server  # noqa: E402
+
+COUNT = 10000
+
+
+def address(i, email=True):
+    data = {"first_name": f"First{i}", "last_name": f"Last{i % 500}", "company": "",
+            "address_1": f"{i % 900 + 1} Main Street", "address_2": "", "city": ["London", "Leeds", "York"][i % 3],
+            "state": "", "postcode": f"AB{i % 99} 1CD", "country": "GB"}
+    if email:
+        data.update({"email": f"customer{i}@example.com", "phone": f"0161 555 {i % 10000:04d}"})
+    return data
+
+
+def order(i):
+    items = [{"id": i * 10 + n, "name": f"Product {n}", "product_id": 100 + n, "variation_id": 0,
+              "quantity": n + 1, "tax_class": "", "subtotal": f"{9.99 * (n + 1):.2f}", "subtotal_tax": "0.00",
+              "total": f"{9.99 * (n + 1):.2f}", "total_tax": "0.00", "taxes": [],
+              "meta_data": [{"id": i * 100 + n, "key": "_reduced_stock", "value": str(n + 1), "display_key": "_reduced_stock",
+                             "display_value": str(n + 1)}],
+              "sku": f"SKU-{100 + n}", "price": 9.99, "image": {"id": 0, "src": ""}, "parent_name": None}
+             for n in range(3)]
+    return {"id": i, "parent_id": 0, "status": ["processing", "completed", "on-hold"][i % 3], "currency": "GBP",
+            "version": "8.9.1", "prices_include_tax": False, "date_created": "2024-05-01T10:00:00",
+            "date_modified": "2024-05-02T10:00:00", "discount_total": "0.00", "discount_tax": "0.00",
+            "shipping_total": "3.50", "shipping_tax": "0.00", "cart_tax": "0.00", "total": f"{i % 300 + 3.5:.2f}",
+            "total_tax": "0.00", "customer_id": i % 2000, "order_key": f"wc_order_{i:012x}",
+            "billing": address(i), "shipping": address(i, email=False), "payment_method": "stripe",
+            "payment_method_title": "Credit card", "transaction_id": f"pi_{i:020d}", "customer_ip_address": "10.0.0.1",
+            "customer_user_agent": "Mozilla/5.0", "created_via": "checkout", "customer_note": "",
+            "date_completed": None, "date_paid": "2024-05-01T10:01:00", "cart_hash": f"{i:032x}", "number": str(i),
+            "meta_data": [{"id": i * 7 + n, "key": key, "value": value} for n, (key, value) in
+                          enumerate([("_stripe_fee", "0.45"), ("_stripe_net", "12.05"), ("is_vat_exempt", "no")])],
+            "line_items": items, "tax_lines": [], "shipping_lines": [], "fee_lines": [], "coupon_lines": [],
+            "refunds": [], "date_created_gmt": "2024-05-01T09:00:00", "date_modified_gmt": "2024-05-02T09:00:00",
+            "_links": {"self": [{"href": f"https://shop.example.com/wp-json/wc/v3/orders/{i}"}],
+                       "collection": [{"href": "https://shop.example.com/wp-json/wc/v3/orders"}]}}
+
+
+def product(i):
+    return {"id": i, "name": f"Product {i}", "slug": f"product-{i}", "type": "simple", "status": "publish",
+            "featured": False, "catalog_visibility": "visible", "description": f"<p>Description of product {i}.</p>",
+            "short_description": "", "sku": f"SKU-{i}", "price": "9.99", "regular_price": "9.99", "sale_price": "",
+            "on_sale": False, "purchasable": True, "total_sales": i % 50, "virtual": False, "downloadable": False,
+            "tax_status": "taxable", "tax_class": "", "manage_stock": True, "stock_quantity": i % 40,
+            "stock_status": "instock", "backorders": "no", "weight": "0.5",
+            "dimensions": {"length": "10", "width": "5", "height": "2"}, "shipping_class": "",
+            "reviews_allowed": True, "average_rating": "4.50", "rating_count": i % 9, "related_ids": [i + 1, i + 2, i + 3],
+            "categories": [{"id": 15, "name": "Clothing", "slug": "clothing"}], "tags": [],
+            "images": [{"id": i * 2, "src": f"https://shop.example.com/uploads/{i}.jpg", "name": f"{i}", "alt": ""}],
+            "attributes": [], "variations": [], "menu_order": 0, "meta_data": [],
+            "date_created_gmt": "2024-01-01T00:00:00", "date_modified_gmt": "2024-05-01T00:00:00"}
+
+
+def customer(i):
+    return {"id": i, "date_created": "2024-01-01T00:00:00", "email": f"customer{i}@example.com",
+            "first_name": f"First{i}", "last_name": f"Last{i % 500}", "role": "customer", "username": f"customer{i}",
+            "billing": address(i), "shipping": address(i, email=False), "is_paying_customer": True,
+            "avatar_url": "https://secure.gravatar.com/avatar/0", "meta_data": []}
+
+
+def held_bytes(build):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = build()
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return value, held
+
+
+def run():
+    print(f"{'entity':<9} {'dict bytes':>11} {'compact bytes':>14} {'saved':>6} {'expand us':>10}")
+    for name, make in (("order", order), ("product", product), ("customer", customer)):
+        text = [json.dumps(make(i)) for i in range(COUNT)]
+        originals, dict_bytes = held_bytes(lambda: [json.loads(t) for t in text])
+        compacted, compact_bytes = held_bytes(lambda: [server.compact(json.loads(t)) for t in text])
+        start = time.perf_counter()
+        expanded = [server.expand(record) for record in compacted]
+        expand_us = (time.perf_counter() - start) / COUNT * 1e6
+        assert expanded == originals
+        print(f"{name:<9} {dict_bytes // COUNT:>11} {compact_bytes // COUNT:>14} "
+              f"{1 - compact_bytes / dict_bytes:>6.0%} {expand_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    run()
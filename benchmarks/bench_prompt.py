@@ -0,0 +1,99 @@
+"""
+Benchmark the prompt sent to the LLM on each /chat turn.
+
+Compares the old layout with the current one:
+  old: mcp_use's default system message listing every tool description, tool
+       schemas that include consumer_key / consumer_secret / jwt_token, and the
+       full instructions plus credentials prepended to every user message.
+  new: main.SYSTEM_PROMPT as the system message, tool schemas with the
+       credential arguments hidden by server.hide_server_credentials(), and the
+       bare user message.
+
+Everything before the user message is the prefix the provider can cache; the
+rest is billed at the full input rate on every turn. Tokens are counted with
+tiktoken when its gpt-4o encoding is available, otherwise estimated at four
+characters per token. Live per-turn token usage and latency are printed by
+main.py ("Chat turn usage: ...").
+
+Run from the repository root (credentials are read from .env):
+    python benchmarks/bench_prompt.py
+"""
+import copy
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+# hide_server_credentials() only hides what the server can fill in itself
+os.environ.setdefault("WOCOMMERCE_CONSUMER_KEY", "ck_benchmark")
+os.environ.setdefault("WOCOMMERCE_CONSUMER_SECRET", "cs_benchmark")
+os.environ.setdefault("WORDPRESS_JWT_TOKEN", "jwt_benchmark")
+
+from mcp_use.agents.prompts.templates import DEFAULT_SYSTEM_PROMPT_TEMPLATE  # noqa: E402
+import main  # noqa: E402
+import server  # noqa: E402
+
+OLD_INSTRUCTIONS = (
+    "You are an intelligent agent capable of interacting with WooCommerce and WordPress APIs. "
+    "Your tasks include managing products, orders, and customer information. "
+    "You can invoke tools when needed to accomplish these tasks.\n"
+    "Exract data from the user's message(turn into proper format which can be used by tools or apis of wordpress and woo commerce) and use the following credentials to invoke tools:\n"
+    "use following credentials:\n"
+    f"WOCOMMERCE_CONSUMER_KEY: {os.environ['WOCOMMERCE_CONSUMER_KEY']}\n"
+    f"WOCOMMERCE_CONSUMER_SECRET: {os.environ['WOCOMMERCE_CONSUMER_SECRET']}\n"
+    f"WORDPRESS_SITE_URL: {os.environ.get('WORDPRESS_SITE_URL')}\n"
+    f"WORDPRESS_JWT_TOKEN: {os.environ['WORDPRESS_JWT_TOKEN']}\n"
+)
+
+MESSAGES = [
+    "Show me the last 5 orders",
+    "Which products are low on stock?",
+    "Mark order 1234 as completed and add a note that it shipped today",
+]
+
+
+def token_counter():
+    try:
+        import tiktoken
+        encoding = tiktoken.encoding_for_model("gpt-4o")
+        return lambda text: len(encoding.encode(text)), "tiktoken gpt-4o"
+    except Exception:
+        return lambda text: (len(text) + 3) // 4, "estimated, 4 chars/token"
+
+
+def tool_definitions():
+    return [
+        {"type": "function", "function": {"name": tool.name, "description": tool.description,
+                                          "parameters": copy.deepcopy(tool.parameters)}}
+        for tool in server.mcp._tool_manager.list_tools()
+    ]
+
+
+def run():
+    count, method = token_counter()
+    old_tools = json.dumps(tool_definitions())
+    hidden = server.hide_server_credentials()
+    new_tools = json.dumps(tool_definitions())
+    descriptions = "\n".join(f"- {tool.name}: {tool.description}" for tool in server.mcp._tool_manager.list_tools())
+    old_system = DEFAULT_SYSTEM_PROMPT_TEMPLATE.format(tool_descriptions=descriptions)
+
+    layouts = {
+        "old": (count(old_system) + count(old_tools), lambda message: count(f"{OLD_INSTRUCTIONS}\nUser: {message}")),
+        "new": (count(main.SYSTEM_PROMPT) + count(new_tools), count),
+    }
+    print(f"token counts: {method}; hidden tool arguments: {', '.join(sorted(hidden))}")
+    print(f"{'layout':<6} {'cacheable prefix':>17} {'per-turn uncached':>18} {'total per turn':>15}")
+    totals = {}
+    for name, (prefix, per_turn) in layouts.items():
+        uncached = sum(per_turn(message) for message in MESSAGES) / len(MESSAGES)
+        totals[name] = prefix + uncached
+        print(f"{name:<6} {prefix:>17} {uncached:>18.0f} {prefix + uncached:>15.0f}")
+    saved = totals["old"] - totals["new"]
+    print(f"saved per turn: {saved:.0f} tokens ({saved / totals['old']:.0%}) before provider-side prefix caching")
+
+
+if __name__ == "__main__":
+    run()
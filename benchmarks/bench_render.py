@@ -0,0 +1,71 @@
+"""
+Benchmark the /chat render stage on large tabular agent outputs.
+
+Compares rendering markdown on the event loop (the old behaviour) with
+render_markdown() from main.py, which renders in a worker pool and caches
+the HTML. Event-loop stall is measured as the worst delay of a 1 ms ticker
+running concurrently with the render.
+
+Run from the repository root:
+    python benchmarks/bench_render.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import markdown2  # noqa: E402
+import main  # noqa: E402
+
+
+def order_table(rows):
+    lines = ["Here are the orders you asked for:", "",
+             "| ID | Date | Status | Customer | Email | Items | Total |",
+             "|----|------|--------|----------|-------|-------|-------|"]
+    for i in range(rows):
+        lines.append(f"| {1000 + i} | 2024-05-{i % 28 + 1:02d} | {'processing' if i % 3 else 'completed'} "
+                     f"| Customer {i} | customer{i}@example.com | {i % 5 + 1} | ${i * 3.7:.2f} |")
+    return "\n".join(lines)
+
+
+async def ticker(stop, delays):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        delays.append(time.perf_counter() - start - 0.001)
+
+
+async def measure(render, text):
+    stop = asyncio.Event()
+    delays = []
+    tick = asyncio.create_task(ticker(stop, delays))
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    await render(text)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    return elapsed * 1000, max(delays) * 1000
+
+
+async def inline_render(text):
+    return markdown2.markdown(text)
+
+
+async def run():
+    print(f"{'rows':>6} {'chars':>9} {'stage':<16} {'render ms':>10} {'max loop stall ms':>18}")
+    for rows in (100, 1000, 5000):
+        text = order_table(rows)
+        main._render_cache.clear()
+        for stage, render in (("inline", inline_render), ("worker pool", main.render_markdown),
+                              ("cache hit", main.render_markdown)):
+            elapsed, stall = await measure(render, text)
+            print(f"{rows:>6} {len(text):>9} {stage:<16} {elapsed:>10.1f} {stall:>18.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
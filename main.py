@@ -1,9 +1,20 @@
 import asyncio
+import base64
+import hashlib
+import hmac
+import json
 import os
-from fastapi import FastAPI, Request, Form
-from fastapi.responses import HTMLResponse
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from fastapi import FastAPI, Request, Form, HTTPException
+from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
+from langchain_core.callbacks import get_usage_metadata_callback
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from mcp_use import MCPAgent, MCPClient
@@ -15,25 +26,275 @@ app = FastAPI()
 templates = Jinja2Templates(directory="templates")
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-# Define a system instruction
+MCP_SERVER_NAME = "wordpress_mcp_server"
+# Rendered agent outputs kept in memory, keyed by a hash of the markdown
+RENDER_CACHE_SIZE = int(os.getenv("RENDER_CACHE_SIZE", "256"))
+# markdown2 is pure Python; rendering large outputs on the event loop would stall every other request
+render_executor = ThreadPoolExecutor(max_workers=int(os.getenv("RENDER_WORKERS", "2")), thread_name_prefix="markdown")
+_render_cache = OrderedDict()
+# Secret configured on the store's webhooks (WooCommerce > Settings > Advanced > Webhooks)
+WEBHOOK_SECRET = os.getenv("WOOCOMMERCE_WEBHOOK_SECRET", "")
+# Conversations kept in memory; the least recently used one is dropped first
+CHAT_SESSION_LIMIT = int(os.getenv("CHAT_SESSION_LIMIT", "100"))
+# Approximate token budget for the history replayed to the agent on each turn
+CHAT_HISTORY_TOKENS = int(os.getenv("CHAT_HISTORY_TOKENS", "4000"))
+# Most recent turns that are always replayed verbatim; older ones get summarized
+CHAT_KEEP_TURNS = int(os.getenv("CHAT_KEEP_TURNS", "4"))
+# Seconds a read tool result can be reused by later turns of the same conversation
+CHAT_TOOL_RESULT_TTL = int(os.getenv("CHAT_TOOL_RESULT_TTL", "300"))
+SESSION_COOKIE = "chat_session"
+_chat_sessions = OrderedDict()
+
+# Define a system instruction. It is sent once as the agent's system message and never
+# changes between requests, so the provider can serve it (with the tool schemas) from
+# its prompt cache. Credentials are not part of it: the MCP server fills them in from
+# its own environment.
 SYSTEM_PROMPT = (
     "You are an intelligent agent capable of interacting with WooCommerce and WordPress APIs. "
     "Your tasks include managing products, orders, and customer information. "
     "You can invoke tools when needed to accomplish these tasks.\n"
-    "Exract data from the user's message(turn into proper format which can be used by tools or apis of wordpress and woo commerce) and use the following credentials to invoke tools:\n"
-    "use following credentials:\n"
-    f"WOCOMMERCE_CONSUMER_KEY: {os.getenv('WOCOMMERCE_CONSUMER_KEY')}\n"
-    f"WOCOMMERCE_CONSUMER_SECRET: {os.getenv('WOCOMMERCE_CONSUMER_SECRET')}\n"
-    f"WORDPRESS_SITE_URL: {os.getenv('WORDPRESS_SITE_URL')}\n"
-    f"WORDPRESS_JWT_TOKEN: {os.getenv('WORDPRESS_JWT_TOKEN')}\n"
+    "Extract data from the user's message and turn it into the format expected by the WordPress "
+    "and WooCommerce tools. The server is already configured with the store's URL and credentials, "
+    "so leave site_url empty unless the user names a different store. "
+    "Stores registered on the server are addressed by passing their tenant ID (see get_tenants) as site_url."
+)
+
+COMPACT_PROMPT = (
+    "Summarize this conversation between a store owner and their WooCommerce assistant for the assistant's own "
+    "future reference. Keep every order, product, customer and post ID, SKU, amount, date and status that was "
+    "mentioned, the user's open requests and preferences, and any changes that were made. Drop pleasantries "
+    "and the full contents of listings. Answer with the summary only, in at most 200 words."
 )
 
+# Tool names with these prefixes only read from the store and can be memoized
+READ_TOOL_PREFIXES = ("get_",)
+# Tool names with these prefixes change store state and invalidate memoized reads
+WRITE_TOOL_PREFIXES = ("create_", "update_", "delete_", "run_")
+# Write tools without such a prefix and the resource they write to; None means the
+# resource is named by the call's arguments (import_records, submit_job)
+WRITE_TOOLS = {"generate_variations": "product", "import_records": None, "submit_job": None}
+# Read tools whose name does not say what they read, and the resources whose writes
+# make their results stale; other read tools read the noun after get_
+READ_TOOLS = {
+    "get_low_stock": ("product",),
+    "get_order_360": ("order", "customer"),
+    "get_product_360": ("product",),
+    "get_customer_360": ("customer", "order"),
+    "get_order_subresources": ("order",),
+    "get_rollup_report": ("order",),
+}
+# Read tools whose answer changes without any write through this session
+UNMEMOIZED_TOOLS = ("get_job_status", "get_job_result", "get_tenants", "get_order_changes")
+
+# Memo of the chat session currently being served (None outside /chat)
+_active_memo = ContextVar("active_tool_memo", default=None)
+
+
+class ToolResultMemo:
+    """
+    Conversation-scoped memo of read-only MCP tool results.
+
+    Identical read calls (same tool name and arguments) are answered from memory
+    for up to `ttl` seconds, across turns of the same conversation, instead of
+    making another MCP round-trip and store request. A write tool or a webhook
+    drops every memoized read for the same resource (e.g. update_order clears
+    get_orders, get_order_notes and get_order_meta) as well as all report results.
+    Writes made by a background job clear them again when the job is polled.
+    """
+
+    def __init__(self, ttl=CHAT_TOOL_RESULT_TTL):
+        self.ttl = ttl
+        self._results = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.saved_seconds = 0.0
+        self._jobs = {}  # job ID -> resources its tool writes to
+
+    @staticmethod
+    def resource_of(tool_name):
+        # get_order_notes -> order, update_product_category -> product
+        noun = tool_name.partition("_")[2].split("_", 1)[0]
+        return noun[:-1] if noun.endswith("s") else noun
+
+    @classmethod
+    def read_resources(cls, name):
+        """Resources whose writes make a read tool's results stale."""
+        return READ_TOOLS.get(name) or (cls.resource_of(name),)
+
+    @classmethod
+    def written_resources(cls, name, arguments):
+        """Resources a tool call writes to (empty for reads)."""
+        arguments = arguments or {}
+        if name == "import_records":
+            return {cls.resource_of(f"_{arguments.get('resource', '')}")}
+        if name == "submit_job":
+            return cls.written_resources(arguments.get("tool", ""), arguments.get("arguments"))
+        if name in WRITE_TOOLS:
+            return {WRITE_TOOLS[name]}
+        if name.startswith(WRITE_TOOL_PREFIXES):
+            return {cls.resource_of(name)}
+        return set()
+
+    async def call(self, call_tool, name, arguments, *args, **kwargs):
+        written = self.written_resources(name, arguments)
+        if written:
+            result = await call_tool(name, arguments, *args, **kwargs)
+            for resource in written:
+                self.invalidate(resource)
+            if name == "submit_job":
+                self._track_job(result, written)
+            return result
+        if name in ("get_job_status", "get_job_result"):
+            # A background job writes when it runs, not when it is submitted
+            for resource in self._jobs.get((arguments or {}).get("job_id"), ()):
+                self.invalidate(resource)
+        if not name.startswith(READ_TOOL_PREFIXES) or name in UNMEMOIZED_TOOLS:
+            return await call_tool(name, arguments, *args, **kwargs)
+
+        key = (name, json.dumps(arguments or {}, sort_keys=True, default=str))
+        cached = self._results.get(key)
+        if cached is not None and time.monotonic() - cached[2] > self.ttl:
+            del self._results[key]
+            cached = None
+        if cached is not None:
+            self.hits += 1
+            self.saved_seconds += cached[1]
+            return cached[0]
+
+        start = time.perf_counter()
+        result = await call_tool(name, arguments, *args, **kwargs)
+        self.misses += 1
+        if not getattr(result, "isError", False):
+            self._results[key] = (result, time.perf_counter() - start, time.monotonic())
+        return result
+
+    def _track_job(self, result, resources):
+        try:
+            job_id = json.loads(result.content[0].text)["job_id"]
+        except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+            return
+        self._jobs[job_id] = resources
+
+    def invalidate(self, resource):
+        stale = [
+            key for key in self._results
+            if resource in self.read_resources(key[0]) or key[0].endswith("_report")
+        ]
+        for key in stale:
+            del self._results[key]
+        self.invalidations += len(stale)
+
+    def report(self, since=None):
+        """Counters so far, or their change since an earlier report()."""
+        since = since or {}
+        return {
+            "hits": self.hits - since.get("hits", 0),
+            "misses": self.misses - since.get("misses", 0),
+            "invalidations": self.invalidations - since.get("invalidations", 0),
+            "saved_seconds": round(self.saved_seconds - since.get("saved_seconds", 0), 3),
+        }
+
+
+def estimate_tokens(text):
+    return len(text) // 4 + 1
+
+
+class ChatSession:
+    """
+    One browser's conversation with the agent.
+
+    The agent runs without its own memory; each turn replays this session's history
+    instead. The last CHAT_KEEP_TURNS turns are replayed verbatim. Once the history
+    grows past CHAT_HISTORY_TOKENS, older turns are folded into a running summary
+    by the LLM. Read tool results are memoized per session, so follow-up questions
+    about the same orders or products do not fetch them again.
+    """
+
+    def __init__(self):
+        self.summary = ""
+        self.turns = []
+        self.memo = ToolResultMemo()
+        self.lock = asyncio.Lock()
+        self.compactions = 0
+        self.compaction = None
+
+    def history(self):
+        messages = []
+        if self.summary:
+            messages.append(AIMessage(content=f"Summary of our conversation so far: {self.summary}"))
+        for message, reply in self.turns:
+            messages += [HumanMessage(content=message), AIMessage(content=reply)]
+        return messages
+
+    def history_tokens(self):
+        return estimate_tokens(self.summary) + sum(estimate_tokens(m) + estimate_tokens(r) for m, r in self.turns)
+
+    def add_turn(self, message, reply):
+        # A single listing can exceed the whole budget; keep its head; the rows stay memoized
+        limit = CHAT_HISTORY_TOKENS * 4 // (CHAT_KEEP_TURNS + 1)
+        if len(reply) > limit:
+            reply = reply[:limit] + "\n... (truncated)"
+        self.turns.append((message, reply))
+
+    async def compact(self, llm):
+        """Fold the turns before the last CHAT_KEEP_TURNS into the summary once over budget."""
+        if self.history_tokens() <= CHAT_HISTORY_TOKENS or len(self.turns) <= CHAT_KEEP_TURNS:
+            return
+        old_turns = self.turns[:-CHAT_KEEP_TURNS]
+        transcript = "\n\n".join(f"User: {message}\nAssistant: {reply}" for message, reply in old_turns)
+        start = time.perf_counter()
+        summary = await llm.ainvoke([
+            SystemMessage(content=COMPACT_PROMPT),
+            HumanMessage(content=f"Earlier summary:\n{self.summary or '(none)'}\n\nNew turns:\n{transcript}"),
+        ])
+        before = self.history_tokens()
+        self.summary = summary.content
+        self.turns = self.turns[len(old_turns):]
+        self.compactions += 1
+        print(f"Compacted {len(old_turns)} turns: {before} -> {self.history_tokens()} history tokens "
+              f"in {time.perf_counter() - start:.1f}s")
+
+
+def get_chat_session(session_id):
+    """Return (session_id, session), creating a session for unknown ids and evicting the LRU one."""
+    session = _chat_sessions.get(session_id) if session_id else None
+    if session is None:
+        session_id = uuid.uuid4().hex
+        session = _chat_sessions[session_id] = ChatSession()
+        while len(_chat_sessions) > CHAT_SESSION_LIMIT:
+            _chat_sessions.popitem(last=False)
+    _chat_sessions.move_to_end(session_id)
+    return session_id, session
+
+
+async def compact_session(session):
+    async with session.lock:
+        try:
+            await session.compact(agent.llm)
+        except Exception as e:
+            # Keep the full turns; the next turn retries
+            print("Conversation compaction failed:", e)
+
+
+def install_tool_memo(connector):
+    """Route a connector's tool calls through the memo of the active chat session."""
+    call_tool = connector.call_tool
+
+    async def memoized_call_tool(name, arguments, *args, **kwargs):
+        memo = _active_memo.get()
+        if memo is None:
+            return await call_tool(name, arguments, *args, **kwargs)
+        return await memo.call(call_tool, name, arguments, *args, **kwargs)
+
+    connector.call_tool = memoized_call_tool
+
 @app.on_event("startup")
 async def startup_event():
-    global agent
+    global agent, mcp_client
     config = {
         "mcpServers": {
-            "wordpress_mcp_server": {
+            MCP_SERVER_NAME: {
                 "command": "python3",
                 "args": ["/Users/xpertdev/Desktop/Pardeep/mcp-server-wordpress/server.py"],
                 "env": {
@@ -45,9 +306,41 @@ async def startup_event():
             }
         }
     }
-    client = MCPClient.from_dict(config)
+    mcp_client = MCPClient.from_dict(config)
     llm = ChatOpenAI(model="gpt-4o")  # Keep the raw ChatOpenAI model
-    agent = MCPAgent(llm=llm, client=client, max_steps=30)
+    # Conversation history is kept per chat session (see ChatSession), not in the shared agent
+    agent = MCPAgent(llm=llm, client=mcp_client, max_steps=30, system_prompt=SYSTEM_PROMPT, memory_enabled=False)
+    await agent.initialize()
+    for session in mcp_client.get_all_active_sessions().values():
+        install_tool_memo(session.connector)
+
+def summarize_usage(usage_metadata, seconds):
+    """Token totals for one chat turn, summed over every LLM call the agent made."""
+    totals = {"input_tokens": 0, "cached_input_tokens": 0, "output_tokens": 0}
+    for usage in usage_metadata.values():
+        totals["input_tokens"] += usage.get("input_tokens", 0)
+        totals["cached_input_tokens"] += (usage.get("input_token_details") or {}).get("cache_read", 0)
+        totals["output_tokens"] += usage.get("output_tokens", 0)
+    totals["cache_hit_rate"] = round(totals["cached_input_tokens"] / totals["input_tokens"], 3) if totals["input_tokens"] else 0.0
+    totals["seconds"] = round(seconds, 3)
+    return totals
+
+async def render_markdown(text):
+    """Render agent output to HTML in the worker pool, memoized by content hash."""
+    start = time.perf_counter()
+    key = hashlib.sha256(text.encode()).hexdigest()
+    html = _render_cache.get(key)
+    cached = html is not None
+    if cached:
+        _render_cache.move_to_end(key)
+    else:
+        html = await asyncio.get_running_loop().run_in_executor(render_executor, markdown2.markdown, text)
+        _render_cache[key] = html
+        while len(_render_cache) > RENDER_CACHE_SIZE:
+            _render_cache.popitem(last=False)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"Rendered {len(text)} chars in {elapsed_ms:.1f} ms ({'cache hit' if cached else 'rendered'})")
+    return html
 
 @app.get("/", response_class=HTMLResponse)
 async def get_chat(request: Request):
@@ -55,12 +348,70 @@ async def get_chat(request: Request):
 
 @app.post("/chat", response_class=HTMLResponse)
 async def post_chat(request: Request, message: str = Form(...)):
-    # Prepend the system prompt to the user's message
-    prompt_with_context = f"{SYSTEM_PROMPT}\nUser: {message}"
-    print("Prompt sent to agent:\n", prompt_with_context)
-    raw_result = await agent.run(prompt_with_context)
-    html_result = markdown2.markdown(raw_result)
-    return templates.TemplateResponse(
+    session_id, session = get_chat_session(request.cookies.get(SESSION_COOKIE))
+    async with session.lock:
+        memo_token = _active_memo.set(session.memo)
+        memo_before = session.memo.report()
+        start = time.perf_counter()
+        try:
+            with get_usage_metadata_callback() as usage:
+                raw_result = await agent.run(message, external_history=session.history())
+        finally:
+            _active_memo.reset(memo_token)
+        print("Chat turn usage:", summarize_usage(usage.usage_metadata, time.perf_counter() - start),
+              f"history_tokens={session.history_tokens()} turns={len(session.turns)}")
+        print("Tool result memo this turn:", session.memo.report(since=memo_before))
+        session.add_turn(message, raw_result)
+    # Summarize older turns after responding; the session lock holds back the next turn until done
+    session.compaction = asyncio.create_task(compact_session(session))
+    html_result = await render_markdown(raw_result)
+    response = templates.TemplateResponse(
         "chat.html",
         {"request": request, "response": html_result, "message": message}
     )
+    response.set_cookie(SESSION_COOKIE, session_id, httponly=True, samesite="lax")
+    return response
+
+@app.post("/chat/reset")
+async def reset_chat(request: Request):
+    _chat_sessions.pop(request.cookies.get(SESSION_COOKIE), None)
+    response = RedirectResponse("/", status_code=303)
+    response.delete_cookie(SESSION_COOKIE)
+    return response
+
+def verify_webhook_signature(body: bytes, signature: str) -> bool:
+    """Check WooCommerce's X-WC-Webhook-Signature (base64 HMAC-SHA256 of the raw body)."""
+    if not WEBHOOK_SECRET:
+        return False
+    digest = hmac.new(WEBHOOK_SECRET.encode(), body, hashlib.sha256).digest()
+    return hmac.compare_digest(base64.b64encode(digest).decode(), signature)
+
+@app.post("/webhooks/woocommerce")
+async def woocommerce_webhook(request: Request):
+    body = await request.body()
+    topic = request.headers.get("X-WC-Webhook-Topic", "")
+    if not topic and body.startswith(b"webhook_id="):
+        # WooCommerce pings the delivery URL unsigned when a webhook is saved
+        return {"status": "ok"}
+    if not verify_webhook_signature(body, request.headers.get("X-WC-Webhook-Signature", "")):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+
+    resource, _, event = topic.partition(".")
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Webhook body is not JSON")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Webhook body is not a JSON object")
+    arguments = {"resource": resource, "entity_id": payload.get("id", 0)}
+    source = request.headers.get("X-WC-Webhook-Source", "").rstrip("/")
+    if source:
+        arguments["site_url"] = source
+    if event in ("created", "updated", "restored"):
+        arguments["payload"] = payload
+    session = mcp_client.get_session(MCP_SERVER_NAME)
+    result = await session.connector.call_tool("invalidate_cache", arguments)
+    for chat_session in _chat_sessions.values():
+        chat_session.memo.invalidate(resource)
+    print(f"Webhook {topic} for {resource} {arguments['entity_id']}:", result.content[0].text if result.content else "")
+    return {"status": "ok"}
@@ -1,38 +1,391 @@
 # mcp_wp_server.py
 
 import os
+import re
+import sys
+import csv
+import json
+import uuid
+import array
+import atexit
+import bisect
+import mmap
+import struct
+import itertools
+import functools
+import threading
+import time
+import calendar
+import hashlib
+import html
+import inspect
+import shutil
+import string
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Union
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP
+from pydantic import ValidationError
 import requests
 import base64
 
 load_dotenv()
 
-mcp = FastMCP("wordpress_mcp")
-
 DEFAULT_SITE_URL = os.environ.get('WORDPRESS_SITE_URL', '')
 DEFAULT_JWT_TOKEN = os.environ.get('WORDPRESS_JWT_TOKEN', '')
 DEFAULT_WOCOMMERCE_CONSUMER_KEY = os.environ.get('WOCOMMERCE_CONSUMER_KEY', '')
 DEFAULT_WOCOMMERCE_CONSUMER_SECRET = os.environ.get('WOCOMMERCE_CONSUMER_SECRET', '')
 
-def get_wp_client(site_url=None, jwt_token=None, wpe_auth_cookie=None):
-    site_url = site_url or DEFAULT_SITE_URL
-    jwt_token = jwt_token or DEFAULT_JWT_TOKEN
-    if not site_url or not jwt_token:
-        raise Exception('Site URL or JWT token not provided')
+# --- Server-side credentials ---
+# When the server has credentials in its environment, tools fill them in themselves
+# (get_woo_client / get_wp_client), so the credential parameters are left out of the
+# tools' signatures when they are registered. Clients never have to put secrets into
+# the model's context, every tool definition the model sees gets shorter, and the
+# advertised schema matches what a call is validated against. With tenants registered,
+# another store is addressed by its tenant ID.
+CREDENTIAL_PARAMS = ('consumer_key', 'consumer_secret', 'jwt_token')
+
+
+def server_credential_params():
+    """The credential parameters the server supplies itself."""
+    hidden = set()
+    if DEFAULT_WOCOMMERCE_CONSUMER_KEY and DEFAULT_WOCOMMERCE_CONSUMER_SECRET:
+        hidden.update(('consumer_key', 'consumer_secret'))
+    if DEFAULT_JWT_TOKEN:
+        hidden.add('jwt_token')
+    if tenants.ids():
+        # Registered tenants carry their own credentials
+        hidden.update(CREDENTIAL_PARAMS)
+    return hidden
+
+
+class WordPressMCP(FastMCP):
+    """FastMCP registering tools without the credential parameters the server supplies."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.hidden_params = None
+
+    def add_tool(self, fn, *args, **kwargs):
+        if self.hidden_params is None:
+            # Decided once, when the first tool is registered
+            self.hidden_params = server_credential_params()
+        if self.hidden_params.intersection(inspect.signature(fn).parameters):
+            fn = _without_params(fn, self.hidden_params)
+        super().add_tool(fn, *args, **kwargs)
+
+
+def _without_params(fn, hidden):
+    """Wrap `fn` so its signature omits `hidden`; calls then get those parameters' defaults."""
+    signature = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    def tool(*args, **kwargs):
+        return fn(*args, **kwargs)
+
+    tool.__signature__ = signature.replace(
+        parameters=[parameter for name, parameter in signature.parameters.items() if name not in hidden])
+    return tool
+
+
+mcp = WordPressMCP("wordpress_mcp")
+
+# --- Tenants ---
+# Stores are registered in TENANTS_FILE, a JSON object keyed by short tenant IDs:
+#   {"acme": {"site_url": "https://acme.example", "consumer_key": "ck_...",
+#             "consumer_secret": "$ACME_WC_SECRET", "jwt_token": "...", "rate_limit": 5}}
+# "$VAR" values are read from the environment. Every tool's site_url argument accepts a
+# tenant ID as well as a URL. Each tenant keeps a pooled requests.Session, a token-bucket
+# rate limiter and request metrics; cached data and indexes are already namespaced by the
+# API base URL. Tenants are built on first use, so hundreds of registered stores cost
+# nothing until they are called, and the file is re-read when it changes. A URL passed
+# with explicit credentials (or the WORDPRESS_SITE_URL defaults) becomes an unregistered
+# tenant that is pooled the same way.
+TENANTS_FILE = os.environ.get('MCP_TENANTS_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tenants.json'))
+TENANT_RATE_LIMIT = float(os.environ.get('MCP_TENANT_RATE_LIMIT', '10'))  # requests per second, 0 = unlimited
+TENANT_POOL_SIZE = int(os.environ.get('MCP_TENANT_POOL_SIZE', '10'))
+TENANT_USER_AGENT = os.environ.get('MCP_USER_AGENT', f'wordpress-mcp-server python-requests/{requests.__version__}')
+# requests offers gzip and deflate, plus br when the brotli package is installed; bodies
+# are decompressed by urllib3 as they stream in. Bytes on the wire and decoded bytes are
+# counted per endpoint (path with numeric IDs replaced by {id}).
+ACCEPT_ENCODING = requests.utils.DEFAULT_ACCEPT_ENCODING
+ENDPOINT_ID = re.compile(r'/\d+(?=/|$)')
+TENANT_MAX_RETRIES = int(os.environ.get('MCP_TENANT_MAX_RETRIES', '2'))  # retries after HTTP 429
+TENANT_KEYS = ('site_url', 'consumer_key', 'consumer_secret', 'jwt_token', 'rate_limit', 'pool_size')
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` requests per second in bursts of up to `burst`."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token, sleeping until it is available; returns the seconds waited."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Reserve the token now; concurrent callers queue up behind each other
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class Tenant:
+    def __init__(self, tenant_id, site_url, consumer_key='', consumer_secret='', jwt_token='',
+                 rate_limit=TENANT_RATE_LIMIT, pool_size=TENANT_POOL_SIZE):
+        self.id = tenant_id
+        self.site_url = site_url.rstrip('/')
+        self.base_url = f"{self.site_url}/wp-json/wc/v3"
+        self.wp_base_url = f"{self.site_url}/wp-json/wp/v2"
+        # Auth headers are built once per tenant instead of on every call
+        self.headers = None
+        if consumer_key and consumer_secret:
+            b64_auth = base64.b64encode(f"{consumer_key}:{consumer_secret}".encode()).decode()
+            self.headers = {
+                'Content-Type': 'application/json',
+                'User-Agent': TENANT_USER_AGENT,
+                'Accept-Encoding': ACCEPT_ENCODING,
+                'Authorization': f'Basic {b64_auth}'
+            }
+        self.wp_headers = None
+        if jwt_token:
+            self.wp_headers = {
+                'Authorization': f'Bearer {jwt_token}',
+                'User-Agent': TENANT_USER_AGENT,
+                'Accept-Encoding': ACCEPT_ENCODING,
+            }
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.limiter = RateLimiter(rate_limit)
+        self.metrics = Counter()
+        self.transfer = {}  # endpoint -> Counter of responses, not_modified, wire_bytes, body_bytes
+        self._metrics_lock = threading.Lock()
+        self.warmup = None  # result of the startup warm-up, see warm_up_site()
+
+    def count(self, **values):
+        with self._metrics_lock:
+            self.metrics.update(values)
+
+    def count_transfer(self, url, response):
+        """Record compressed and decoded body sizes of a response whose body has been read."""
+        endpoint = ENDPOINT_ID.sub('/{id}', url.partition('/wp-json/')[2].partition('?')[0]) or '/'
+        body_bytes = len(response.content or b'')
+        raw = getattr(response, 'raw', None)
+        wire_bytes = raw.tell() if hasattr(raw, 'tell') else body_bytes
+        with self._metrics_lock:
+            self.transfer.setdefault(endpoint, Counter()).update(
+                responses=1, not_modified=int(response.status_code == 304),
+                wire_bytes=wire_bytes, body_bytes=body_bytes)
+
+    def request(self, method, url, **kwargs):
+        """Send a request over the tenant's pooled session, within its rate limit."""
+        for attempt in range(TENANT_MAX_RETRIES + 1):
+            waited = self.limiter.acquire()
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, stream=True, **kwargs)
+                # Reading the body here streams it through urllib3's decoder
+                self.count_transfer(url, response)
+            except requests.RequestException:
+                self.count(requests=1, errors=1, throttled_seconds=waited)
+                raise
+            self.count(requests=1, throttled_seconds=waited, request_seconds=time.perf_counter() - start,
+                       errors=int(response.status_code >= 400), rate_limited=int(response.status_code == 429))
+            if response.status_code != 429 or attempt == TENANT_MAX_RETRIES:
+                return response
+            retry_after = response.headers.get('Retry-After', '')
+            time.sleep(min(float(retry_after), 30.0) if retry_after.isdigit() else 2 ** attempt)
+
+    def status(self):
+        with self._metrics_lock:
+            metrics = dict(self.metrics)
+        for key in ('throttled_seconds', 'request_seconds'):
+            metrics[key] = round(metrics.get(key, 0.0), 3)
+        if metrics.get('requests'):
+            metrics['avg_request_ms'] = round(metrics['request_seconds'] * 1000 / metrics['requests'], 1)
+        with self._metrics_lock:
+            transfer = {endpoint: dict(counts) for endpoint, counts in self.transfer.items()}
+        for counts in transfer.values():
+            counts['compression_ratio'] = round(counts['body_bytes'] / counts['wire_bytes'], 2) if counts['wire_bytes'] else None
+        return {
+            'tenant': self.id,
+            'site_url': self.site_url,
+            'rate_limit': self.limiter.rate,
+            'woocommerce': self.headers is not None,
+            'wordpress': self.wp_headers is not None,
+            'cached_entries': entity_cache.count(self.base_url),
+            'metrics': metrics,
+            'transfer': transfer,
+            'warmup': self.warmup,
+        }
+
+
+class TenantRegistry:
+    def __init__(self, path):
+        self.path = path
+        self._config = {}
+        self._mtime = None
+        self._tenants = {}  # tenant id (or URL plus credential digest) -> Tenant
+        self._by_site = {}  # site URL -> Tenant, for routing requests by URL
+        self._lock = threading.RLock()
+
+    def _reload(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        config = {}
+        if mtime is not None:
+            with open(self.path) as f:
+                config = json.load(f)
+        config = {
+            tenant_id: {key: os.path.expandvars(value) if isinstance(value, str) else value for key, value in entry.items()}
+            if isinstance(entry, dict) else entry
+            for tenant_id, entry in config.items()
+        }
+        # Changed or removed tenants are rebuilt on next use
+        for tenant_id in [t for t in self._config if self._config[t] != config.get(t)]:
+            tenant = self._tenants.pop(tenant_id, None)
+            if tenant is not None:
+                self._remove_site(tenant)
+                tenant.session.close()
+        self._config = config
+        self._mtime = mtime
+
+    def _add(self, key, tenant):
+        self._tenants[key] = tenant
+        self._by_site.setdefault(tenant.site_url, tenant)
+        return tenant
+
+    def _remove_site(self, tenant):
+        """Stop routing the tenant's site URL to it, handing it to another tenant of the same site."""
+        if self._by_site.get(tenant.site_url) is not tenant:
+            return
+        del self._by_site[tenant.site_url]
+        for other in self._tenants.values():
+            if other.site_url == tenant.site_url:
+                self._by_site[tenant.site_url] = other
+                break
+
+    def _checked_config(self, tenant_id):
+        entry = self._config[tenant_id]
+        if not isinstance(entry, dict):
+            raise Exception(f"Tenant '{tenant_id}' in {self.path} must be a JSON object")
+        unknown = sorted(set(entry) - set(TENANT_KEYS))
+        if unknown:
+            raise Exception(f"Tenant '{tenant_id}' in {self.path} has unknown keys {unknown}. "
+                            f"Allowed keys: {', '.join(TENANT_KEYS)}")
+        if not entry.get('site_url'):
+            raise Exception(f"Tenant '{tenant_id}' in {self.path} has no site_url")
+        return entry
+
+    def ids(self):
+        with self._lock:
+            self._reload()
+            return sorted(self._config)
+
+    def get(self, tenant_id):
+        with self._lock:
+            self._reload()
+            tenant = self._tenants.get(tenant_id)
+            if tenant is None:
+                if tenant_id not in self._config:
+                    raise Exception(f"Unknown tenant '{tenant_id}'. Known tenants: {', '.join(sorted(self._config)) or 'none'}")
+                tenant = self._add(tenant_id, Tenant(tenant_id, **self._checked_config(tenant_id)))
+            return tenant
+
+    def resolve(self, site_url=None, consumer_key=None, consumer_secret=None, jwt_token=None):
+        """Return the tenant for a tenant ID, or for a site URL with explicit or default credentials."""
+        if site_url and '://' not in site_url:
+            return self.get(site_url)
+        with self._lock:
+            self._reload()
+            if site_url and not (consumer_key or consumer_secret or jwt_token):
+                # A registered store referred to by URL, e.g. a webhook's X-WC-Webhook-Source
+                for tenant_id, entry in self._config.items():
+                    if isinstance(entry, dict) and str(entry.get('site_url', '')).rstrip('/') == site_url.rstrip('/'):
+                        return self.get(tenant_id)
+            site_url = (site_url or DEFAULT_SITE_URL).rstrip('/')
+            consumer_key = consumer_key or DEFAULT_WOCOMMERCE_CONSUMER_KEY
+            consumer_secret = consumer_secret or DEFAULT_WOCOMMERCE_CONSUMER_SECRET
+            jwt_token = jwt_token or DEFAULT_JWT_TOKEN
+            digest = hashlib.sha256(f"{consumer_key}:{consumer_secret}:{jwt_token}".encode()).hexdigest()[:16]
+            key = f"{site_url}#{digest}"
+            tenant = self._tenants.get(key)
+            if tenant is None:
+                tenant = self._add(key, Tenant(site_url, site_url, consumer_key, consumer_secret, jwt_token))
+            return tenant
+
+    def for_url(self, url):
+        """The active tenant serving `url`, if any."""
+        return self._by_site.get(url.partition('/wp-json/')[0])
+
+    def active(self):
+        with self._lock:
+            return list(self._tenants.values())
+
+
+tenants = TenantRegistry(TENANTS_FILE)
+
+
+def tenant_request(method, url, **kwargs):
+    """Send an HTTP request through the pooled session of the tenant that owns `url`."""
+    tenant = tenants.for_url(url)
+    if tenant is None:
+        return requests.request(method, url, **kwargs)
+    return tenant.request(method, url, **kwargs)
+
+
+@mcp.tool()
+def get_tenants(tenant: str = "") -> dict:
+    """
+    List the stores registered in the tenant registry, with per-tenant request metrics.
+
+    Any registered tenant ID can be passed as the site_url argument of the other tools.
 
-    base_url = f"{site_url}/wp-json/wp/v2"
-    headers = {
-        'Authorization': f'Bearer {jwt_token}',
-        'User-Agent': 'curl/7.64.1',
+    Args:
+        tenant (str, optional): A tenant ID to report on alone.
+
+    Returns:
+        dict: The registered tenant IDs and, for tenants used since the server started,
+            their site URL, rate limit, cached entries and request metrics
+            (requests, errors, rate_limited, throttled_seconds, avg_request_ms), bytes
+            on the wire vs decoded and 304 answers per endpoint, and the duration and
+            outcome of their startup warm-up.
+    """
+    if tenant:
+        return tenants.get(tenant).status()
+    return {
+        'tenants': tenants.ids(),
+        'active': [t.status() for t in tenants.active()],
     }
-    return base_url, headers
+
+def get_wp_client(site_url=None, jwt_token=None, wpe_auth_cookie=None):
+    tenant = tenants.resolve(site_url, jwt_token=jwt_token)
+    if not tenant.site_url or tenant.wp_headers is None:
+        raise Exception('Site URL or JWT token not provided')
+    return tenant.wp_base_url, tenant.wp_headers
 
 @mcp.tool()
 def create_post(title: str, content: str, status: str = "draft", site_url: str = "", jwt_token: str = "") -> dict:
    base_url, headers = get_wp_client(site_url, jwt_token)
    data = {'title': title, 'content': content, 'status': status}
-   response = requests.post(f"{base_url}/posts", json=data, headers=headers)
+   response = tenant_request('POST', f"{base_url}/posts", json=data, headers=headers)
    response.raise_for_status()
    return response.json()
 
@@ -40,7 +393,7 @@ def create_post(title: str, content: str, status: str = "draft", site_url: str =
 def get_posts(per_page: int = 10, page: int = 1, site_url: str = "", jwt_token: str = "") -> list:
    base_url, headers = get_wp_client(site_url, jwt_token)
    query = {'per_page': per_page, 'page': page}
-   response = requests.get(f"{base_url}/posts", params=query, headers=headers)
+   response = tenant_request('GET', f"{base_url}/posts", params=query, headers=headers)
    response.raise_for_status()
    return response.json()
 
@@ -51,7 +404,7 @@ def update_post(post_id: int, title: str = "", content: str = "", status: str =
    if title: data['title'] = title
    if content: data['content'] = content
    if status: data['status'] = status
-   response = requests.post(f"{base_url}/posts/{post_id}", json=data, headers=headers)
+   response = tenant_request('POST', f"{base_url}/posts/{post_id}", json=data, headers=headers)
    response.raise_for_status()
    return response.json()
 
@@ -64,7 +417,7 @@ def delete_post(post_id: int, site_url: str = "", jwt_token: str = "") -> dict:
 
     Args:
         post_id (int): The ID of the post to delete.
-        site_url (str): The base URL of the WordPress site.
+        site_url (str): The base URL of the WordPress site, or a tenant ID from the tenant registry.
         jwt_token (str): The JWT authentication token.
 
     Returns:
@@ -72,7 +425,7 @@ def delete_post(post_id: int, site_url: str = "", jwt_token: str = "") -> dict:
     """
     base_url, headers = get_wp_client(site_url, jwt_token)
     url = f"{base_url}/posts/{post_id}"
-    response = requests.delete(url, headers=headers)
+    response = tenant_request('DELETE', url, headers=headers)
     response.raise_for_status()
     return response.json()
 
@@ -85,40 +438,974 @@ def delete_post(post_id: int, site_url: str = "", jwt_token: str = "") -> dict:
 # ----------------------------WOO COMMERCE --------------------------------------------------------------------
 
 def get_woo_client(site_url=None, consumer_key=None, consumer_secret=None):
-    site_url = site_url or DEFAULT_SITE_URL
-    consumer_key = consumer_key or DEFAULT_WOCOMMERCE_CONSUMER_KEY
-    consumer_secret = consumer_secret or DEFAULT_WOCOMMERCE_CONSUMER_SECRET
-
-    if not consumer_key or not consumer_secret:
+    tenant = tenants.resolve(site_url, consumer_key, consumer_secret)
+    if tenant.headers is None:
         raise Exception('WooCommerce credentials not provided')
-        
-    base_url = f"{site_url}/wp-json/wc/v3"
-    # Prepare HTTP Basic Auth header
-    user_pass = f"{consumer_key}:{consumer_secret}"
-    b64_auth = base64.b64encode(user_pass.encode()).decode()
-    headers = {
-        'Content-Type': 'application/json',
-        'User-Agent': 'curl/7.64.1',
-        'Authorization': f'Basic {b64_auth}'
+    return tenant.base_url, tenant.headers
+
+# --- Compact records ---
+# Cached and mirrored orders, products and customers are held packed instead of as the
+# nested dicts from response.json(): each dict becomes a __slots__ record holding a key
+# tuple shared by every record of the same shape plus a tuple of values; lists of
+# same-shaped dicts (line items, meta data, listings) are stored column by column with
+# int/float columns in arrays; short strings (statuses, SKUs, currencies, meta keys) are
+# interned. expand() turns them back into the exact dicts the API returned.
+COMPACT_INTERN_CHARS = int(os.environ.get('MCP_COMPACT_INTERN_CHARS', '40'))
+_shapes = {}  # key tuple -> the one shared instance of it
+
+
+def _shape(data):
+    keys = tuple(data)
+    return _shapes.setdefault(keys, keys)
+
+
+class CompactRecord:
+    """A dict stored as a shared key tuple and a tuple of packed values."""
+    __slots__ = ('keys', 'values')
+
+    def __init__(self, data):
+        self.keys = _shape(data)
+        self.values = tuple(compact(value) for value in data.values())
+
+    def __getitem__(self, key):
+        try:
+            return expand(self.values[self.keys.index(key)])
+        except ValueError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return self[key] if key in self.keys else default
+
+    def to_dict(self):
+        return {key: expand(value) for key, value in zip(self.keys, self.values)}
+
+
+class CompactTable:
+    """A list of dicts with the same keys stored as one packed column per key."""
+    __slots__ = ('keys', 'columns')
+
+    def __init__(self, rows):
+        self.keys = _shape(rows[0])
+        self.columns = tuple(_compact_column([row[key] for row in rows]) for key in self.keys)
+
+    def to_list(self):
+        columns = [[expand(value) for value in column] if isinstance(column, tuple) else column.tolist()
+                   for column in self.columns]
+        return [dict(zip(self.keys, values)) for values in zip(*columns)]
+
+
+def _compact_column(values):
+    kinds = {type(value) for value in values}
+    if kinds == {int} and -2 ** 63 <= min(values) and max(values) < 2 ** 63:
+        return array.array('q', values)
+    if kinds == {float}:
+        return array.array('d', values)
+    return tuple(compact(value) for value in values)
+
+
+def compact(value):
+    """Pack a JSON value (dicts, lists, strings, numbers) into compact records."""
+    if isinstance(value, dict):
+        return CompactRecord(value)
+    if isinstance(value, list):
+        first = value[0] if value else None
+        if isinstance(first, dict) and first and all(
+                isinstance(row, dict) and tuple(row) == tuple(first) for row in value):
+            return CompactTable(value)
+        return tuple(compact(item) for item in value)
+    if isinstance(value, str) and len(value) <= COMPACT_INTERN_CHARS:
+        return sys.intern(value)
+    return value
+
+
+def expand(value):
+    """Inverse of compact(): fresh dicts and lists, equal to the original value."""
+    if isinstance(value, CompactRecord):
+        return value.to_dict()
+    if isinstance(value, CompactTable):
+        return value.to_list()
+    if isinstance(value, tuple):
+        return [expand(item) for item in value]
+    return value
+
+
+# --- Entity cache ---
+# GET responses from the WooCommerce API are cached per (base_url, path, params).
+# Writes made through woo_send() and webhook deliveries (see invalidate_cache) drop
+# the affected entity, its subresources, its collection listings and all reports,
+# so the TTL can be long when the store's webhooks point at main.py. Expired entries
+# whose response carried an ETag or Last-Modified header are kept and revalidated
+# with a conditional request; a 304 answer renews them without a response body.
+ENTITY_CACHE_TTL = int(os.environ.get('MCP_ENTITY_CACHE_TTL', '300'))
+ENTITY_CACHE_SIZE = int(os.environ.get('MCP_ENTITY_CACHE_SIZE', '5000'))
+
+
+def _validators(response):
+    """The response's cache validators, or None when it has none."""
+    validators = {name: response.headers[header] for name, header in
+                  (('etag', 'ETag'), ('last_modified', 'Last-Modified')) if response.headers.get(header)}
+    return validators or None
+
+
+def _conditional_headers(validators):
+    headers = {}
+    if validators.get('etag'):
+        headers['If-None-Match'] = validators['etag']
+    if validators.get('last_modified'):
+        headers['If-Modified-Since'] = validators['last_modified']
+    return headers
+
+
+class EntityCache:
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (base_url, path, params) -> (expires_at, compacted value, validators)
+        self._lock = threading.RLock()
+        self.changes = 0
+
+    def _value(self, key, entry):
+        if isinstance(entry[1], SnapshotValue):
+            # Restored from a snapshot: decode on first use
+            data = entry[1].load()
+            self._entries[key] = (entry[0], compact(data), entry[2])
+            return data
+        return expand(entry[1])
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                if entry[2] is None:
+                    del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return self._value(key, entry)
+
+    def validators(self, key):
+        """Validators of an expired entry that can be revalidated, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[2] if entry is not None and entry[0] < time.time() else None
+
+    def renew(self, key):
+        """Extend an entry the store confirmed unchanged (HTTP 304) and return its value."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries[key] = entry = (time.time() + self.ttl, entry[1], entry[2])
+            self._entries.move_to_end(key)
+            return self._value(key, entry)
+
+    def set(self, key, value, validators=None):
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, compact(value), validators)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.changes += 1
+
+    def restore(self, key, expires_at, value, validators=None):
+        """Add a snapshot entry, keeping entries cached since startup."""
+        with self._lock:
+            if key not in self._entries and len(self._entries) < self.max_entries:
+                self._entries[key] = (expires_at, value, validators)
+                self._entries.move_to_end(key, last=False)
+
+    def export(self, base_url):
+        """(key, expires_at, value, validators) of the site's usable entries, oldest first."""
+        now = time.time()
+        with self._lock:
+            return [(key,) + entry for key, entry in self._entries.items()
+                    if key[0] == base_url and (entry[0] >= now or entry[2] is not None)]
+
+    def sites(self):
+        with self._lock:
+            return {key[0] for key in self._entries}
+
+    def invalidate(self, base_url, path):
+        """
+        Drop `path`, everything below it, listings of its collection and all reports,
+        plus the entities it belongs to and their listings: a refund or note written to
+        orders/5 changes orders/5 itself, a variation changes its parent product.
+        """
+        path = path.strip('/')
+        collection = path.rsplit('/', 1)[0] if path.rsplit('/', 1)[-1].isdigit() else path
+        parts = path.split('/')
+        parents = set()
+        for i, part in enumerate(parts[:-1]):
+            if part.isdigit():
+                parents.update(('/'.join(parts[:i + 1]), '/'.join(parts[:i])))
+        with self._lock:
+            stale = [
+                key for key in self._entries
+                if key[0] == base_url and (
+                    key[1] == path or key[1].startswith(path + '/')
+                    or key[1] == collection or key[1] in parents or key[1].startswith('reports')
+                )
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.changes += bool(stale)
+        return len(stale)
+
+    def count(self, base_url):
+        with self._lock:
+            return sum(1 for key in self._entries if key[0] == base_url)
+
+
+entity_cache = EntityCache(ENTITY_CACHE_TTL, ENTITY_CACHE_SIZE)
+
+
+def _split_woo_url(url):
+    base_url, sep, path = url.partition('/wp-json/wc/v3/')
+    return base_url + '/wp-json/wc/v3', path.strip('/')
+
+
+def woo_get(url, headers, params=None):
+    """GET a WooCommerce API resource through the entity cache."""
+    base_url, path = _split_woo_url(url)
+    key = (base_url, path, json.dumps(params or {}, sort_keys=True, default=str))
+    cached = entity_cache.get(key)
+    tenant = tenants.for_url(url)
+    if tenant is not None:
+        tenant.count(cache_hits=int(cached is not None), cache_misses=int(cached is None))
+    if cached is not None:
+        return cached
+    validators = entity_cache.validators(key)
+    request_headers = {**headers, **_conditional_headers(validators)} if validators else headers
+    response = tenant_request('GET', url, params=params, headers=request_headers)
+    if validators and response.status_code == 304:
+        data = entity_cache.renew(key)
+        if data is not None:
+            return data
+        # Dropped meanwhile, e.g. by a write: fetch it in full
+        response = tenant_request('GET', url, params=params, headers=headers)
+    response.raise_for_status()
+    data = response.json()
+    entity_cache.set(key, data, _validators(response))
+    return data
+
+
+def woo_send(method, url, headers, params=None, json=None):
+    """Send a write request to the WooCommerce API and keep the entity cache coherent."""
+    response = tenant_request(method, url, params=params, json=json, headers=headers)
+    response.raise_for_status()
+    data = response.json()
+    base_url, path = _split_woo_url(url)
+    entity_cache.invalidate(base_url, path)
+    if method == 'PUT' and isinstance(data, dict) and path.rsplit('/', 1)[-1] == str(data.get('id')):
+        # The updated entity comes back in full, so refresh it instead of refetching later
+        entity_cache.set((base_url, path, '{}'), data)
+    _taxonomy_write(base_url, method, path, data)
+    return data
+
+
+@mcp.tool()
+def invalidate_cache(resource: str, entity_id: int = 0, payload: dict = None, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
+    """
+    Invalidate or refresh cached WooCommerce data after an external change.
+
+    Called by the webhook receiver in main.py for topics such as product.updated or
+    order.deleted, and usable directly when data was changed outside this server.
+
+    Args:
+        resource (str): The webhook resource ('product', 'order', 'customer', 'coupon').
+        entity_id (int): The ID of the changed entity. 0 drops the whole collection.
+        payload (dict, optional): The entity as delivered by the webhook. When given,
+            the cache is refreshed with it instead of only being invalidated.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
+        consumer_key (str): The WooCommerce REST API consumer key.
+        consumer_secret (str): The WooCommerce REST API consumer secret.
+
+    Returns:
+        dict: The invalidated path and the number of dropped cache entries.
+    """
+    base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
+    path = f"{resource}s"
+    if payload and payload.get('type') == 'variation' and payload.get('parent_id'):
+        path = f"products/{payload['parent_id']}/variations"
+    if entity_id:
+        path = f"{path}/{entity_id}"
+    dropped = entity_cache.invalidate(base_url, path)
+    if payload and entity_id:
+        entity_cache.set((base_url, path, '{}'), payload)
+    tracker = _inventory_trackers.get(base_url)
+    if tracker is not None and resource == 'product' and entity_id:
+        if payload:
+            tracker.apply(payload)
+        else:
+            tracker.remove(entity_id)
+    rollups = _rollups.get(base_url)
+    if rollups is not None and resource == 'order' and entity_id and not payload:
+        rollups.remove_order(entity_id)
+    return {'path': path, 'dropped': dropped, 'refreshed': bool(payload and entity_id)}
+
+
+# --- Result store ---
+# Full results are kept behind short handles so the agent can page, filter and sort
+# them locally instead of re-querying the store. Recently used results stay in memory
+# up to RESULT_STORE_MEMORY_BYTES; older ones spill to JSON files under CACHE_DIR and
+# are reloaded on access. At most RESULT_HANDLE_LIMIT handles are kept in total. Handles
+# only live as long as the process, so each process spills into its own directory and
+# removes it at exit; directories left behind by processes that did not exit cleanly are
+# removed at startup once they are RESULT_SPILL_MAX_AGE seconds old.
+CACHE_DIR = os.environ.get('MCP_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.mcp_cache'))
+RESULT_STORE_MEMORY_BYTES = int(os.environ.get('MCP_RESULT_STORE_MEMORY_BYTES', str(64 * 1024 * 1024)))
+RESULT_HANDLE_LIMIT = int(os.environ.get('MCP_RESULT_HANDLE_LIMIT', '256'))
+RESULT_SPILL_MAX_AGE = int(os.environ.get('MCP_RESULT_SPILL_MAX_AGE', '86400'))
+
+
+class ResultStore:
+    def __init__(self, directory, memory_bytes, max_handles):
+        self.root = directory
+        self.directory = os.path.join(directory, f'{os.getpid()}-{uuid.uuid4().hex[:8]}')
+        self.memory_bytes = memory_bytes
+        self.max_handles = max_handles
+        self._memory = OrderedDict()  # handle -> (data, size)
+        self._spilled = OrderedDict()  # handle -> path
+        self._used_bytes = 0
+        self._lock = threading.RLock()
+
+    def put(self, data):
+        handle = uuid.uuid4().hex[:12]
+        size = len(json.dumps(data, default=str))
+        with self._lock:
+            self._memory[handle] = (data, size)
+            self._used_bytes += size
+            self._evict()
+        return handle
+
+    def get(self, handle):
+        with self._lock:
+            if handle in self._memory:
+                self._memory.move_to_end(handle)
+                return self._memory[handle][0]
+            path = self._spilled.pop(handle, None)
+            if path is None:
+                raise Exception(f'Unknown or expired result handle: {handle}')
+            size = os.path.getsize(path)
+            with open(path) as f:
+                data = json.load(f)
+            os.remove(path)
+            self._memory[handle] = (data, size)
+            self._used_bytes += size
+            self._evict()
+            return data
+
+    def _evict(self):
+        # Spill least recently used results to disk, always keeping the newest one in memory
+        while self._used_bytes > self.memory_bytes and len(self._memory) > 1:
+            handle, (data, size) = self._memory.popitem(last=False)
+            self._used_bytes -= size
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f'{handle}.json')
+            with open(path, 'w') as f:
+                json.dump(data, f, default=str)
+            self._spilled[handle] = path
+        while len(self._memory) + len(self._spilled) > self.max_handles and self._spilled:
+            _, path = self._spilled.popitem(last=False)
+            if os.path.exists(path):
+                os.remove(path)
+        while len(self._memory) > self.max_handles:
+            _, (_, size) = self._memory.popitem(last=False)
+            self._used_bytes -= size
+
+    def sweep(self, max_age):
+        """Remove spill files and directories of other processes older than max_age seconds."""
+        if not os.path.isdir(self.root):
+            return
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            try:
+                if path == self.directory or time.time() - os.path.getmtime(path) < max_age:
+                    continue
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def close(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+_result_store = ResultStore(os.path.join(CACHE_DIR, 'results'), RESULT_STORE_MEMORY_BYTES, RESULT_HANDLE_LIMIT)
+_result_store.sweep(RESULT_SPILL_MAX_AGE)
+atexit.register(_result_store.close)
+
+
+PAGE_FETCH_WORKERS = int(os.environ.get('MCP_PAGE_FETCH_WORKERS', '4'))
+
+
+def _iter_pages(url, headers, params, max_pages=0, workers=PAGE_FETCH_WORKERS):
+    """
+    Yield (page, total_pages, records) for consecutive pages starting at params['page'].
+
+    The first page is fetched alone to read X-WP-TotalPages; the remaining pages are
+    fetched up to `workers` at a time but yielded in order, so at most `workers`
+    pages are held in memory. Stops when exhausted or after max_pages (0 = all).
+    """
+    start_page = params.get('page', 1)
+
+    def fetch(page):
+        response = tenant_request('GET', url, params={**params, 'page': page}, headers=headers)
+        response.raise_for_status()
+        return response
+
+    first = fetch(start_page)
+    total_pages = int(first.headers.get('X-WP-TotalPages', 0) or 0)
+    batch = first.json()
+    yield start_page, total_pages, batch
+    if not batch:
+        return
+    last_page = start_page + max_pages - 1 if max_pages else total_pages
+    if total_pages:
+        last_page = min(last_page, total_pages)
+    elif batch and last_page != start_page:
+        # No paging headers: walk pages one by one until an empty page
+        page = start_page + 1
+        while not last_page or page <= last_page:
+            batch = fetch(page).json()
+            if not batch:
+                return
+            yield page, 0, batch
+            page += 1
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        next_page = start_page + 1
+        while next_page <= last_page or pending:
+            while next_page <= last_page and len(pending) < workers:
+                pending.append((next_page, pool.submit(fetch, next_page)))
+                next_page += 1
+            page, future = pending.popleft()
+            yield page, total_pages, future.result().json()
+
+
+def _fetch_pages(url, headers, params, max_pages=0):
+    """Fetch consecutive pages starting at params['page'] until exhausted or max_pages (0 = all)."""
+    params = {'page': 1, **params}
+    records = []
+    for _, _, batch in _iter_pages(url, headers, params, max_pages):
+        records.extend(batch)
+    return records
+
+
+# --- Sliced scans ---
+# page=N listings become LIMIT/OFFSET queries that slow down the deeper they go, so a full
+# scan with plain paging costs time quadratic in the row count on large stores. Scans of
+# orders and products are sliced into date_created windows instead, and customers (which
+# have no date filters) into windows of IDs passed as `include`. Every window is read
+# from its first page or two, so no query carries a deep offset. Windows are fetched
+# SCAN_WORKERS at a time and sized from the counts observed so far: a window holding
+# more than SCAN_MAX_WINDOW_ROWS rows keeps its first page and splits the rest into
+# pieces of about SCAN_TARGET_ROWS.
+SCAN_WORKERS = int(os.environ.get('MCP_SCAN_WORKERS', str(PAGE_FETCH_WORKERS)))
+SCAN_TARGET_ROWS = int(os.environ.get('MCP_SCAN_TARGET_ROWS', '200'))
+SCAN_MAX_WINDOW_ROWS = int(os.environ.get('MCP_SCAN_MAX_WINDOW_ROWS', '400'))
+SCAN_MAX_INCLUDE_IDS = int(os.environ.get('MCP_SCAN_MAX_INCLUDE_IDS', '500'))
+SCAN_RESOURCES = {'orders': 'date', 'products': 'date', 'customers': 'id'}
+
+
+GMT_SUFFIX = re.compile(r'(?:\.\d+)?(?:Z|([+-])(\d\d):?(\d\d))?$')
+
+
+def _parse_gmt(value):
+    """
+    Seconds for a GMT 'YYYY-MM-DD' or 'YYYY-MM-DDTHH:MM:SS' value; None when empty.
+    Fractional seconds are ignored and a 'Z' or '+HH:MM' suffix is converted to GMT.
+    """
+    if not value:
+        return None
+    timestamp = value.strip().replace(' ', 'T')
+    suffix = GMT_SUFFIX.match(timestamp, 19)
+    try:
+        if len(timestamp) == 10:
+            return calendar.timegm(time.strptime(timestamp, '%Y-%m-%d'))
+        if suffix is None:
+            raise ValueError(value)
+        seconds = calendar.timegm(time.strptime(timestamp[:19], '%Y-%m-%dT%H:%M:%S'))
+    except ValueError:
+        raise Exception(f"Invalid date '{value}': use YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS (GMT)") from None
+    sign, hours, minutes = suffix.groups()
+    if sign:
+        seconds -= (1 if sign == '+' else -1) * (int(hours) * 3600 + int(minutes) * 60)
+    return seconds
+
+
+def _normalize_dates(filters, keys=('after', 'before', 'modified_after', 'modified_before')):
+    """Expand date-only filters to the full timestamps the REST API expects."""
+    return {key: _gmt_timestamp(_parse_gmt(value)) if key in keys and value else value
+            for key, value in filters.items()}
+
+
+def _get_page(url, headers, params):
+    response = tenant_request('GET', url, params=params, headers=headers)
+    response.raise_for_status()
+    return response.json(), int(response.headers.get('X-WP-Total', 0) or 0)
+
+
+def _read_window(url, headers, params, first, total):
+    """Read the pages after `first` of a window that fits in a few pages."""
+    records = list(first)
+    page = 2
+    while len(records) < total:
+        batch, _ = _get_page(url, headers, {**params, 'page': page})
+        if not batch:
+            break
+        records.extend(batch)
+        page += 1
+    return records
+
+
+def _scan_date_window(url, headers, filters, lo, hi):
+    """Return (records with lo <= date_created_gmt < hi, windows still to scan)."""
+    # after/before are widened by a second and the boundaries enforced locally, so it
+    # does not matter whether the API treats them as inclusive
+    params = {**filters, 'after': _gmt_timestamp(lo - 1), 'before': _gmt_timestamp(hi),
+              'dates_are_gmt': True, 'orderby': 'date', 'order': 'asc', 'per_page': 100, 'page': 1}
+    first, total = _get_page(url, headers, params)
+    # Records without a creation date cannot fall in any window
+    dated = [(ts, record) for ts, record in
+             ((_parse_gmt(record.get('date_created_gmt')), record) for record in first) if ts is not None]
+    if total > SCAN_MAX_WINDOW_ROWS and dated and dated[-1][0] == lo and hi - lo > 1:
+        # The whole first page is in second lo: read that second alone in full and
+        # scan the rest of the window separately, instead of deep-paging the window
+        return [], [(lo, lo + 1), (lo + 1, hi)]
+    if total > SCAN_MAX_WINDOW_ROWS and dated and dated[-1][0] > lo:
+        # Keep the first page up to its last second (that second may continue on page 2)
+        # and split the rest of the window by the density seen so far
+        cut = dated[-1][0]
+        kept = [record for ts, record in dated if lo <= ts < cut]
+        pieces = min(max(2, -(-(total - len(kept)) // SCAN_TARGET_ROWS)), hi - cut)
+        step = (hi - cut) / pieces
+        bounds = [cut + round(step * i) for i in range(pieces)] + [hi]
+        return kept, [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+    # Small enough to read whole (or a single second that cannot be split further)
+    records = _read_window(url, headers, params, first, total)
+    return [r for r in records if lo <= (_parse_gmt(r.get('date_created_gmt')) or -1) < hi], []
+
+
+def _scan_id_window(url, headers, filters, lo, hi):
+    params = {**filters, 'include': ','.join(str(i) for i in range(lo, hi)), 'orderby': 'id',
+              'order': 'asc', 'per_page': 100, 'page': 1}
+    first, total = _get_page(url, headers, params)
+    return _read_window(url, headers, params, first, total)
+
+
+def _scan_bounds(url, headers, filters, mode):
+    """(first key, last key + 1, matching rows) for the scan, or None when nothing matches."""
+    field = 'date_created_gmt' if mode == 'date' else 'id'
+    probe = {**filters, 'per_page': 1, 'page': 1, 'orderby': 'date' if mode == 'date' else 'id', '_fields': f'id,{field}'}
+    if mode == 'date':
+        probe['dates_are_gmt'] = True
+    oldest, total = _get_page(url, headers, {**probe, 'order': 'asc'})
+    if not oldest:
+        return None
+    if mode == 'id':
+        newest, _ = _get_page(url, headers, {**probe, 'order': 'desc'})
+        return oldest[0]['id'], newest[0]['id'] + 1, total
+    # `before` is exclusive, like the windows' upper bounds
+    hi = _parse_gmt(filters['before']) if filters.get('before') else int(time.time()) + 2
+    lo = _parse_gmt(oldest[0].get('date_created_gmt'))
+    if lo is None:
+        # Undated records sort first; start from the filter (or the epoch) instead
+        lo = _parse_gmt(filters.get('after')) or 0
+    return lo, hi, total
+
+
+def iter_scan(base_url, headers, resource, filters=None, workers=SCAN_WORKERS):
+    """
+    Yield batches of every `resource` record matching `filters` using sliced windows.
+
+    Batches arrive in completion order, not sorted. Filters are passed through to the
+    API; for orders and products, `after`/`before` are GMT dates (YYYY-MM-DD or
+    YYYY-MM-DDTHH:MM:SS).
+    """
+    mode = SCAN_RESOURCES.get(resource)
+    if mode is None:
+        raise Exception(f"Unsupported scan resource: {resource}. Use one of {', '.join(SCAN_RESOURCES)}")
+    url = f"{base_url}/{resource}"
+    filters = {key: value for key, value in (filters or {}).items() if key not in ('page', 'per_page', 'orderby', 'order')}
+    filters = _normalize_dates(filters)
+    bounds = _scan_bounds(url, headers, filters, mode)
+    if bounds is None:
+        return
+    lo, hi, total = bounds
+    rows = 0
+    pool = ThreadPoolExecutor(max_workers=workers)
+    pending = set()
+    try:
+        if mode == 'date':
+            step = max(1, (hi - lo) // (workers * 2))
+            for start in range(lo, hi, step):
+                pending.add(pool.submit(_scan_date_window, url, headers, filters, start, min(start + step, hi)))
+        cursor = lo
+        ids_seen = rows_in_ids = 0
+        while pending or (mode == 'id' and cursor < hi):
+            while mode == 'id' and cursor < hi and len(pending) < workers:
+                # Size ID windows from the density of the IDs read so far
+                density = rows_in_ids / ids_seen if ids_seen else 1.0
+                size = int(min(SCAN_MAX_INCLUDE_IDS, max(100, SCAN_TARGET_ROWS / max(density, 0.01))))
+                future = pool.submit(_scan_id_window, url, headers, filters, cursor, min(cursor + size, hi))
+                future.id_count = min(cursor + size, hi) - cursor
+                pending.add(future)
+                cursor += size
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if mode == 'date':
+                    batch, windows = future.result()
+                    for a, b in windows:
+                        pending.add(pool.submit(_scan_date_window, url, headers, filters, a, b))
+                else:
+                    batch = future.result()
+                    ids_seen += future.id_count
+                    rows_in_ids += len(batch)
+                if batch:
+                    rows += len(batch)
+                    report_job_progress(rows, total, f"{rows} of {total} {resource} scanned")
+                    yield batch
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def scan_all(base_url, headers, resource, filters=None, max_rows=0):
+    records = []
+    for batch in iter_scan(base_url, headers, resource, filters):
+        records.extend(batch)
+        if max_rows and len(records) >= max_rows:
+            return records[:max_rows]
+    return records
+
+
+@mcp.tool()
+def scan_records(resource: str, filters: dict = None, max_rows: int = 0, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
+    """
+    Read every order, product or customer matching a filter, fast even on very large stores.
+
+    Unlike paging with get_orders/get_products (whose deep pages get slower and slower),
+    the scan is split into date or ID windows fetched in parallel. Records come back
+    unsorted; use filter_result(handle, ..., sort_by=...) to order them.
+
+    Args:
+        resource (str): 'orders', 'products' or 'customers'.
+        filters (dict, optional): API filters, e.g. {"status": "completed",
+            "after": "2024-01-01"} (GMT, YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS) or
+            {"role": "all"} for customers.
+        max_rows (int): Stop after this many records (0 = all).
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
+        consumer_key (str): The WooCommerce REST API consumer key.
+        consumer_secret (str): The WooCommerce REST API consumer secret.
+
+    Returns:
+        dict: A summary of the records with a handle for read_result/filter_result.
+    """
+    base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
+    return summarize_with_handle(resource, scan_all(base_url, headers, resource, filters, max_rows))
+
+
+# --- Result summarization ---
+# Large list results are compacted before they reach the agent: each record is reduced
+# to its key fields, values shared by every record are hoisted out, and only as many
+# rows as fit in RESULT_MAX_CHARS are inlined. The full result stays available through
+# a handle that read_result() can page through.
+RESULT_MAX_CHARS = int(os.environ.get('MCP_RESULT_MAX_CHARS', '20000'))
+RESULT_PREVIEW_ITEMS = int(os.environ.get('MCP_RESULT_PREVIEW_ITEMS', '5'))
+
+SUMMARY_FIELDS = {
+    'orders': ['id', 'number', 'status', 'date_created', 'currency', 'total', 'customer_id',
+               'billing.first_name', 'billing.last_name', 'billing.email', 'payment_method', 'line_items'],
+    'products': ['id', 'name', 'sku', 'type', 'status', 'price', 'regular_price', 'sale_price',
+                 'stock_status', 'stock_quantity', 'total_sales', 'categories'],
+    'customers': ['id', 'email', 'first_name', 'last_name', 'username', 'role',
+                  'is_paying_customer', 'date_created', 'billing.city', 'billing.country'],
+    'refunds': ['order_id', 'order_number', 'id', 'date_created', 'amount', 'reason', 'refunded_by', 'refunded_payment'],
+    'notes': ['order_id', 'order_number', 'id', 'date_created', 'author', 'customer_note', 'note'],
+}
+SUMMARY_COUNT_FIELDS = ('status', 'stock_status', 'type', 'role', 'currency', 'payment_method')
+SUMMARY_TOTAL_FIELDS = ('total', 'stock_quantity', 'total_sales', 'amount')
+
+
+def _record_value(record, path):
+    value = record
+    for part in path.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _field_value(record, path):
+    value = _record_value(record, path)
+    if isinstance(value, list):
+        # Collapse nested collections (line_items, categories) to their size
+        return len(value)
+    if isinstance(value, dict):
+        return None
+    return value
+
+
+def _to_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def summarize_records(kind, records):
+    """
+    Build a compact tabular summary of a list of records.
+
+    Returns a dict with the shared values (`common`), the remaining `columns`,
+    one row per record, per-value counts for categorical fields and totals for
+    numeric fields.
+    """
+    fields = SUMMARY_FIELDS.get(kind)
+    if fields is None:
+        fields = sorted({key for record in records if isinstance(record, dict)
+                         for key, value in record.items() if not isinstance(value, (dict, list))})
+    rows = [[_field_value(record, field) for field in fields] for record in records]
+
+    common = {}
+    columns = []
+    for index, field in enumerate(fields):
+        values = {json.dumps(row[index], default=str) for row in rows}
+        if len(rows) > 1 and len(values) == 1:
+            common[field] = rows[0][index]
+        else:
+            columns.append(index)
+
+    counts = {}
+    totals = {}
+    for index, field in enumerate(fields):
+        if field in SUMMARY_COUNT_FIELDS:
+            counts[field] = dict(Counter(str(row[index]) for row in rows))
+        elif field in SUMMARY_TOTAL_FIELDS:
+            numbers = [_to_number(row[index]) for row in rows]
+            totals[field] = round(sum(n for n in numbers if n is not None), 2)
+
+    return {
+        'count': len(records),
+        'common': common,
+        'columns': [fields[index] for index in columns],
+        'rows': [[row[index] for index in columns] for row in rows],
+        'counts': counts,
+        'totals': totals,
     }
-    return base_url, headers
+
+
+def _compact_value(value, depth=0):
+    if isinstance(value, list):
+        items = [_compact_value(item, depth + 1) for item in value[:RESULT_PREVIEW_ITEMS]]
+        if len(value) > RESULT_PREVIEW_ITEMS:
+            items.append(f"... {len(value) - RESULT_PREVIEW_ITEMS} more")
+        return items
+    if isinstance(value, dict):
+        if depth >= 2:
+            return {key: item for key, item in value.items() if not isinstance(item, (dict, list))}
+        return {key: _compact_value(item, depth + 1) for key, item in value.items()}
+    return value
+
+
+def summarize_with_handle(kind, records):
+    """Store a full list result and return its summary, trimmed to RESULT_MAX_CHARS, with the handle."""
+    summary = summarize_records(kind, records)
+    summary['handle'] = _result_store.put(records)
+    shown = len(summary['rows'])
+    while shown > 1 and len(json.dumps(summary, default=str)) > RESULT_MAX_CHARS:
+        shown //= 2
+        summary['rows'] = summary['rows'][:shown]
+    summary['note'] = (f"Showing {shown} of {len(records)} {kind}. Use read_result(handle, offset, limit, fields) "
+                       f"to page through full records or filter_result(handle, expr) to narrow them down.")
+    return summary
+
+
+def summarize_result(kind):
+    """
+    Decorator for tools whose raw output can be too large for the agent context.
+
+    Results that serialize to at most RESULT_MAX_CHARS are returned unchanged.
+    Larger lists are replaced by summarize_with_handle(), larger dicts by a
+    depth-limited preview. Either way the full result is kept in the result
+    store and its handle returned for read_result().
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            data = func(*args, **kwargs)
+            if len(json.dumps(data, default=str)) <= RESULT_MAX_CHARS:
+                return data
+            if isinstance(data, list):
+                return summarize_with_handle(kind, data)
+            return {
+                'handle': _result_store.put(data),
+                'preview': _compact_value(data),
+                'note': "Nested lists are truncated. Use read_result(handle) to read the full result.",
+            }
+        return wrapper
+    return decorator
+
+
+FILTER_OPERATORS = {
+    '>=': lambda a, b: a >= b,
+    '<=': lambda a, b: a <= b,
+    '!=': lambda a, b: a != b,
+    '==': lambda a, b: a == b,
+    '>': lambda a, b: a > b,
+    '<': lambda a, b: a < b,
+    ' contains ': lambda a, b: str(b).lower() in str(a).lower(),
+}
+
+
+# ' and ' outside single or double quotes
+FILTER_AND = re.compile(r""" and (?=(?:[^'"]|'[^']*'|"[^"]*")*$)""")
+
+
+def _parse_filter(expr):
+    """
+    Parse "field op value [and field op value ...]" into (field, compare, value) clauses.
+    Quoted values may contain ' and ' and operators, e.g. "company == 'Smith and Sons'".
+    """
+    clauses = []
+    for clause in FILTER_AND.split(expr):
+        # The operator is the first one before any quote
+        head = re.split(r"""['"]""", clause, maxsplit=1)[0]
+        found = [(head.find(op), -len(op), op) for op in FILTER_OPERATORS if op in head]
+        if not found:
+            raise Exception(f'Invalid filter clause: {clause!r}')
+        op = min(found)[2]
+        field, _, value = clause.partition(op)
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in '\'"':
+            value = value[1:-1]
+        clauses.append((field.strip(), FILTER_OPERATORS[op], value))
+    return clauses
+
+
+def _matches(record, clauses):
+    for field, compare, expected in clauses:
+        actual = _record_value(record, field)
+        actual_number, expected_number = _to_number(actual), _to_number(expected)
+        try:
+            if actual_number is not None and expected_number is not None:
+                ok = compare(actual_number, expected_number)
+            else:
+                ok = compare('' if actual is None else str(actual), expected)
+        except TypeError:
+            ok = False
+        if not ok:
+            return False
+    return True
+
+
+def _sort_key(field):
+    def key(record):
+        value = _record_value(record, field)
+        number = _to_number(value)
+        # Numbers sort before strings, missing values last
+        return (value is None, number is None, number if number is not None else str(value))
+    return key
+
+
+@mcp.tool()
+def read_result(handle: str, offset: int = 0, limit: int = 20, fields: list = None) -> Union[list, dict]:
+    """
+    Page through a full result stored behind a handle without calling the store again.
+
+    Args:
+        handle (str): The handle returned by a summarized tool, an as_handle call or filter_result.
+        offset (int): Index of the first record to return.
+        limit (int): Maximum number of records to return.
+        fields (list, optional): Field paths to keep in each record (e.g. ['id', 'status', 'billing.email']).
+
+    Returns:
+        dict: For list results, the requested records with the total count.
+            For other results, the full stored value.
+    """
+    data = _result_store.get(handle)
+    if not isinstance(data, list):
+        return data
+    items = data[offset:offset + limit]
+    if fields:
+        items = [{field: _record_value(item, field) for field in fields} for item in items]
+    return {'handle': handle, 'total': len(data), 'offset': offset, 'items': items}
+
+
+@mcp.tool()
+def filter_result(handle: str, expr: str = "", sort_by: str = "", descending: bool = False, limit: int = 20, fields: list = None) -> dict:
+    """
+    Filter and sort a stored list result locally and store the outcome under a new handle.
+
+    Args:
+        handle (str): The handle of a stored list result.
+        expr (str): Filter expression made of clauses joined by ' and '. Each clause is
+            'field op value' where op is one of ==, !=, >, >=, <, <=, contains.
+            Field paths may be nested (e.g. "status == completed and total > 100",
+            "billing.email contains @example.com"). Quote values that contain ' and '
+            or an operator, e.g. "billing.company == 'Smith and Sons'". Empty keeps
+            all records.
+        sort_by (str, optional): Field path to sort by.
+        descending (bool): Whether to sort in descending order.
+        limit (int): Number of matching records to include in the response.
+        fields (list, optional): Field paths to keep in each returned record.
+
+    Returns:
+        dict: The new handle, the number of matching records and the first `limit` of them.
+    """
+    data = _result_store.get(handle)
+    if not isinstance(data, list):
+        raise Exception(f'Result {handle} is not a list and cannot be filtered')
+    matched = data
+    if expr:
+        clauses = _parse_filter(expr)
+        matched = [record for record in data if _matches(record, clauses)]
+    if sort_by:
+        matched = sorted(matched, key=_sort_key(sort_by), reverse=descending)
+    new_handle = _result_store.put(matched)
+    result = read_result(new_handle, 0, limit, fields)
+    result['source_handle'] = handle
+    return result
 
 @mcp.tool()
-def get_orders(per_page: int = 10, page: int = 1, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> list:
+@summarize_result('orders')
+def get_orders(per_page: int = 10, page: int = 1, as_handle: bool = False, max_pages: int = 1, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> Union[list, dict]:
+    """
+    Get a page of WooCommerce orders.
+
+    Args:
+        per_page (int): Number of orders per page.
+        page (int): Page number to retrieve.
+        as_handle (bool): Store the full result set in the result store and return a
+            summary with a handle for read_result/filter_result instead of the raw orders.
+        max_pages (int): With as_handle, number of consecutive pages to fetch starting at
+            `page` (0 fetches all remaining pages; from page 1 this is a sliced scan, see scan_records).
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
+        consumer_key (str): The WooCommerce REST API consumer key.
+        consumer_secret (str): The WooCommerce REST API consumer secret.
+
+    Returns:
+        list: List of order dictionaries, or a summary dict with a result handle.
+    """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'per_page': per_page, 'page': page}
     try:
-        print('MCP get_orders request:')
-        print('URL:', f"{base_url}/orders")
-        print('Headers:', headers)
-        print('Params:', params)
-        response = requests.get(f"{base_url}/orders", params=params, headers=headers)
-        response.raise_for_status()
-        return response.json()
+        if as_handle:
+            if page == 1 and not max_pages:
+                # Whole result set: sliced scan instead of ever-deeper pages
+                return summarize_with_handle('orders', scan_all(base_url, headers, 'orders'))
+            return summarize_with_handle('orders', _fetch_pages(f"{base_url}/orders", headers, params, max_pages))
+        return woo_get(f"{base_url}/orders", headers, params)
     except Exception as e:
-        print('MCP get_orders error:', str(e))
+        # stdout is the stdio transport's JSON-RPC channel, so diagnostics go to stderr
+        print('MCP get_orders error:', str(e), file=sys.stderr)
         if hasattr(e, 'response') and e.response is not None:
-            print('Response text:', e.response.text)
+            print('Response text:', e.response.text, file=sys.stderr)
         raise
 
 @mcp.tool()
@@ -165,7 +1452,7 @@ def create_order(order_data: dict, site_url: str = "", consumer_key: str = "", c
                 - total (str): Shipping cost as string
             Optional fields:
             - meta_data (list): List of meta data objects
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -173,9 +1460,7 @@ def create_order(order_data: dict, site_url: str = "", consumer_key: str = "", c
         dict: The created order data from the WooCommerce API.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.post(f"{base_url}/orders", json=order_data, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('POST', f"{base_url}/orders", headers, json=order_data)
 
 @mcp.tool()
 def update_order(order_id: int, order_data: dict, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -221,7 +1506,7 @@ def update_order(order_id: int, order_data: dict, site_url: str = "", consumer_k
                 - method_title (str): Shipping method title
                 - total (str): Shipping cost as string
             - meta_data (list): List of meta data objects
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -229,9 +1514,7 @@ def update_order(order_id: int, order_data: dict, site_url: str = "", consumer_k
         dict: The updated order data from the WooCommerce API.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.put(f"{base_url}/orders/{order_id}", json=order_data, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('PUT', f"{base_url}/orders/{order_id}", headers, json=order_data)
 
 @mcp.tool()
 def delete_order(order_id: int, force: bool = True, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -241,7 +1524,7 @@ def delete_order(order_id: int, force: bool = True, site_url: str = "", consumer
     Args:
         order_id (int): The ID of the order to delete.
         force (bool): Whether to permanently delete the order (True) or move to trash (False).
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -250,17 +1533,36 @@ def delete_order(order_id: int, force: bool = True, site_url: str = "", consumer
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'force': force}
-    response = requests.delete(f"{base_url}/orders/{order_id}", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('DELETE', f"{base_url}/orders/{order_id}", headers, params=params)
 
 @mcp.tool()
-def get_products(per_page: int = 10, page: int = 1, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> list:
+@summarize_result('products')
+def get_products(per_page: int = 10, page: int = 1, as_handle: bool = False, max_pages: int = 1, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> Union[list, dict]:
+    """
+    Get a page of WooCommerce products.
+
+    Args:
+        per_page (int): Number of products per page.
+        page (int): Page number to retrieve.
+        as_handle (bool): Store the full result set in the result store and return a
+            summary with a handle for read_result/filter_result instead of the raw products.
+        max_pages (int): With as_handle, number of consecutive pages to fetch starting at
+            `page` (0 fetches all remaining pages; from page 1 this is a sliced scan, see scan_records).
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
+        consumer_key (str): The WooCommerce REST API consumer key.
+        consumer_secret (str): The WooCommerce REST API consumer secret.
+
+    Returns:
+        list: List of product dictionaries, or a summary dict with a result handle.
+    """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'per_page': per_page, 'page': page}
-    response = requests.get(f"{base_url}/products", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    if as_handle:
+        if page == 1 and not max_pages:
+            # Whole result set: sliced scan instead of ever-deeper pages
+            return summarize_with_handle('products', scan_all(base_url, headers, 'products'))
+        return summarize_with_handle('products', _fetch_pages(f"{base_url}/products", headers, params, max_pages))
+    return woo_get(f"{base_url}/products", headers, params)
 
 @mcp.tool()
 def create_product(product_data: dict, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -279,23 +1581,15 @@ def create_product(product_data: dict, site_url: str = "", consumer_key: str = "
             - images (list): List of image objects
             - attributes (list): List of attribute objects
             - meta_data (list): List of meta data objects
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
     Returns:
         dict: The created product data from the WooCommerce API.
     """
-    base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)  # Moved this line up
-
-    print('MCP create_product request:')
-    print('URL:', f"{base_url}/products")
-    print('Headers:', headers)
-    print('Params:', product_data)
-
-    response = requests.post(f"{base_url}/products", json=product_data, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
+    return woo_send('POST', f"{base_url}/products", headers, json=product_data)
 @mcp.tool()
 def update_product(product_id: int, product_data: dict, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
     """
@@ -313,7 +1607,7 @@ def update_product(product_id: int, product_data: dict, site_url: str = "", cons
             - images (list): List of image objects
             - attributes (list): List of attribute objects
             - meta_data (list): List of meta data objects
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -321,9 +1615,7 @@ def update_product(product_id: int, product_data: dict, site_url: str = "", cons
         dict: The updated product data from the WooCommerce API.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.put(f"{base_url}/products/{product_id}", json=product_data, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('PUT', f"{base_url}/products/{product_id}", headers, json=product_data)
 
 @mcp.tool()
 def delete_product(product_id: int, force: bool = True, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -333,7 +1625,7 @@ def delete_product(product_id: int, force: bool = True, site_url: str = "", cons
     Args:
         product_id (int): The ID of the product to delete.
         force (bool): Whether to permanently delete the product (True) or move to trash (False).
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -342,24 +1634,18 @@ def delete_product(product_id: int, force: bool = True, site_url: str = "", cons
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'force': force}
-    response = requests.delete(f"{base_url}/products/{product_id}", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('DELETE', f"{base_url}/products/{product_id}", headers, params=params)
 
 @mcp.tool()
 def get_product_categories(per_page: int = 10, page: int = 1, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> list:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'per_page': per_page, 'page': page}
-    response = requests.get(f"{base_url}/products/categories", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/products/categories", headers, params)
 
 @mcp.tool()
 def get_product_category(category_id: int, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.get(f"{base_url}/products/categories/{category_id}", headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/products/categories/{category_id}", headers)
 
 @mcp.tool()
 def create_product_category(category_data: dict, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -376,7 +1662,7 @@ def create_product_category(category_data: dict, site_url: str = "", consumer_ke
             - display (str): Category display type ('default', 'products', 'subcategories', or 'both')
             - image (dict): Category image data
             - menu_order (int): Menu order for the category
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -384,9 +1670,7 @@ def create_product_category(category_data: dict, site_url: str = "", consumer_ke
         dict: The created category data from the WooCommerce API.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.post(f"{base_url}/products/categories", json=category_data, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('POST', f"{base_url}/products/categories", headers, json=category_data)
 
 @mcp.tool()
 def update_product_category(category_id: int, category_data: dict, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -403,7 +1687,7 @@ def update_product_category(category_id: int, category_data: dict, site_url: str
             - display (str): Category display type ('default', 'products', 'subcategories', or 'both')
             - image (dict): Category image data
             - menu_order (int): Menu order for the category
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -411,9 +1695,7 @@ def update_product_category(category_id: int, category_data: dict, site_url: str
         dict: The updated category data from the WooCommerce API.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.put(f"{base_url}/products/categories/{category_id}", json=category_data, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('PUT', f"{base_url}/products/categories/{category_id}", headers, json=category_data)
 
 @mcp.tool()
 def delete_product_category(category_id: int, force: bool = True, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -423,7 +1705,7 @@ def delete_product_category(category_id: int, force: bool = True, site_url: str
     Args:
         category_id (int): The ID of the category to delete.
         force (bool): Whether to permanently delete the category (True) or move to trash (False).
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -432,24 +1714,19 @@ def delete_product_category(category_id: int, force: bool = True, site_url: str
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'force': force}
-    response = requests.delete(f"{base_url}/products/categories/{category_id}", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('DELETE', f"{base_url}/products/categories/{category_id}", headers, params=params)
 
 @mcp.tool()
-def get_customers(per_page: int = 10, page: int = 1, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> list:
+@summarize_result('customers')
+def get_customers(per_page: int = 10, page: int = 1, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> Union[list, dict]:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'per_page': per_page, 'page': page}
-    response = requests.get(f"{base_url}/customers", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/customers", headers, params)
 
 @mcp.tool()
 def get_customer(customer_id: int, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.get(f"{base_url}/customers/{customer_id}", headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/customers/{customer_id}", headers)
 
 @mcp.tool()
 def create_customer(customer_data: dict, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -467,7 +1744,7 @@ def create_customer(customer_data: dict, site_url: str = "", consumer_key: str =
             - shipping (dict): Shipping address information
             - is_paying_customer (bool): Whether the customer has made a purchase
             - meta_data (list): List of meta data objects
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -475,9 +1752,7 @@ def create_customer(customer_data: dict, site_url: str = "", consumer_key: str =
         dict: The created customer data from the WooCommerce API.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.post(f"{base_url}/customers", json=customer_data, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('POST', f"{base_url}/customers", headers, json=customer_data)
 
 @mcp.tool()
 def update_customer(customer_id: int, customer_data: dict, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -495,7 +1770,7 @@ def update_customer(customer_id: int, customer_data: dict, site_url: str = "", c
             - shipping (dict): Shipping address information
             - is_paying_customer (bool): Whether the customer has made a purchase
             - meta_data (list): List of meta data objects
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -503,9 +1778,7 @@ def update_customer(customer_id: int, customer_data: dict, site_url: str = "", c
         dict: The updated customer data from the WooCommerce API.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.put(f"{base_url}/customers/{customer_id}", json=customer_data, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('PUT', f"{base_url}/customers/{customer_id}", headers, json=customer_data)
 
 @mcp.tool()
 def delete_customer(customer_id: int, force: bool = True, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -515,7 +1788,7 @@ def delete_customer(customer_id: int, force: bool = True, site_url: str = "", co
     Args:
         customer_id (int): The ID of the customer to delete.
         force (bool): Whether to permanently delete the customer (True) or move to trash (False).
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -524,9 +1797,7 @@ def delete_customer(customer_id: int, force: bool = True, site_url: str = "", co
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'force': force}
-    response = requests.delete(f"{base_url}/customers/{customer_id}", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('DELETE', f"{base_url}/customers/{customer_id}", headers, params=params)
 
 
 # --- Product Variations ---
@@ -534,16 +1805,12 @@ def delete_customer(customer_id: int, force: bool = True, site_url: str = "", co
 def get_product_variations(product_id: int, per_page: int = 10, page: int = 1, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> list:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'per_page': per_page, 'page': page}
-    response = requests.get(f"{base_url}/products/{product_id}/variations", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/products/{product_id}/variations", headers, params)
 
 @mcp.tool()
 def get_product_variation(product_id: int, variation_id: int, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.get(f"{base_url}/products/{product_id}/variations/{variation_id}", headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/products/{product_id}/variations/{variation_id}", headers)
 
 @mcp.tool()
 def create_product_variation(product_id: int, variation_data: dict, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -561,7 +1828,7 @@ def create_product_variation(product_id: int, variation_data: dict, site_url: st
             - stock_quantity (int): Stock quantity
             - image (dict): Variation image data
             - meta_data (list): List of meta data objects
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -569,9 +1836,7 @@ def create_product_variation(product_id: int, variation_data: dict, site_url: st
         dict: The created variation data from the WooCommerce API.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.post(f"{base_url}/products/{product_id}/variations", json=variation_data, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('POST', f"{base_url}/products/{product_id}/variations", headers, json=variation_data)
 
 @mcp.tool()
 def update_product_variation(product_id: int, variation_id: int, variation_data: dict, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -589,7 +1854,7 @@ def update_product_variation(product_id: int, variation_id: int, variation_data:
             - attributes (list): List of variation attributes
             - image (dict): Variation image data
             - meta_data (list): List of meta data objects
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -597,9 +1862,7 @@ def update_product_variation(product_id: int, variation_id: int, variation_data:
         dict: The updated variation data from the WooCommerce API.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.put(f"{base_url}/products/{product_id}/variations/{variation_id}", json=variation_data, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('PUT', f"{base_url}/products/{product_id}/variations/{variation_id}", headers, json=variation_data)
 
 @mcp.tool()
 def delete_product_variation(product_id: int, variation_id: int, force: bool = True, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -610,7 +1873,7 @@ def delete_product_variation(product_id: int, variation_id: int, force: bool = T
         product_id (int): The ID of the parent product.
         variation_id (int): The ID of the variation to delete.
         force (bool): Whether to permanently delete the variation (True) or move to trash (False).
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -619,25 +1882,19 @@ def delete_product_variation(product_id: int, variation_id: int, force: bool = T
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'force': force}
-    response = requests.delete(f"{base_url}/products/{product_id}/variations/{variation_id}", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('DELETE', f"{base_url}/products/{product_id}/variations/{variation_id}", headers, params=params)
 
 # --- Product Attributes ---
 @mcp.tool()
 def get_product_attributes(per_page: int = 10, page: int = 1, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> list:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'per_page': per_page, 'page': page}
-    response = requests.get(f"{base_url}/products/attributes", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/products/attributes", headers, params)
 
 @mcp.tool()
 def get_product_attribute(attribute_id: int, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.get(f"{base_url}/products/attributes/{attribute_id}", headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/products/attributes/{attribute_id}", headers)
 
 @mcp.tool()
 def create_product_attribute(attribute_data: dict, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -654,7 +1911,7 @@ def create_product_attribute(attribute_data: dict, site_url: str = "", consumer_
             - has_archives (bool): Whether to enable archives for this attribute
             - options (list): List of attribute terms
             - meta_data (list): List of meta data objects
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -662,9 +1919,7 @@ def create_product_attribute(attribute_data: dict, site_url: str = "", consumer_
         dict: The created attribute data from the WooCommerce API.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.post(f"{base_url}/products/attributes", json=attribute_data, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('POST', f"{base_url}/products/attributes", headers, json=attribute_data)
 
 @mcp.tool()
 def update_product_attribute(attribute_id: int, attribute_data: dict, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -681,7 +1936,7 @@ def update_product_attribute(attribute_id: int, attribute_data: dict, site_url:
             - has_archives (bool): Whether to enable archives for this attribute
             - options (list): List of attribute terms
             - meta_data (list): List of meta data objects
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -689,9 +1944,7 @@ def update_product_attribute(attribute_id: int, attribute_data: dict, site_url:
         dict: The updated attribute data from the WooCommerce API.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.put(f"{base_url}/products/attributes/{attribute_id}", json=attribute_data, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('PUT', f"{base_url}/products/attributes/{attribute_id}", headers, json=attribute_data)
 
 @mcp.tool()
 def delete_product_attribute(attribute_id: int, force: bool = True, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -701,7 +1954,7 @@ def delete_product_attribute(attribute_id: int, force: bool = True, site_url: st
     Args:
         attribute_id (int): The ID of the attribute to delete.
         force (bool): Whether to permanently delete the attribute (True) or move to trash (False).
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -710,25 +1963,19 @@ def delete_product_attribute(attribute_id: int, force: bool = True, site_url: st
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'force': force}
-    response = requests.delete(f"{base_url}/products/attributes/{attribute_id}", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('DELETE', f"{base_url}/products/attributes/{attribute_id}", headers, params=params)
 
 # --- Product Attribute Terms ---
 @mcp.tool()
 def get_attribute_terms(attribute_id: int, per_page: int = 10, page: int = 1, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> list:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'per_page': per_page, 'page': page}
-    response = requests.get(f"{base_url}/products/attributes/{attribute_id}/terms", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/products/attributes/{attribute_id}/terms", headers, params)
 
 @mcp.tool()
 def get_attribute_term(attribute_id: int, term_id: int, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.get(f"{base_url}/products/attributes/{attribute_id}/terms/{term_id}", headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/products/attributes/{attribute_id}/terms/{term_id}", headers)
 
 @mcp.tool()
 def create_attribute_term(attribute_id: int, term_data: dict, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -744,7 +1991,7 @@ def create_attribute_term(attribute_id: int, term_data: dict, site_url: str = ""
             - description (str): Term description
             - menu_order (int): Menu order for the term
             - meta_data (list): List of meta data objects
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -752,9 +1999,7 @@ def create_attribute_term(attribute_id: int, term_data: dict, site_url: str = ""
         dict: The created term data from the WooCommerce API.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.post(f"{base_url}/products/attributes/{attribute_id}/terms", json=term_data, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('POST', f"{base_url}/products/attributes/{attribute_id}/terms", headers, json=term_data)
 
 @mcp.tool()
 def update_attribute_term(attribute_id: int, term_id: int, term_data: dict, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -770,7 +2015,7 @@ def update_attribute_term(attribute_id: int, term_id: int, term_data: dict, site
             - description (str): Term description
             - menu_order (int): Menu order for the term
             - meta_data (list): List of meta data objects
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -778,9 +2023,7 @@ def update_attribute_term(attribute_id: int, term_id: int, term_data: dict, site
         dict: The updated term data from the WooCommerce API.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.put(f"{base_url}/products/attributes/{attribute_id}/terms/{term_id}", json=term_data, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('PUT', f"{base_url}/products/attributes/{attribute_id}/terms/{term_id}", headers, json=term_data)
 
 @mcp.tool()
 def delete_attribute_term(attribute_id: int, term_id: int, force: bool = True, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -791,7 +2034,7 @@ def delete_attribute_term(attribute_id: int, term_id: int, force: bool = True, s
         attribute_id (int): The ID of the attribute containing the term.
         term_id (int): The ID of the term to delete.
         force (bool): Whether to permanently delete the term (True) or move to trash (False).
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -800,25 +2043,19 @@ def delete_attribute_term(attribute_id: int, term_id: int, force: bool = True, s
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'force': force}
-    response = requests.delete(f"{base_url}/products/attributes/{attribute_id}/terms/{term_id}", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('DELETE', f"{base_url}/products/attributes/{attribute_id}/terms/{term_id}", headers, params=params)
 
 
 @mcp.tool()
 def get_product_tags(per_page: int = 10, page: int = 1, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> list:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'per_page': per_page, 'page': page}
-    response = requests.get(f"{base_url}/products/tags", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/products/tags", headers, params)
 
 @mcp.tool()
 def get_product_tag(tag_id: int, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.get(f"{base_url}/products/tags/{tag_id}", headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/products/tags/{tag_id}", headers)
 
 @mcp.tool()
 def create_product_tag(tag_data: dict, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -832,7 +2069,7 @@ def create_product_tag(tag_data: dict, site_url: str = "", consumer_key: str = "
             Optional fields:
             - description (str): Tag description
             - meta_data (list): List of meta data objects
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -840,9 +2077,7 @@ def create_product_tag(tag_data: dict, site_url: str = "", consumer_key: str = "
         dict: The created tag data from the WooCommerce API.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.post(f"{base_url}/products/tags", json=tag_data, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('POST', f"{base_url}/products/tags", headers, json=tag_data)
 
 @mcp.tool()
 def update_product_tag(tag_id: int, tag_data: dict, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -856,7 +2091,7 @@ def update_product_tag(tag_id: int, tag_data: dict, site_url: str = "", consumer
             - slug (str): Tag slug (URL-friendly version of the name)
             - description (str): Tag description
             - meta_data (list): List of meta data objects
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -864,9 +2099,7 @@ def update_product_tag(tag_id: int, tag_data: dict, site_url: str = "", consumer
         dict: The updated tag data from the WooCommerce API.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.put(f"{base_url}/products/tags/{tag_id}", json=tag_data, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('PUT', f"{base_url}/products/tags/{tag_id}", headers, json=tag_data)
 
 @mcp.tool()
 def delete_product_tag(tag_id: int, force: bool = True, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -876,7 +2109,7 @@ def delete_product_tag(tag_id: int, force: bool = True, site_url: str = "", cons
     Args:
         tag_id (int): The ID of the tag to delete.
         force (bool): Whether to permanently delete the tag (True) or move to trash (False).
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -885,9 +2118,7 @@ def delete_product_tag(tag_id: int, force: bool = True, site_url: str = "", cons
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'force': force}
-    response = requests.delete(f"{base_url}/products/tags/{tag_id}", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('DELETE', f"{base_url}/products/tags/{tag_id}", headers, params=params)
 
 @mcp.tool()
 def get_product_reviews(product_id: int = None, per_page: int = 10, page: int = 1, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> list:
@@ -896,17 +2127,13 @@ def get_product_reviews(product_id: int = None, per_page: int = 10, page: int =
     params = {'per_page': per_page, 'page': page}
     if product_id:
         params['product'] = product_id
-    response = requests.get(url, params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(url, headers, params)
 
 @mcp.tool()
 def get_product_review(review_id: int, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     url = f"{base_url}/products/reviews/{review_id}"
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(url, headers)
 
 @mcp.tool()
 def create_product_review(product_id: int, review_data: dict, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -924,7 +2151,7 @@ def create_product_review(product_id: int, review_data: dict, site_url: str = ""
             - status (str): Review status ('approved', 'pending', 'spam', 'trash')
             - reviewer_avatar_urls (dict): Dictionary of avatar URLs
             - meta_data (list): List of meta data objects
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -935,9 +2162,7 @@ def create_product_review(product_id: int, review_data: dict, site_url: str = ""
     # Ensure product_id is in the review_data
     review_data = dict(review_data)
     review_data['product_id'] = product_id
-    response = requests.post(f"{base_url}/products/reviews", json=review_data, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('POST', f"{base_url}/products/reviews", headers, json=review_data)
 
 @mcp.tool()
 def update_product_review(review_id: int, review_data: dict, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -954,7 +2179,7 @@ def update_product_review(review_id: int, review_data: dict, site_url: str = "",
             - status (str): Review status ('approved', 'pending', 'spam', 'trash')
             - reviewer_avatar_urls (dict): Dictionary of avatar URLs
             - meta_data (list): List of meta data objects
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -963,9 +2188,7 @@ def update_product_review(review_id: int, review_data: dict, site_url: str = "",
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     url = f"{base_url}/products/reviews/{review_id}"
-    response = requests.put(url, json=review_data, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('PUT', url, headers, json=review_data)
 
 @mcp.tool()
 def delete_product_review(review_id: int, force: bool = True, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -975,7 +2198,7 @@ def delete_product_review(review_id: int, force: bool = True, site_url: str = ""
     Args:
         review_id (int): The ID of the review to delete.
         force (bool): Whether to permanently delete the review (True) or move to trash (False).
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -985,23 +2208,17 @@ def delete_product_review(review_id: int, force: bool = True, site_url: str = ""
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     url = f"{base_url}/products/reviews/{review_id}"
     params = {'force': force}
-    response = requests.delete(url, params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('DELETE', url, headers, params=params)
 
 @mcp.tool()
 def get_payment_gateways(site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> list:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.get(f"{base_url}/payment_gateways", headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/payment_gateways", headers)
 
 @mcp.tool()
 def get_payment_gateway(gateway_id: str, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.get(f"{base_url}/payment_gateways/{gateway_id}", headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/payment_gateways/{gateway_id}", headers)
 
 @mcp.tool()
 def update_payment_gateway(gateway_id: str, gateway_data: dict, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -1015,7 +2232,7 @@ def update_payment_gateway(gateway_id: str, gateway_data: dict, site_url: str =
             - title (str): Gateway title
             - description (str): Gateway description
             - settings (dict): Gateway-specific settings
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -1023,9 +2240,7 @@ def update_payment_gateway(gateway_id: str, gateway_data: dict, site_url: str =
         dict: The updated gateway configuration from the WooCommerce API.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.put(f"{base_url}/payment_gateways/{gateway_id}", json=gateway_data, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('PUT', f"{base_url}/payment_gateways/{gateway_id}", headers, json=gateway_data)
 
 @mcp.tool()
 def get_settings(site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> list:
@@ -1033,7 +2248,7 @@ def get_settings(site_url: str = "", consumer_key: str = "", consumer_secret: st
     Get all WooCommerce settings.
 
     Args:
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -1041,9 +2256,7 @@ def get_settings(site_url: str = "", consumer_key: str = "", consumer_secret: st
         list: List of all WooCommerce settings.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.get(f"{base_url}/settings", headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/settings", headers)
 
 @mcp.tool()
 def get_setting_options(group: str, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> list:
@@ -1052,7 +2265,7 @@ def get_setting_options(group: str, site_url: str = "", consumer_key: str = "",
 
     Args:
         group (str): The settings group to retrieve (e.g., 'general', 'products', 'shipping').
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -1060,9 +2273,7 @@ def get_setting_options(group: str, site_url: str = "", consumer_key: str = "",
         list: List of settings for the specified group.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.get(f"{base_url}/settings/{group}", headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/settings/{group}", headers)
 
 @mcp.tool()
 def update_setting_option(group: str, id: str, setting_data: dict, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -1074,7 +2285,7 @@ def update_setting_option(group: str, id: str, setting_data: dict, site_url: str
         id (str): The ID of the setting option to update.
         setting_data (dict): Dictionary containing the new setting value.
             - value: The new value for the setting.
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -1082,17 +2293,16 @@ def update_setting_option(group: str, id: str, setting_data: dict, site_url: str
         dict: The updated setting option from the WooCommerce API.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.put(f"{base_url}/settings/{group}/{id}", json=setting_data, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('PUT', f"{base_url}/settings/{group}/{id}", headers, json=setting_data)
 
 @mcp.tool()
+@summarize_result('system_status')
 def get_system_status(site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
     """
     Get WooCommerce system status information.
 
     Args:
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -1104,9 +2314,7 @@ def get_system_status(site_url: str = "", consumer_key: str = "", consumer_secre
             - tools: Available system tools
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.get(f"{base_url}/system_status", headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/system_status", headers)
 
 @mcp.tool()
 def get_system_status_tools(site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> list:
@@ -1114,7 +2322,7 @@ def get_system_status_tools(site_url: str = "", consumer_key: str = "", consumer
     Get available WooCommerce system tools.
 
     Args:
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -1122,9 +2330,7 @@ def get_system_status_tools(site_url: str = "", consumer_key: str = "", consumer
         list: List of available system tools with their descriptions and usage information.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.get(f"{base_url}/system_status/tools", headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/system_status/tools", headers)
 
 @mcp.tool()
 def run_system_status_tool(tool_id: str, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -1133,7 +2339,7 @@ def run_system_status_tool(tool_id: str, site_url: str = "", consumer_key: str =
 
     Args:
         tool_id (str): The ID of the tool to run (e.g., 'clear_transients', 'clear_cache').
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -1141,47 +2347,178 @@ def run_system_status_tool(tool_id: str, site_url: str = "", consumer_key: str =
         dict: The result of running the system tool.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.post(f"{base_url}/system_status/tools/{tool_id}", headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('POST', f"{base_url}/system_status/tools/{tool_id}", headers)
 
 @mcp.tool()
 def get_data(site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.get(f"{base_url}/data", headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/data", headers)
 
 @mcp.tool()
 def get_continents(site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> list:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.get(f"{base_url}/data/continents", headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/data/continents", headers)
 
 @mcp.tool()
 def get_countries(site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> list:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.get(f"{base_url}/data/countries", headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/data/countries", headers)
 
 @mcp.tool()
 def get_currencies(site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> list:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.get(f"{base_url}/data/currencies", headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/data/currencies", headers)
 
 @mcp.tool()
 def get_current_currency(site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.get(f"{base_url}/data/currencies/current", headers=headers)
+    return woo_get(f"{base_url}/data/currencies/current", headers)
+
+# --- Report range splitting ---
+# Long report ranges can time out on the origin. With split_by, a report's date_min /
+# date_max range is cut into calendar sub-periods that are fetched REPORT_WORKERS at a
+# time (each through the tenant's rate limiter) and merged locally: numeric fields are
+# summed, per-day series and keyed rows (slug, product_id, ...) are combined. Sub-periods
+# that ended before yesterday (UTC, to allow for store time zones) are closed and cached
+# on disk for good; only the open period is ever fetched again.
+REPORT_WORKERS = int(os.environ.get('MCP_REPORT_WORKERS', '4'))
+REPORT_CACHE_DIR = os.path.join(CACHE_DIR, 'reports')
+REPORT_SPLITS = ('month', 'week', 'day')
+REPORT_ROW_KEYS = ('slug', 'product_id', 'coupon_id', 'tax_id', 'id', 'name')
+# Only these endpoints filter by date_min/date_max; the */totals reports are all-time
+# figures, so splitting them would add the same totals once per sub-period.
+SPLIT_REPORT_ENDPOINTS = ('reports/sales', 'reports/top_sellers')
+
+
+def _report_periods(date_min, date_max, split_by):
+    """Split the inclusive YYYY-MM-DD range into (start, end) sub-periods."""
+    if split_by not in REPORT_SPLITS:
+        raise Exception(f"split_by must be one of {', '.join(REPORT_SPLITS)}")
+    if not date_min or not date_max:
+        raise Exception('split_by needs both date_min and date_max')
+    day = 86400
+    start = calendar.timegm(time.strptime(date_min, '%Y-%m-%d'))
+    last = calendar.timegm(time.strptime(date_max, '%Y-%m-%d'))
+    periods = []
+    while start <= last:
+        if split_by == 'day':
+            end = start
+        elif split_by == 'week':
+            end = start + 6 * day
+        else:
+            year, month = time.gmtime(start)[:2]
+            end = calendar.timegm((year, month, calendar.monthrange(year, month)[1], 0, 0, 0))
+        end = min(end, last)
+        periods.append((time.strftime('%Y-%m-%d', time.gmtime(start)), time.strftime('%Y-%m-%d', time.gmtime(end))))
+        start = end + day
+    return periods
+
+
+def _report_number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str) and re.fullmatch(r'-?\d+(\.\d+)?', value):
+        return float(value) if '.' in value else int(value)
+    return None
+
+
+def _row_key(row):
+    if isinstance(row, dict):
+        for key in REPORT_ROW_KEYS:
+            if key in row:
+                return key, row[key]
+    return None
+
+
+def _merge_report(a, b):
+    """Merge two report payloads: sum numbers, union keyed rows and dated series."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if isinstance(a, dict) and isinstance(b, dict):
+        merged = dict(a)
+        for key, value in b.items():
+            merged[key] = _merge_report(a.get(key), value) if key in a else value
+        return merged
+    if isinstance(a, list) and isinstance(b, list):
+        if all(_row_key(row) for row in a + b):
+            rows = {_row_key(row): row for row in a}
+            for row in b:
+                key = _row_key(row)
+                rows[key] = _merge_report(rows.get(key), row)
+                # The key itself (e.g. product_id) identifies the row and is not summed
+                rows[key][key[0]] = key[1]
+            return list(rows.values())
+        # Unkeyed lists (e.g. the single sales summary object) merge element-wise
+        return [_merge_report(x, y) for x, y in itertools.zip_longest(a, b)]
+    x, y = _report_number(a), _report_number(b)
+    if x is not None and y is not None:
+        total = x + y
+        if isinstance(a, str):
+            return f'{total:.2f}' if isinstance(total, float) else str(total)
+        return round(total, 2) if isinstance(total, float) else total
+    return a if a not in (None, '') else b
+
+
+def _fetch_report_period(url, headers, params, refresh=False):
+    """Fetch every page of one sub-period; closed periods come from the disk cache."""
+    closed = params['date_max'] < time.strftime('%Y-%m-%d', time.gmtime(time.time() - 86400))
+    key = hashlib.sha256(json.dumps([url, params], sort_keys=True, default=str).encode()).hexdigest()
+    path = os.path.join(REPORT_CACHE_DIR, f'{key}.json')
+    if closed and not refresh and os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    params = {**params, 'page': 1}
+    response = tenant_request('GET', url, params=params, headers=headers)
     response.raise_for_status()
-    return response.json()
+    data = response.json()
+    total_pages = int(response.headers.get('X-WP-TotalPages', 1) or 1)
+    for page in range(2, total_pages + 1):
+        # Report endpoints that ignore paging send no X-WP-TotalPages, so this only runs for paged ones
+        response = tenant_request('GET', url, params={**params, 'page': page}, headers=headers)
+        response.raise_for_status()
+        data = data + response.json()
+    if closed:
+        os.makedirs(REPORT_CACHE_DIR, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(data, f)
+    return data
+
+
+def split_report(base_url, headers, endpoint, params, split_by, refresh=False):
+    """Fetch a report over date_min..date_max in sub-periods and merge them."""
+    if endpoint not in SPLIT_REPORT_ENDPOINTS:
+        raise Exception(f"split_by is only supported for {', '.join(SPLIT_REPORT_ENDPOINTS)}")
+    periods = _report_periods(params.get('date_min'), params.get('date_max'), split_by)
+    page, per_page = params.pop('page', None), params.pop('per_page', None)
+    url = f"{base_url}/{endpoint}"
+    # WooCommerce ignores date_min/date_max whenever a period is given
+    base_params = {key: value for key, value in params.items() if key != 'period'}
+    with ThreadPoolExecutor(max_workers=REPORT_WORKERS) as pool:
+        parts = list(pool.map(
+            lambda period: _fetch_report_period(
+                url, headers, {**base_params, 'date_min': period[0], 'date_max': period[1], 'per_page': 100}, refresh),
+            periods))
+
+    merged = None
+    for part in parts:
+        merged = _merge_report(merged, part)
+    days = sum((calendar.timegm(time.strptime(end, '%Y-%m-%d')) - calendar.timegm(time.strptime(start, '%Y-%m-%d'))) // 86400 + 1
+               for start, end in periods)
+    for summary in merged if isinstance(merged, list) else [merged]:
+        # Averages cannot be summed; recompute the sales report's daily average
+        if isinstance(summary, dict) and 'average_sales' in summary and _report_number(summary.get('net_sales')) is not None:
+            summary['average_sales'] = f"{_report_number(summary['net_sales']) / days:.2f}"
+    if page and per_page and isinstance(merged, list) and len(merged) > 1:
+        merged = merged[(page - 1) * per_page:page * per_page]
+    return merged
+
 
 @mcp.tool()
-def get_sales_report(period: str = "month", date_min: str = "", date_max: str = "", site_url: str = "", consumer_key: str = "", consumer_secret: str = "", **filters) -> dict:
+def get_sales_report(period: str = "month", date_min: str = "", date_max: str = "", split_by: str = "", refresh: bool = False, site_url: str = "", consumer_key: str = "", consumer_secret: str = "", **filters) -> dict:
     """
     Get WooCommerce sales report data.
 
@@ -1189,7 +2526,10 @@ def get_sales_report(period: str = "month", date_min: str = "", date_max: str =
         period (str): Time period for the report ('day', 'week', 'month', 'year').
         date_min (str): Start date for the report (YYYY-MM-DD).
         date_max (str): End date for the report (YYYY-MM-DD).
-        site_url (str): The base URL of the WooCommerce site.
+        split_by (str, optional): Split date_min..date_max into 'month', 'week' or 'day'
+            sub-periods that are fetched concurrently and merged. Use for long ranges.
+        refresh (bool): With split_by, refetch closed sub-periods instead of using the cache.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
         **filters: Additional filter parameters:
@@ -1207,9 +2547,34 @@ def get_sales_report(period: str = "month", date_min: str = "", date_max: str =
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'period': period, 'date_min': date_min, 'date_max': date_max}
     params.update(filters)
-    response = requests.get(f"{base_url}/reports/sales", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    if split_by:
+        return split_report(base_url, headers, "reports/sales", params, split_by, refresh)
+    return woo_get(f"{base_url}/reports/sales", headers, params)
+
+@mcp.tool()
+def get_top_sellers_report(period: str = "month", date_min: str = "", date_max: str = "", split_by: str = "", refresh: bool = False, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> list:
+    """
+    Get the best-selling products with the quantity sold.
+
+    Args:
+        period (str): Time period for the report ('week', 'month', 'last_month', 'year').
+        date_min (str): Start date for the report (YYYY-MM-DD).
+        date_max (str): End date for the report (YYYY-MM-DD).
+        split_by (str, optional): Split date_min..date_max into 'month', 'week' or 'day'
+            sub-periods that are fetched concurrently and merged. Use for long ranges.
+        refresh (bool): With split_by, refetch closed sub-periods instead of using the cache.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
+        consumer_key (str): The WooCommerce REST API consumer key.
+        consumer_secret (str): The WooCommerce REST API consumer secret.
+
+    Returns:
+        list: Rows with the product's name, product_id and quantity sold.
+    """
+    base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
+    params = {'period': period, 'date_min': date_min, 'date_max': date_max}
+    if split_by:
+        return split_report(base_url, headers, "reports/top_sellers", params, split_by, refresh)
+    return woo_get(f"{base_url}/reports/top_sellers", headers, params)
 
 @mcp.tool()
 def get_products_report(period: str = "month", date_min: str = "", date_max: str = "", per_page: int = 10, page: int = 1, site_url: str = "", consumer_key: str = "", consumer_secret: str = "", **filters) -> dict:
@@ -1222,7 +2587,7 @@ def get_products_report(period: str = "month", date_min: str = "", date_max: str
         date_max (str): End date for the report (YYYY-MM-DD).
         per_page (int): Number of items per page.
         page (int): Page number to retrieve.
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
         **filters: Additional filter parameters:
@@ -1239,9 +2604,7 @@ def get_products_report(period: str = "month", date_min: str = "", date_max: str
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'period': period, 'date_min': date_min, 'date_max': date_max, 'per_page': per_page, 'page': page}
     params.update(filters)
-    response = requests.get(f"{base_url}/reports/products", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/reports/products", headers, params)
 
 @mcp.tool()
 def get_orders_report(period: str = "month", date_min: str = "", date_max: str = "", per_page: int = 10, page: int = 1, site_url: str = "", consumer_key: str = "", consumer_secret: str = "", **filters) -> dict:
@@ -1254,7 +2617,7 @@ def get_orders_report(period: str = "month", date_min: str = "", date_max: str =
         date_max (str): End date for the report (YYYY-MM-DD).
         per_page (int): Number of items per page.
         page (int): Page number to retrieve.
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
         **filters: Additional filter parameters:
@@ -1271,9 +2634,7 @@ def get_orders_report(period: str = "month", date_min: str = "", date_max: str =
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'period': period, 'date_min': date_min, 'date_max': date_max, 'per_page': per_page, 'page': page}
     params.update(filters)
-    response = requests.get(f"{base_url}/reports/orders", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/reports/orders", headers, params)
 
 @mcp.tool()
 def get_categories_report(per_page: int = 10, page: int = 1, site_url: str = "", consumer_key: str = "", consumer_secret: str = "", **filters) -> dict:
@@ -1283,7 +2644,7 @@ def get_categories_report(per_page: int = 10, page: int = 1, site_url: str = "",
     Args:
         per_page (int): Number of items per page.
         page (int): Page number to retrieve.
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
         **filters: Additional filter parameters:
@@ -1298,9 +2659,7 @@ def get_categories_report(per_page: int = 10, page: int = 1, site_url: str = "",
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'per_page': per_page, 'page': page}
     params.update(filters)
-    response = requests.get(f"{base_url}/reports/categories", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/reports/categories", headers, params)
 
 @mcp.tool()
 def get_customers_report(per_page: int = 10, page: int = 1, site_url: str = "", consumer_key: str = "", consumer_secret: str = "", **filters) -> dict:
@@ -1310,7 +2669,7 @@ def get_customers_report(per_page: int = 10, page: int = 1, site_url: str = "",
     Args:
         per_page (int): Number of items per page.
         page (int): Page number to retrieve.
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
         **filters: Additional filter parameters:
@@ -1326,18 +2685,14 @@ def get_customers_report(per_page: int = 10, page: int = 1, site_url: str = "",
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'per_page': per_page, 'page': page}
     params.update(filters)
-    response = requests.get(f"{base_url}/reports/customers", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/reports/customers", headers, params)
 
 @mcp.tool()
 def get_stock_report(per_page: int = 10, page: int = 1, site_url: str = "", consumer_key: str = "", consumer_secret: str = "", **filters) -> dict:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'per_page': per_page, 'page': page}
     params.update(filters)
-    response = requests.get(f"{base_url}/reports/stock", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/reports/stock", headers, params)
 
 @mcp.tool()
 def get_coupons_report(period: str = "month", date_min: str = "", date_max: str = "", per_page: int = 10, page: int = 1, site_url: str = "", consumer_key: str = "", consumer_secret: str = "", **filters) -> dict:
@@ -1350,7 +2705,7 @@ def get_coupons_report(period: str = "month", date_min: str = "", date_max: str
         date_max (str): End date for the report (YYYY-MM-DD).
         per_page (int): Number of items per page.
         page (int): Page number to retrieve.
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
         **filters: Additional filter parameters:
@@ -1365,9 +2720,7 @@ def get_coupons_report(period: str = "month", date_min: str = "", date_max: str
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'period': period, 'date_min': date_min, 'date_max': date_max, 'per_page': per_page, 'page': page}
     params.update(filters)
-    response = requests.get(f"{base_url}/reports/coupons/totals", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/reports/coupons/totals", headers, params)
 
 @mcp.tool()
 def get_taxes_report(period: str = "month", date_min: str = "", date_max: str = "", per_page: int = 10, page: int = 1, site_url: str = "", consumer_key: str = "", consumer_secret: str = "", **filters) -> dict:
@@ -1380,7 +2733,7 @@ def get_taxes_report(period: str = "month", date_min: str = "", date_max: str =
         date_max (str): End date for the report (YYYY-MM-DD).
         per_page (int): Number of items per page.
         page (int): Page number to retrieve.
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
         **filters: Additional filter parameters:
@@ -1396,9 +2749,7 @@ def get_taxes_report(period: str = "month", date_min: str = "", date_max: str =
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'period': period, 'date_min': date_min, 'date_max': date_max, 'per_page': per_page, 'page': page}
     params.update(filters)
-    response = requests.get(f"{base_url}/reports/taxes", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/reports/taxes", headers, params)
 
 @mcp.tool()
 def get_coupons(per_page: int = 10, page: int = 1, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> list:
@@ -1408,7 +2759,7 @@ def get_coupons(per_page: int = 10, page: int = 1, site_url: str = "", consumer_
     Args:
         per_page (int): Number of coupons per page.
         page (int): Page number to retrieve.
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -1417,9 +2768,7 @@ def get_coupons(per_page: int = 10, page: int = 1, site_url: str = "", consumer_
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'per_page': per_page, 'page': page}
-    response = requests.get(f"{base_url}/coupons", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/coupons", headers, params)
 
 @mcp.tool()
 def get_coupon(coupon_id: int, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -1428,7 +2777,7 @@ def get_coupon(coupon_id: int, site_url: str = "", consumer_key: str = "", consu
 
     Args:
         coupon_id (int): The ID of the coupon to retrieve.
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -1436,9 +2785,7 @@ def get_coupon(coupon_id: int, site_url: str = "", consumer_key: str = "", consu
         dict: The coupon data from the WooCommerce API.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.get(f"{base_url}/coupons/{coupon_id}", headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/coupons/{coupon_id}", headers)
 
 @mcp.tool()
 def create_coupon(coupon_data: dict, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -1463,7 +2810,7 @@ def create_coupon(coupon_data: dict, site_url: str = "", consumer_key: str = "",
             - exclude_product_ids (list): List of product IDs to exclude
             - usage_count (int): Number of times the coupon has been used
             - meta_data (list): List of meta data objects
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -1471,9 +2818,7 @@ def create_coupon(coupon_data: dict, site_url: str = "", consumer_key: str = "",
         dict: The created coupon data from the WooCommerce API.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.post(f"{base_url}/coupons", json=coupon_data, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('POST', f"{base_url}/coupons", headers, json=coupon_data)
 
 @mcp.tool()
 def update_coupon(coupon_id: int, coupon_data: dict, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -1498,7 +2843,7 @@ def update_coupon(coupon_id: int, coupon_data: dict, site_url: str = "", consume
             - exclude_product_ids (list): List of product IDs to exclude
             - usage_count (int): Number of times the coupon has been used
             - meta_data (list): List of meta data objects
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -1506,17 +2851,13 @@ def update_coupon(coupon_id: int, coupon_data: dict, site_url: str = "", consume
         dict: The updated coupon data from the WooCommerce API.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.put(f"{base_url}/coupons/{coupon_id}", json=coupon_data, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('PUT', f"{base_url}/coupons/{coupon_id}", headers, json=coupon_data)
 
 @mcp.tool()
 def delete_coupon(coupon_id: int, force: bool = True, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'force': force}
-    response = requests.delete(f"{base_url}/coupons/{coupon_id}", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('DELETE', f"{base_url}/coupons/{coupon_id}", headers, params=params)
 
 # --- Order Notes ---
 @mcp.tool()
@@ -1528,7 +2869,7 @@ def get_order_notes(order_id: int, per_page: int = 10, page: int = 1, site_url:
         order_id (int): The ID of the order to retrieve notes for.
         per_page (int): Number of notes per page.
         page (int): Page number to retrieve.
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -1537,9 +2878,7 @@ def get_order_notes(order_id: int, per_page: int = 10, page: int = 1, site_url:
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'per_page': per_page, 'page': page}
-    response = requests.get(f"{base_url}/orders/{order_id}/notes", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/orders/{order_id}/notes", headers, params)
 
 @mcp.tool()
 def get_order_note(order_id: int, note_id: int, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -1549,7 +2888,7 @@ def get_order_note(order_id: int, note_id: int, site_url: str = "", consumer_key
     Args:
         order_id (int): The ID of the order containing the note.
         note_id (int): The ID of the note to retrieve.
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -1557,9 +2896,7 @@ def get_order_note(order_id: int, note_id: int, site_url: str = "", consumer_key
         dict: The order note data from the WooCommerce API.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.get(f"{base_url}/orders/{order_id}/notes/{note_id}", headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/orders/{order_id}/notes/{note_id}", headers)
 
 @mcp.tool()
 def create_order_note(order_id: int, note_data: dict, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -1573,7 +2910,7 @@ def create_order_note(order_id: int, note_data: dict, site_url: str = "", consum
             - customer_note (bool): Whether this is a customer note (True) or internal note (False)
             Optional fields:
             - meta_data (list): List of meta data objects
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -1581,9 +2918,7 @@ def create_order_note(order_id: int, note_data: dict, site_url: str = "", consum
         dict: The created note data from the WooCommerce API.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.post(f"{base_url}/orders/{order_id}/notes", json=note_data, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('POST', f"{base_url}/orders/{order_id}/notes", headers, json=note_data)
 
 @mcp.tool()
 def delete_order_note(order_id: int, note_id: int, force: bool = True, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
@@ -1594,7 +2929,7 @@ def delete_order_note(order_id: int, note_id: int, force: bool = True, site_url:
         order_id (int): The ID of the order containing the note.
         note_id (int): The ID of the note to delete.
         force (bool): Whether to permanently delete the note (True) or move to trash (False).
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -1603,48 +2938,36 @@ def delete_order_note(order_id: int, note_id: int, force: bool = True, site_url:
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'force': force}
-    response = requests.delete(f"{base_url}/orders/{order_id}/notes/{note_id}", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('DELETE', f"{base_url}/orders/{order_id}/notes/{note_id}", headers, params=params)
 
 # --- Order Refunds ---
 @mcp.tool()
 def get_order_refunds(order_id: int, per_page: int = 10, page: int = 1, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> list:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'per_page': per_page, 'page': page}
-    response = requests.get(f"{base_url}/orders/{order_id}/refunds", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/orders/{order_id}/refunds", headers, params)
 
 @mcp.tool()
 def get_order_refund(order_id: int, refund_id: int, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.get(f"{base_url}/orders/{order_id}/refunds/{refund_id}", headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_get(f"{base_url}/orders/{order_id}/refunds/{refund_id}", headers)
 
 @mcp.tool()
 def create_order_refund(order_id: int, refund_data: dict, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.post(f"{base_url}/orders/{order_id}/refunds", json=refund_data, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('POST', f"{base_url}/orders/{order_id}/refunds", headers, json=refund_data)
 
 @mcp.tool()
 def delete_order_refund(order_id: int, refund_id: int, force: bool = True, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
     params = {'force': force}
-    response = requests.delete(f"{base_url}/orders/{order_id}/refunds/{refund_id}", params=params, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    return woo_send('DELETE', f"{base_url}/orders/{order_id}/refunds/{refund_id}", headers, params=params)
 
 # --- Meta operations for products ---
 @mcp.tool()
 def get_product_meta(product_id: int, meta_key: str = None, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> list:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.get(f"{base_url}/products/{product_id}", headers=headers)
-    response.raise_for_status()
-    meta_data = response.json().get('meta_data', [])
+    meta_data = woo_get(f"{base_url}/products/{product_id}", headers).get('meta_data', [])
     if meta_key:
         return [meta for meta in meta_data if meta.get('key') == meta_key]
     return meta_data
@@ -1652,7 +2975,7 @@ def get_product_meta(product_id: int, meta_key: str = None, site_url: str = "",
 @mcp.tool()
 def update_product_meta(product_id: int, meta_key: str, meta_value, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> list:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    product = requests.get(f"{base_url}/products/{product_id}", headers=headers).json()
+    product = tenant_request('GET', f"{base_url}/products/{product_id}", headers=headers).json()
     meta_data = product.get('meta_data', [])
     found = False
     for meta in meta_data:
@@ -1662,9 +2985,7 @@ def update_product_meta(product_id: int, meta_key: str, meta_value, site_url: st
             break
     if not found:
         meta_data.append({'key': meta_key, 'value': meta_value})
-    response = requests.put(f"{base_url}/products/{product_id}", json={'meta_data': meta_data}, headers=headers)
-    response.raise_for_status()
-    return response.json().get('meta_data', [])
+    return woo_send('PUT', f"{base_url}/products/{product_id}", headers, json={'meta_data': meta_data}).get('meta_data', [])
 
 @mcp.tool()
 def create_product_meta(product_id: int, meta_key: str, meta_value, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> list:
@@ -1673,12 +2994,10 @@ def create_product_meta(product_id: int, meta_key: str, meta_value, site_url: st
 @mcp.tool()
 def delete_product_meta(product_id: int, meta_key: str, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> list:
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    product = requests.get(f"{base_url}/products/{product_id}", headers=headers).json()
+    product = tenant_request('GET', f"{base_url}/products/{product_id}", headers=headers).json()
     meta_data = product.get('meta_data', [])
     meta_data = [meta for meta in meta_data if meta.get('key') != meta_key]
-    response = requests.put(f"{base_url}/products/{product_id}", json={'meta_data': meta_data}, headers=headers)
-    response.raise_for_status()
-    return response.json().get('meta_data', [])
+    return woo_send('PUT', f"{base_url}/products/{product_id}", headers, json={'meta_data': meta_data}).get('meta_data', [])
 
 # --- Meta operations for orders ---
 @mcp.tool()
@@ -1689,7 +3008,7 @@ def get_order_meta(order_id: int, meta_key: str = None, site_url: str = "", cons
     Args:
         order_id (int): The ID of the order to retrieve meta data for.
         meta_key (str, optional): Specific meta key to filter by. If None, returns all meta data.
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -1700,9 +3019,7 @@ def get_order_meta(order_id: int, meta_key: str = None, site_url: str = "", cons
             - value: Meta value (can be any type)
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.get(f"{base_url}/orders/{order_id}", headers=headers)
-    response.raise_for_status()
-    meta_data = response.json().get('meta_data', [])
+    meta_data = woo_get(f"{base_url}/orders/{order_id}", headers).get('meta_data', [])
     if meta_key:
         return [meta for meta in meta_data if meta.get('key') == meta_key]
     return meta_data
@@ -1716,7 +3033,7 @@ def update_order_meta(order_id: int, meta_key: str, meta_value, site_url: str =
         order_id (int): The ID of the order to update meta data for.
         meta_key (str): The meta key to update.
         meta_value: The new value for the meta key. Can be any JSON-serializable value.
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -1724,7 +3041,7 @@ def update_order_meta(order_id: int, meta_key: str, meta_value, site_url: str =
         list: Updated list of meta data dictionaries for the order.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    order = requests.get(f"{base_url}/orders/{order_id}", headers=headers).json()
+    order = tenant_request('GET', f"{base_url}/orders/{order_id}", headers=headers).json()
     meta_data = order.get('meta_data', [])
     found = False
     for meta in meta_data:
@@ -1734,9 +3051,7 @@ def update_order_meta(order_id: int, meta_key: str, meta_value, site_url: str =
             break
     if not found:
         meta_data.append({'key': meta_key, 'value': meta_value})
-    response = requests.put(f"{base_url}/orders/{order_id}", json={'meta_data': meta_data}, headers=headers)
-    response.raise_for_status()
-    return response.json().get('meta_data', [])
+    return woo_send('PUT', f"{base_url}/orders/{order_id}", headers, json={'meta_data': meta_data}).get('meta_data', [])
 
 @mcp.tool()
 def create_order_meta(order_id: int, meta_key: str, meta_value, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> list:
@@ -1747,7 +3062,7 @@ def create_order_meta(order_id: int, meta_key: str, meta_value, site_url: str =
         order_id (int): The ID of the order to add meta data to.
         meta_key (str): The meta key to create.
         meta_value: The value for the new meta key. Can be any JSON-serializable value.
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -1764,7 +3079,7 @@ def delete_order_meta(order_id: int, meta_key: str, site_url: str = "", consumer
     Args:
         order_id (int): The ID of the order to delete meta data from.
         meta_key (str): The meta key to delete.
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -1772,12 +3087,10 @@ def delete_order_meta(order_id: int, meta_key: str, site_url: str = "", consumer
         list: Updated list of meta data dictionaries for the order.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    order = requests.get(f"{base_url}/orders/{order_id}", headers=headers).json()
+    order = tenant_request('GET', f"{base_url}/orders/{order_id}", headers=headers).json()
     meta_data = order.get('meta_data', [])
     meta_data = [meta for meta in meta_data if meta.get('key') != meta_key]
-    response = requests.put(f"{base_url}/orders/{order_id}", json={'meta_data': meta_data}, headers=headers)
-    response.raise_for_status()
-    return response.json().get('meta_data', [])
+    return woo_send('PUT', f"{base_url}/orders/{order_id}", headers, json={'meta_data': meta_data}).get('meta_data', [])
 
 # --- Meta operations for customers ---
 @mcp.tool()
@@ -1788,7 +3101,7 @@ def get_customer_meta(customer_id: int, meta_key: str = None, site_url: str = ""
     Args:
         customer_id (int): The ID of the customer to retrieve meta data for.
         meta_key (str, optional): Specific meta key to filter by. If None, returns all meta data.
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -1799,9 +3112,7 @@ def get_customer_meta(customer_id: int, meta_key: str = None, site_url: str = ""
             - value: Meta value (can be any type)
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    response = requests.get(f"{base_url}/customers/{customer_id}", headers=headers)
-    response.raise_for_status()
-    meta_data = response.json().get('meta_data', [])
+    meta_data = woo_get(f"{base_url}/customers/{customer_id}", headers).get('meta_data', [])
     if meta_key:
         return [meta for meta in meta_data if meta.get('key') == meta_key]
     return meta_data
@@ -1815,7 +3126,7 @@ def update_customer_meta(customer_id: int, meta_key: str, meta_value, site_url:
         customer_id (int): The ID of the customer to update meta data for.
         meta_key (str): The meta key to update.
         meta_value: The new value for the meta key. Can be any JSON-serializable value.
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -1823,7 +3134,7 @@ def update_customer_meta(customer_id: int, meta_key: str, meta_value, site_url:
         list: Updated list of meta data dictionaries for the customer.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    customer = requests.get(f"{base_url}/customers/{customer_id}", headers=headers).json()
+    customer = tenant_request('GET', f"{base_url}/customers/{customer_id}", headers=headers).json()
     meta_data = customer.get('meta_data', [])
     found = False
     for meta in meta_data:
@@ -1833,9 +3144,7 @@ def update_customer_meta(customer_id: int, meta_key: str, meta_value, site_url:
             break
     if not found:
         meta_data.append({'key': meta_key, 'value': meta_value})
-    response = requests.put(f"{base_url}/customers/{customer_id}", json={'meta_data': meta_data}, headers=headers)
-    response.raise_for_status()
-    return response.json().get('meta_data', [])
+    return woo_send('PUT', f"{base_url}/customers/{customer_id}", headers, json={'meta_data': meta_data}).get('meta_data', [])
 
 @mcp.tool()
 def create_customer_meta(customer_id: int, meta_key: str, meta_value, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> list:
@@ -1846,7 +3155,7 @@ def create_customer_meta(customer_id: int, meta_key: str, meta_value, site_url:
         customer_id (int): The ID of the customer to add meta data to.
         meta_key (str): The meta key to create.
         meta_value: The value for the new meta key. Can be any JSON-serializable value.
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -1863,7 +3172,7 @@ def delete_customer_meta(customer_id: int, meta_key: str, site_url: str = "", co
     Args:
         customer_id (int): The ID of the customer to delete meta data from.
         meta_key (str): The meta key to delete.
-        site_url (str): The base URL of the WooCommerce site.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
         consumer_key (str): The WooCommerce REST API consumer key.
         consumer_secret (str): The WooCommerce REST API consumer secret.
 
@@ -1871,14 +3180,2817 @@ def delete_customer_meta(customer_id: int, meta_key: str, site_url: str = "", co
         list: Updated list of meta data dictionaries for the customer.
     """
     base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
-    customer = requests.get(f"{base_url}/customers/{customer_id}", headers=headers).json()
+    customer = tenant_request('GET', f"{base_url}/customers/{customer_id}", headers=headers).json()
     meta_data = customer.get('meta_data', [])
     meta_data = [meta for meta in meta_data if meta.get('key') != meta_key]
-    response = requests.put(f"{base_url}/customers/{customer_id}", json={'meta_data': meta_data}, headers=headers)
+    return woo_send('PUT', f"{base_url}/customers/{customer_id}", headers, json={'meta_data': meta_data}).get('meta_data', [])
+
+# --- Inventory tracker ---
+# A per-site stock index kept current by polling only products modified since the
+# last cursor (plus webhook payloads routed through invalidate_cache), so low-stock
+# questions are answered from memory instead of a full catalog scan. modified_after is
+# exclusive, so each poll re-reads the cursor's own second and skips the products
+# already applied at that timestamp, as get_order_changes does.
+STOCK_POLL_INTERVAL = int(os.environ.get('MCP_STOCK_POLL_INTERVAL', '300'))
+LOW_STOCK_THRESHOLD = int(os.environ.get('MCP_LOW_STOCK_THRESHOLD', '5'))
+STOCK_FETCH_WORKERS = int(os.environ.get('MCP_STOCK_FETCH_WORKERS', '4'))
+
+
+class InventoryTracker:
+    def __init__(self, base_url, headers):
+        self.base_url = base_url
+        self.headers = headers
+        self.items = {}  # (product_id, variation_id) -> stock entry, variation_id 0 for products
+        self.by_sku = {}  # sku -> (product_id, variation_id)
+        self.cursor = ''  # greatest date_modified_gmt polled so far
+        self.boundary_ids = set()  # products polled with date_modified_gmt == cursor
+        self.last_poll = None
+        self._lock = threading.Lock()
+        self._poll_lock = threading.Lock()
+        self._thread = None
+
+    def apply(self, record, parent_id=0):
+        """Index one product or variation record."""
+        if parent_id or record.get('type') == 'variation':
+            product_id, variation_id = parent_id or record.get('parent_id'), record['id']
+        else:
+            product_id, variation_id = record['id'], 0
+        entry = CompactRecord({
+            'product_id': product_id,
+            'variation_id': variation_id,
+            'sku': record.get('sku', ''),
+            'name': record.get('name', ''),
+            'manage_stock': record.get('manage_stock'),
+            'stock_quantity': record.get('stock_quantity'),
+            'stock_status': record.get('stock_status'),
+            'low_stock_amount': record.get('low_stock_amount'),
+        })
+        with self._lock:
+            key = (product_id, variation_id)
+            previous = self.items.get(key)
+            if previous and previous['sku'] and previous['sku'] != entry['sku']:
+                self.by_sku.pop(previous['sku'], None)
+            self.items[key] = entry
+            if entry['sku']:
+                self.by_sku[entry['sku']] = key
+
+    def snapshot(self):
+        with self._lock:
+            return {'cursor': self.cursor, 'boundary_ids': sorted(self.boundary_ids),
+                    'items': [entry.to_dict() for entry in self.items.values()]}
+
+    def restore(self, state):
+        """Start from a snapshot; the first poll then only fetches products modified since."""
+        with self._lock:
+            for entry in state['items']:
+                key = (entry['product_id'], entry['variation_id'])
+                self.items[key] = CompactRecord(entry)
+                if entry['sku']:
+                    self.by_sku[entry['sku']] = key
+            self.cursor = state['cursor']
+            self.boundary_ids = set(state.get('boundary_ids', []))
+
+    def remove(self, product_id):
+        with self._lock:
+            for key in [key for key in self.items if key[0] == product_id or key[1] == product_id]:
+                entry = self.items.pop(key)
+                self.by_sku.pop(entry['sku'], None)
+
+    def replace_variations(self, product_id, variations):
+        """Index `variations` as the full set of the product's variations, dropping any others."""
+        current = {variation['id'] for variation in variations}
+        with self._lock:
+            for key in [key for key in self.items if key[0] == product_id and key[1] and key[1] not in current]:
+                entry = self.items.pop(key)
+                if self.by_sku.get(entry['sku']) == key:
+                    del self.by_sku[entry['sku']]
+        for variation in variations:
+            self.apply(variation, parent_id=product_id)
+
+    def find_sku(self, sku):
+        with self._lock:
+            key = self.by_sku.get(sku)
+            return self.items.get(key) if key else None
+
+    def size(self):
+        with self._lock:
+            return len(self.items)
+
+    def poll(self):
+        """
+        Fetch products modified since the cursor and the variations of variable ones, and
+        drop products trashed since the cursor.
+        """
+        with self._poll_lock:
+            cursor, boundary_ids = self.cursor, self.boundary_ids
+            trashed = []
+            if cursor:
+                since = _gmt_timestamp(calendar.timegm(time.strptime(cursor, '%Y-%m-%dT%H:%M:%S')) - 1)
+                params = {'per_page': 100, 'page': 1, 'modified_after': since, 'dates_are_gmt': True}
+
+                def changed(extra):
+                    found = _fetch_pages(f"{self.base_url}/products", self.headers, {**params, **extra})
+                    return [product for product in found
+                            if not (product.get('date_modified_gmt') == cursor and product['id'] in boundary_ids)]
+
+                products = changed({})
+                # The default status filter leaves trashed products out of the listing above
+                trashed = changed({'status': 'trash'})
+            else:
+                products = scan_all(self.base_url, self.headers, 'products')
+            for product in products:
+                self.apply(product)
+            for product in trashed:
+                self.remove(product['id'])
+            variable_ids = [product['id'] for product in products if product.get('type') == 'variable']
+            for product in products:
+                if product.get('type') != 'variable':
+                    # A product that stopped being variable keeps no variations
+                    self.replace_variations(product['id'], [])
+
+            def fetch_variations(product_id):
+                url = f"{self.base_url}/products/{product_id}/variations"
+                return product_id, _fetch_pages(url, self.headers, {'per_page': 100, 'page': 1})
+
+            with ThreadPoolExecutor(max_workers=STOCK_FETCH_WORKERS) as pool:
+                for product_id, variations in pool.map(fetch_variations, variable_ids):
+                    self.replace_variations(product_id, variations)
+            # Advance only once the variations are in, so a failed poll is retried in full
+            polled = products + trashed
+            next_cursor = max([cursor] + [product.get('date_modified_gmt') or '' for product in polled])
+            next_boundary = {product['id'] for product in polled if product.get('date_modified_gmt') == next_cursor}
+            if next_cursor == cursor:
+                next_boundary |= boundary_ids
+            with self._lock:
+                self.cursor, self.boundary_ids = next_cursor, next_boundary
+            self.last_poll = time.time()
+            return len(products)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(STOCK_POLL_INTERVAL)
+            try:
+                self.poll()
+            except Exception as e:
+                print('Inventory poll error:', str(e), file=sys.stderr)
+
+    def low_stock(self, threshold=None, include_out_of_stock=True):
+        with self._lock:
+            entries = list(self.items.values())
+        low = []
+        for entry in entries:
+            if entry['stock_status'] == 'outofstock':
+                if include_out_of_stock:
+                    low.append(entry)
+                continue
+            if not entry['manage_stock'] or entry['stock_quantity'] is None:
+                continue
+            limit = threshold if threshold is not None else (entry['low_stock_amount'] or LOW_STOCK_THRESHOLD)
+            if entry['stock_quantity'] <= limit:
+                low.append(entry)
+        return sorted(low, key=lambda entry: (entry['stock_quantity'] or 0, entry['product_id']))
+
+
+_inventory_trackers = {}
+_inventory_lock = threading.Lock()
+
+
+def get_inventory_tracker(base_url, headers):
+    """Return the site's tracker, loading the full index and starting its poller on first use."""
+    with _inventory_lock:
+        tracker = _inventory_trackers.get(base_url)
+        if tracker is None:
+            tracker = _inventory_trackers[base_url] = InventoryTracker(base_url, headers)
+            restore_section(base_url, 'inventory', tracker.restore)
+    if tracker.last_poll is None:
+        tracker.poll()
+        tracker.start()
+    return tracker
+
+
+@mcp.tool()
+def get_low_stock(threshold: int = -1, include_out_of_stock: bool = True, sku: str = "", limit: int = 50, refresh: bool = False, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
+    """
+    Get low-stock products and variations from the in-memory inventory index.
+
+    The first call loads the whole catalog; afterwards a background poller fetches only
+    products modified since the last poll every MCP_STOCK_POLL_INTERVAL seconds.
+
+    Args:
+        threshold (int): Report stock-managed items with at most this quantity. -1 uses each
+            item's low_stock_amount, falling back to MCP_LOW_STOCK_THRESHOLD.
+        include_out_of_stock (bool): Whether to include items whose stock status is 'outofstock'.
+        sku (str, optional): Return only the stock entry for this SKU.
+        limit (int): Maximum number of items to return.
+        refresh (bool): Poll for changes before answering.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
+        consumer_key (str): The WooCommerce REST API consumer key.
+        consumer_secret (str): The WooCommerce REST API consumer secret.
+
+    Returns:
+        dict: The number of low-stock items, up to `limit` of them (lowest quantity first)
+            and the index size and time of the last poll.
+    """
+    base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
+    tracker = get_inventory_tracker(base_url, headers)
+    if refresh:
+        tracker.poll()
+    if sku:
+        entry = tracker.find_sku(sku)
+        items = [entry] if entry else []
+    else:
+        items = tracker.low_stock(None if threshold < 0 else threshold, include_out_of_stock)
+    return {
+        'count': len(items),
+        'items': [item.to_dict() for item in items[:limit]],
+        'indexed': tracker.size(),
+        'last_poll': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(tracker.last_poll)),
+    }
+
+# --- Bulk export ---
+# Exports stream every matching record to a local NDJSON or CSV file page by page, so
+# memory stays constant regardless of store size. CSV rows are spooled as flattened
+# NDJSON first and the CSV is written once every page is in, so its header holds the
+# columns of all rows, not just those of the first page. A checkpoint file next to the
+# export records the last written page, letting an interrupted export resume where it
+# stopped. Export files must live under EXPORT_DIR.
+EXPORT_DIR = os.environ.get('MCP_EXPORT_DIR', os.path.join(CACHE_DIR, 'exports'))
+EXPORT_RESOURCES = ('orders', 'products', 'customers', 'refunds')
+EXPORT_FORMATS = ('ndjson', 'csv')
+
+
+def _confined_path(directory, path):
+    """Resolve `path` relative to `directory`, refusing anything that ends up outside it."""
+    root = os.path.realpath(directory)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        raise Exception(f"Path '{path}' is outside {root}")
+    return resolved
+
+
+def _flatten_record(record, prefix=''):
+    """Flatten nested dicts into dotted keys for CSV; lists are kept as JSON strings."""
+    flat = {}
+    for key, value in record.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten_record(value, name + '.'))
+        elif isinstance(value, list):
+            flat[name] = json.dumps(value, default=str)
+        else:
+            flat[name] = value
+    return flat
+
+
+def run_export(base_url, headers, resource, path, format='ndjson', filters=None, per_page=100, resume=True, progress=None):
+    """
+    Stream all records of `resource` matching `filters` into `path`.
+
+    `progress`, when given, is called as progress(pages_done, total_pages, rows) after
+    every written page. Returns a dict with the path, row count and page count.
+    """
+    if resource not in EXPORT_RESOURCES:
+        raise Exception(f'Unsupported export resource: {resource}')
+    if format not in EXPORT_FORMATS:
+        raise Exception(f'Unsupported export format: {format}')
+    filters = dict(filters or {})
+    checkpoint_path = path + '.checkpoint'
+    data_path = path + '.rows' if format == 'csv' else path
+    state = {'resource': resource, 'format': format, 'filters': filters, 'page': 0, 'rows': 0, 'columns': []}
+    if resume and os.path.exists(checkpoint_path) and os.path.exists(data_path):
+        with open(checkpoint_path) as f:
+            saved = json.load(f)
+        if all(saved.get(key) == state[key] for key in ('resource', 'format', 'filters')):
+            state = saved
+    resumed_from = state['page']
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    params = {**filters, 'per_page': per_page, 'page': state['page'] + 1}
+    started = time.time()
+    pages = 0
+    columns = set(state['columns'] or ())
+    with open(data_path, 'a' if resumed_from else 'w') as out:
+        for page, total_pages, batch in _iter_pages(f"{base_url}/{resource}", headers, params):
+            if not batch:
+                break
+            for record in batch:
+                if format == 'csv':
+                    record = _flatten_record(record)
+                    columns.update(record)
+                out.write(json.dumps(record, default=str) + '\n')
+            out.flush()
+            state['columns'] = sorted(columns)
+            pages += 1
+            state['page'] = page
+            state['rows'] += len(batch)
+            with open(checkpoint_path, 'w') as f:
+                json.dump(state, f)
+            if progress:
+                progress(page, total_pages, state['rows'])
+
+    if format == 'csv':
+        with open(data_path) as rows, open(path, 'w', newline='') as out:
+            writer = csv.DictWriter(out, fieldnames=state['columns'])
+            writer.writeheader()
+            for line in rows:
+                writer.writerow(json.loads(line))
+        os.remove(data_path)
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return {
+        'path': os.path.abspath(path),
+        'resource': resource,
+        'format': format,
+        'rows': state['rows'],
+        'pages': state['page'],
+        'resumed_from_page': resumed_from,
+        'seconds': round(time.time() - started, 2),
+    }
+
+
+@mcp.tool()
+def export_records(resource: str, format: str = "ndjson", path: str = "", filters: dict = None, per_page: int = 100, resume: bool = True, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
+    """
+    Export all matching WooCommerce records to a local NDJSON or CSV file.
+
+    Pages are fetched concurrently and written in order as they arrive. Only the file
+    path and row counts are returned, never the records themselves.
+
+    Args:
+        resource (str): What to export: 'orders', 'products', 'customers' or 'refunds'.
+        format (str): Output format, 'ndjson' (one JSON record per line) or 'csv'
+            (nested fields flattened to dotted columns, lists JSON-encoded).
+        path (str, optional): Output file path, relative to MCP_EXPORT_DIR or inside it.
+            Defaults to MCP_EXPORT_DIR/<resource>.<format>.
+        filters (dict, optional): List filters passed to the API, e.g.
+            {'status': 'completed', 'after': '2024-01-01T00:00:00'}.
+        per_page (int): Records per API page (max 100).
+        resume (bool): Continue from the checkpoint of an interrupted export to the same path.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
+        consumer_key (str): The WooCommerce REST API consumer key.
+        consumer_secret (str): The WooCommerce REST API consumer secret.
+
+    Returns:
+        dict: The absolute file path, number of rows and pages written, the page the
+            export resumed from (0 for a fresh export) and the elapsed seconds.
+    """
+    base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
+    path = _confined_path(EXPORT_DIR, path or f"{resource}.{format}")
+
+    def progress(page, total_pages, rows):
+        print(f'Export {resource}: page {page}/{total_pages or "?"}, {rows} rows', file=sys.stderr)
+        report_job_progress(page, total_pages, f'{rows} rows exported')
+
+    return run_export(base_url, headers, resource, path, format, filters, per_page, resume, progress)
+
+# --- Taxonomy index ---
+# Per-site lookup tables for product categories, tags, attributes and attribute terms.
+# Each kind is loaded with full pagination on first use and kept coherent by the
+# create/update/delete taxonomy tools through woo_send(), so turning "Shoes" into a
+# category id is a dict lookup instead of paging through the API. Changes made outside
+# this server are picked up by reloading a kind once it is TAXONOMY_MAX_AGE seconds old,
+# or on a miss once it is TAXONOMY_MISS_RELOAD seconds old. Names are stored unescaped
+# ("Shoes & Boots", not "Shoes &amp; Boots"). A category whose name is not unique is
+# looked up by its path, e.g. "Men > Shoes".
+TAXONOMY_KINDS = {'category': 'categories', 'tag': 'tags', 'attribute': 'attributes', 'term': 'terms'}
+TAXONOMY_PATH = re.compile(r'^products/(categories|tags|attributes|attributes/\d+/terms)(?:/(\d+))?$')
+TAXONOMY_MAX_AGE = int(os.environ.get('MCP_TAXONOMY_MAX_AGE', '3600'))
+TAXONOMY_MISS_RELOAD = int(os.environ.get('MCP_TAXONOMY_MISS_RELOAD', '60'))
+
+
+class TaxonomyIndex:
+    def __init__(self, base_url, headers):
+        self.base_url = base_url
+        self.headers = headers
+        self._by_id = {}  # kind -> {id: term}
+        self._by_key = {}  # kind -> {lowercased name or slug: set of ids}
+        self._loaded_at = {}  # kind -> when it was fully loaded
+        self._lock = threading.RLock()
+        self.changes = 0
+
+    def _load(self, kind):
+        url = f"{self.base_url}/products/{kind}"
+        if kind == 'attributes':
+            # The attributes endpoint is not paginated and always returns every attribute
+            response = tenant_request('GET', url, headers=self.headers)
+            response.raise_for_status()
+            terms = response.json()
+        else:
+            terms = _fetch_pages(url, self.headers, {'per_page': 100})
+        self._by_id[kind] = {}
+        self._by_key[kind] = {}
+        self._loaded_at[kind] = time.time()
+        for term in terms:
+            self.upsert(kind, term)
+
+    def _ensure(self, kind, refresh=False):
+        with self._lock:
+            if refresh or kind not in self._by_id or time.time() - self._loaded_at[kind] > TAXONOMY_MAX_AGE:
+                self._load(kind)
+
+    @staticmethod
+    def _keys(kind, term):
+        keys = {str(term.get('name') or '').lower(), str(term.get('slug') or '').lower()}
+        if kind == 'attributes' and (term.get('slug') or '').startswith('pa_'):
+            keys.add(term['slug'][3:].lower())
+        return keys - {''}
+
+    def upsert(self, kind, term):
+        with self._lock:
+            if kind not in self._by_id:
+                # Not loaded yet: the full load will pick the term up
+                return
+            previous = self._by_id[kind].get(term['id'])
+            if previous:
+                self._unkey(kind, previous)
+            entry = {'id': term['id'], 'name': html.unescape(term.get('name') or ''), 'slug': term.get('slug')}
+            if 'parent' in term:
+                entry['parent'] = term['parent']
+            self._by_id[kind][term['id']] = entry
+            for key in self._keys(kind, entry):
+                self._by_key[kind].setdefault(key, set()).add(term['id'])
+            self.changes += 1
+
+    def _unkey(self, kind, term):
+        for key in self._keys(kind, term):
+            ids = self._by_key[kind].get(key)
+            if ids:
+                ids.discard(term['id'])
+                if not ids:
+                    del self._by_key[kind][key]
+
+    def remove(self, kind, term_id):
+        with self._lock:
+            term = self._by_id.get(kind, {}).pop(term_id, None)
+            if term:
+                self._unkey(kind, term)
+            if kind == 'attributes':
+                self._by_id.pop(f"attributes/{term_id}/terms", None)
+                self._by_key.pop(f"attributes/{term_id}/terms", None)
+            self.changes += 1
+
+    def path(self, kind, term):
+        """The term's name preceded by its ancestors', e.g. 'Men > Shoes'."""
+        names, seen = [], set()
+        while term and term['id'] not in seen:
+            seen.add(term['id'])
+            names.append(term['name'])
+            term = self._by_id[kind].get(term.get('parent') or 0)
+        return ' > '.join(reversed(names))
+
+    def _find(self, kind, value):
+        """IDs of the terms matching an int ID, a name or slug, or a 'Parent > Child' path."""
+        if isinstance(value, int) and not isinstance(value, bool):
+            return [value] if value in self._by_id[kind] else []
+        key = ' '.join(html.unescape(str(value)).split()).lower()
+        ids = self._by_key[kind].get(key)
+        if ids:
+            return sorted(ids)
+        if '>' not in key:
+            return []
+        wanted = [segment.strip() for segment in key.split('>')]
+        return sorted(term_id for term_id in self._by_key[kind].get(wanted[-1], ())
+                      if self.path(kind, self._by_id[kind][term_id]).lower().split(' > ')[-len(wanted):] == wanted)
+
+    def lookup(self, kind, value):
+        """
+        Return the indexed term for an int ID, a name, slug or 'Parent > Child' path
+        (case-insensitive), or None. Digit strings are names, not IDs. A miss reloads the
+        kind once if it was loaded more than TAXONOMY_MISS_RELOAD seconds ago; a name
+        shared by several terms raises an error listing their paths.
+        """
+        self._ensure(kind)
+        with self._lock:
+            ids = self._find(kind, value)
+            if not ids and time.time() - self._loaded_at[kind] > TAXONOMY_MISS_RELOAD:
+                self._load(kind)
+                ids = self._find(kind, value)
+            if len(ids) > 1:
+                paths = [self.path(kind, self._by_id[kind][term_id]) for term_id in ids]
+                raise Exception(f"'{value}' matches several {kind}: {paths}; use the path or the ID")
+            return self._by_id[kind][ids[0]] if ids else None
+
+    def snapshot(self):
+        with self._lock:
+            return {kind: {'loaded_at': self._loaded_at.get(kind, 0), 'terms': list(terms.values())}
+                    for kind, terms in self._by_id.items()}
+
+    def restore(self, state):
+        """Reuse kinds loaded less than MCP_TAXONOMY_MAX_AGE ago; older ones reload on use."""
+        with self._lock:
+            for kind, saved in state.items():
+                if kind in self._by_id or time.time() - saved['loaded_at'] > min(SNAPSHOT_MAX_AGE, TAXONOMY_MAX_AGE):
+                    continue
+                self._by_id[kind] = {}
+                self._by_key[kind] = {}
+                self._loaded_at[kind] = saved['loaded_at']
+                for term in saved['terms']:
+                    self.upsert(kind, term)
+
+
+_taxonomy_indexes = {}
+_taxonomy_indexes_lock = threading.Lock()
+
+
+def get_taxonomy_index(base_url, headers):
+    with _taxonomy_indexes_lock:
+        if base_url not in _taxonomy_indexes:
+            _taxonomy_indexes[base_url] = TaxonomyIndex(base_url, headers)
+            restore_section(base_url, 'taxonomy', _taxonomy_indexes[base_url].restore)
+        return _taxonomy_indexes[base_url]
+
+
+def _taxonomy_write(base_url, method, path, data):
+    """Apply a successful taxonomy write from woo_send() to the site's index."""
+    match = TAXONOMY_PATH.match(path)
+    index = _taxonomy_indexes.get(base_url)
+    if not match or index is None:
+        return
+    kind, term_id = match.groups()
+    if method == 'DELETE' and term_id:
+        index.remove(kind, int(term_id))
+    elif isinstance(data, dict) and 'id' in data:
+        index.upsert(kind, data)
+
+
+@mcp.tool()
+def resolve_taxonomy(kind: str, names: list, attribute: Union[str, int] = "", refresh: bool = False, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
+    """
+    Resolve product category, tag, attribute or attribute term names to their IDs.
+
+    Lookups are served from a per-site index loaded with full pagination, kept up to
+    date by the create/update/delete taxonomy tools and reloaded when it gets old or a
+    name is not found.
+
+    Args:
+        kind (str): One of 'category', 'tag', 'attribute' or 'term'.
+        names (list): Names or slugs (case-insensitive) or integer IDs to resolve, e.g.
+            ['Shoes', 'boots', 15]. Digit strings such as '2024' are names. A category name
+            used by several categories must be given as a path, e.g. 'Men > Shoes'.
+        attribute (str or int, optional): For kind 'term', the attribute name, slug or
+            integer ID the terms belong to.
+        refresh (bool): Reload the index from the store before resolving.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
+        consumer_key (str): The WooCommerce REST API consumer key.
+        consumer_secret (str): The WooCommerce REST API consumer secret.
+
+    Returns:
+        dict: 'resolved' maps each found name to {'id', 'name', 'slug'}; 'missing' lists
+            the names that do not exist and 'ambiguous' maps names shared by several terms
+            to the error listing their paths.
+    """
+    if kind not in TAXONOMY_KINDS:
+        raise Exception(f"Invalid taxonomy kind: {kind}. Use one of {', '.join(TAXONOMY_KINDS)}")
+    base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
+    index = get_taxonomy_index(base_url, headers)
+    index_kind = TAXONOMY_KINDS[kind]
+    if kind == 'term':
+        index._ensure('attributes', refresh)
+        parent = index.lookup('attributes', attribute)
+        if parent is None:
+            raise Exception(f'Unknown attribute: {attribute}')
+        index_kind = f"attributes/{parent['id']}/terms"
+    index._ensure(index_kind, refresh)
+    resolved, missing, ambiguous = {}, [], {}
+    for name in names:
+        try:
+            term = index.lookup(index_kind, name)
+        except Exception as error:
+            ambiguous[str(name)] = str(error)
+            continue
+        if term is None:
+            missing.append(name)
+        else:
+            resolved[str(name)] = term
+    return {'kind': kind, 'resolved': resolved, 'missing': missing, 'ambiguous': ambiguous}
+
+# --- Bulk import ---
+# Imports stream rows from a local CSV/NDJSON file, validate them against the fields
+# documented on create_product/create_customer, and upload them through the /batch
+# endpoints in chunks of IMPORT_BATCH_SIZE with at most IMPORT_WORKERS chunks in flight.
+# Rows whose SKU (products) or email (customers) already exists are updated instead of
+# created, so re-running an import is idempotent. Input files and reports must live
+# under IMPORT_DIR.
+IMPORT_DIR = os.environ.get('MCP_IMPORT_DIR', os.path.join(CACHE_DIR, 'imports'))
+IMPORT_BATCH_SIZE = 100  # WooCommerce rejects batches of more than 100 items
+IMPORT_WORKERS = int(os.environ.get('MCP_IMPORT_WORKERS', '3'))
+IMPORT_REQUIRED_FIELDS = {
+    'products': ('name', 'type', 'regular_price', 'description'),
+    'customers': ('email', 'first_name', 'last_name'),
+}
+IMPORT_KEY_FIELDS = {'products': 'sku', 'customers': 'email'}
+PRODUCT_TYPES = ('simple', 'variable', 'grouped', 'external')
+
+
+def _unflatten_row(row):
+    """Turn dotted CSV columns back into nested dicts and decode JSON list/dict cells."""
+    record = {}
+    for column, value in row.items():
+        if value is None or value == '':
+            continue
+        if isinstance(value, str) and value[:1] in '[{':
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass
+        target = record
+        parts = column.split('.')
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = value
+    return record
+
+
+def _iter_import_rows(path):
+    """
+    Yield (line_number, record, error) from a CSV or NDJSON file without loading it whole.
+
+    A row that cannot be parsed into an object is yielded with record None and the
+    reason in `error`, so one bad line does not abort the rest of the import.
+    """
+    with open(path, newline='') as f:
+        if path.endswith('.csv'):
+            for line_number, row in enumerate(csv.DictReader(f), start=2):
+                if None in row:
+                    yield line_number, None, 'row has more fields than the header'
+                else:
+                    yield line_number, _unflatten_row(row), None
+        else:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as error:
+                    yield line_number, None, f'invalid JSON: {error}'
+                    continue
+                if isinstance(record, dict):
+                    yield line_number, record, None
+                else:
+                    yield line_number, None, f'expected a JSON object, got {type(record).__name__}'
+
+
+def _import_key(resource, record):
+    """Return the SKU/email a row is matched on, lowercasing emails; None if it has none."""
+    key = record.get(IMPORT_KEY_FIELDS[resource])
+    if key in (None, ''):
+        return None
+    return str(key).lower() if resource == 'customers' else str(key)
+
+
+def _validate_import_row(resource, record, base_url, headers):
+    """Return a list of problems with `record`; resolves category/tag names to ids in place."""
+    errors = [f"missing required field '{field}'" for field in IMPORT_REQUIRED_FIELDS[resource]
+              if record.get(field) in (None, '')]
+    if resource == 'products':
+        if record.get('type') and record['type'] not in PRODUCT_TYPES:
+            errors.append(f"invalid type '{record['type']}'")
+        for field in ('regular_price', 'sale_price'):
+            if record.get(field) not in (None, '') and _to_number(record[field]) is None:
+                errors.append(f"{field} is not a number")
+            elif record.get(field) not in (None, ''):
+                record[field] = str(record[field])
+        index = get_taxonomy_index(base_url, headers)
+        for kind in ('categories', 'tags'):
+            terms = record.get(kind)
+            if terms in (None, ''):
+                continue
+            if isinstance(terms, str):
+                terms = [name.strip() for name in terms.split('|') if name.strip()]
+            resolved = []
+            for term in terms:
+                if isinstance(term, dict):
+                    resolved.append(term)
+                    continue
+                try:
+                    found = index.lookup(kind, term)
+                except Exception as error:
+                    errors.append(str(error))
+                    continue
+                if found:
+                    resolved.append({'id': found['id']})
+                else:
+                    errors.append(f"unknown {kind[:-1] if kind == 'tags' else 'category'} '{term}'")
+            record[kind] = resolved
+    elif '@' not in str(record.get('email', '')):
+        errors.append('email is not valid')
+    return errors
+
+
+def _customer_emails(base_url, headers):
+    """Map lowercased email -> id for every customer, whatever their role."""
+    emails = {}
+    for batch in iter_scan(base_url, headers, 'customers', {'role': 'all', '_fields': 'id,email'}):
+        for customer in batch:
+            if customer.get('email'):
+                emails[customer['email'].lower()] = customer['id']
+    return emails
+
+
+def _existing_ids(resource, base_url, headers, keys, emails=None):
+    """Map SKU/email -> id for records that already exist in the store."""
+    if resource == 'products':
+        found = _fetch_pages(f"{base_url}/products", headers, {'sku': ','.join(keys), 'per_page': 100})
+        return {product['sku']: product['id'] for product in found if product.get('sku')}
+    return {email: emails[email] for email in keys if email in emails}
+
+
+def _import_chunk(resource, base_url, headers, chunk, emails=None):
+    """
+    Upload one chunk of (line_number, record) through /batch and return per-row results.
+
+    `emails` is the email -> id map of existing customers; it is only read here, the
+    caller adds the customers this chunk creates. The caller also keeps each SKU/email
+    to one row per chunk. A failed request marks every row of the chunk as an error.
+    """
+    key_field = IMPORT_KEY_FIELDS[resource]
+    keys = [key for key in (_import_key(resource, record) for _, record in chunk) if key]
+    try:
+        existing = _existing_ids(resource, base_url, headers, keys, emails) if keys else {}
+    except requests.RequestException as error:
+        return [{'line': line_number, 'key': record.get(key_field), 'status': 'error', 'id': None,
+                 'error': f'Lookup of existing records failed: {error}'} for line_number, record in chunk]
+
+    creates, updates = [], []
+    for line_number, record in chunk:
+        key = _import_key(resource, record)
+        if key and key in existing:
+            updates.append((line_number, {**record, 'id': existing[key]}))
+        else:
+            creates.append((line_number, record))
+
+    payload = {'create': [record for _, record in creates], 'update': [record for _, record in updates]}
+    try:
+        response = tenant_request('POST', f"{base_url}/{resource}/batch", json=payload, headers=headers)
+        response.raise_for_status()
+        data = response.json()
+    except requests.RequestException as error:
+        return [{'line': line_number, 'key': record.get(key_field), 'status': 'error', 'id': None,
+                 'error': f'Batch request failed: {error}'} for line_number, record in creates + updates]
+    finally:
+        # The store may have applied part of a failed batch
+        entity_cache.invalidate(base_url, resource)
+
+    results = []
+    for action, rows in (('created', creates), ('updated', updates)):
+        outcomes = data.get('create' if action == 'created' else 'update', [])
+        for (line_number, record), outcome in zip(rows, outcomes):
+            error = outcome.get('error')
+            results.append({
+                'line': line_number,
+                'key': record.get(key_field),
+                'status': 'error' if error else action,
+                'id': outcome.get('id') or None,
+                'error': error.get('message') if error else None,
+            })
+    return results
+
+
+def run_import(base_url, headers, resource, path, report_path, dry_run=False, progress=None):
+    """
+    Validate and upload every row of `path`, writing one NDJSON result line per row
+    to `report_path`. `progress`, when given, is called as progress(rows_done, counts).
+    """
+    if resource not in IMPORT_REQUIRED_FIELDS:
+        raise Exception(f'Unsupported import resource: {resource}')
+    counts = Counter()
+    started = time.time()
+    emails = None
+
+    with open(report_path, 'w') as report, ThreadPoolExecutor(max_workers=IMPORT_WORKERS) as pool:
+        # (future, keys) per chunk in flight, oldest first
+        pending = deque()
+
+        def record_results(results):
+            for result in results:
+                counts[result['status']] += 1
+                report.write(json.dumps(result) + '\n')
+                if emails is not None and result['status'] == 'created' and result['key']:
+                    emails[str(result['key']).lower()] = result['id']
+            if progress:
+                progress(sum(counts.values()), dict(counts))
+
+        def submit(chunk):
+            nonlocal emails
+            if dry_run:
+                record_results([{'line': line, 'key': record.get(IMPORT_KEY_FIELDS[resource]),
+                                 'status': 'valid', 'id': None, 'error': None} for line, record in chunk])
+                return
+            if resource == 'customers' and emails is None:
+                # One scan of all customers instead of a lookup per email
+                emails = _customer_emails(base_url, headers)
+            keys = {key for key in (_import_key(resource, record) for _, record in chunk) if key}
+            pending.append((pool.submit(_import_chunk, resource, base_url, headers, chunk, emails), keys))
+            # Bound the rows held in memory to IMPORT_WORKERS chunks in flight
+            while len(pending) >= IMPORT_WORKERS:
+                record_results(pending.popleft()[0].result())
+
+        chunk, chunk_keys = [], set()
+        for line_number, record, error in _iter_import_rows(path):
+            if error:
+                record_results([{'line': line_number, 'key': None, 'status': 'invalid', 'id': None,
+                                 'error': error}])
+                continue
+            errors = _validate_import_row(resource, record, base_url, headers)
+            if errors:
+                record_results([{'line': line_number, 'key': record.get(IMPORT_KEY_FIELDS[resource]),
+                                 'status': 'invalid', 'id': None, 'error': '; '.join(errors)}])
+                continue
+            key = _import_key(resource, record)
+            if key and not dry_run:
+                # A repeated SKU/email must see the earlier row's record, so it goes in a later
+                # chunk sent only once every chunk holding that key has finished
+                if key in chunk_keys:
+                    submit(chunk)
+                    chunk, chunk_keys = [], set()
+                while any(key in keys for _, keys in pending):
+                    record_results(pending.popleft()[0].result())
+                chunk_keys.add(key)
+            chunk.append((line_number, record))
+            if len(chunk) == IMPORT_BATCH_SIZE:
+                submit(chunk)
+                chunk, chunk_keys = [], set()
+        if chunk:
+            submit(chunk)
+        while pending:
+            record_results(pending.popleft()[0].result())
+
+    return {
+        'resource': resource,
+        'rows': sum(counts.values()),
+        'counts': dict(counts),
+        'report_path': os.path.abspath(report_path),
+        'seconds': round(time.time() - started, 2),
+    }
+
+
+@mcp.tool()
+def import_records(resource: str, path: str, report_path: str = "", dry_run: bool = False, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
+    """
+    Import products or customers from a local CSV or NDJSON file in batches.
+
+    Each row is validated locally first. Products need name, type, regular_price and
+    description; customers need email, first_name and last_name. Product categories and
+    tags may be given by name, slug, 'Parent > Child' path (CSV: 'Shoes|Men > Boots') or
+    integer id (a JSON list in CSV: '[15, 16]'); names are resolved to ids from a cached
+    lookup. Valid rows are uploaded through /products/batch or
+    /customers/batch; rows whose SKU or email already exists are updated, so re-running
+    the same file does not create duplicates.
+
+    Args:
+        resource (str): What to import: 'products' or 'customers'.
+        path (str): Path of the input file (.csv, otherwise read as NDJSON), relative to
+            MCP_IMPORT_DIR or inside it. CSV columns may use dotted names for nested
+            fields (e.g. 'billing.city').
+        report_path (str, optional): Where to write the per-row NDJSON report, also
+            inside MCP_IMPORT_DIR. Defaults to '<path>.report.ndjson'.
+        dry_run (bool): Only validate rows and write the report, without uploading.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
+        consumer_key (str): The WooCommerce REST API consumer key.
+        consumer_secret (str): The WooCommerce REST API consumer secret.
+
+    Returns:
+        dict: The number of rows, counts per status ('created', 'updated', 'invalid',
+            'error', or 'valid' for dry runs), the report path and the elapsed seconds.
+    """
+    base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
+    path = _confined_path(IMPORT_DIR, path)
+    report_path = _confined_path(IMPORT_DIR, report_path or path + '.report.ndjson')
+
+    reported = [0]
+    with open(path) as f:
+        total_rows = sum(1 for line in f if line.strip()) - (1 if path.endswith('.csv') else 0)
+
+    def progress(rows, counts):
+        if rows - reported[0] >= IMPORT_BATCH_SIZE:
+            reported[0] = rows
+            print(f'Import {resource}: {rows} rows {counts}', file=sys.stderr)
+        report_job_progress(rows, total_rows, json.dumps(counts))
+
+    return run_import(base_url, headers, resource, path, report_path, dry_run, progress)
+
+# --- Variation matrix ---
+VARIATION_BATCH_SIZE = 100
+VARIATION_BATCH_WORKERS = int(os.environ.get('MCP_VARIATION_BATCH_WORKERS', '3'))
+
+
+def _variation_key(attributes):
+    # Global attributes are matched by id, custom ones by name
+    return frozenset((a.get('id') or str(a.get('name', '')).lower(), str(a.get('option', '')).lower())
+                     for a in attributes)
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+@mcp.tool()
+def generate_variations(product_id: int, attributes: dict, regular_price: str = "", price_adjustments: dict = None, sale_price: str = "", sku_template: str = "", stock_quantity: int = None, delete_missing: bool = False, dry_run: bool = False, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
+    """
+    Create or update every variation of a variable product from attribute value sets.
+
+    The cartesian product of the attribute values is computed locally and diffed against
+    the product's existing variations (fetched in bulk). Only the differences are sent,
+    through /products/{id}/variations/batch in chunks of 100. The parent product's
+    attributes are extended with any missing options first.
+
+    Args:
+        product_id (int): The ID of the variable product.
+        attributes (dict): Attribute name -> list of options, e.g.
+            {'Color': ['Red', 'Blue'], 'Size': ['S', 'M', 'L']}. Names matching a global
+            product attribute (by name or slug) use that attribute; others are custom.
+        regular_price (str): Base regular price for every variation.
+        price_adjustments (dict, optional): Amount added to the base price per option,
+            e.g. {'Size': {'L': '2.00'}}.
+        sale_price (str, optional): Sale price for every variation.
+        sku_template (str, optional): SKU pattern using {parent_sku} and attribute names,
+            e.g. '{parent_sku}-{Color}-{Size}'.
+        stock_quantity (int, optional): Stock quantity for new variations (enables stock management).
+        delete_missing (bool): Delete existing variations whose combination is not in the matrix.
+        dry_run (bool): Only compute and return the diff without writing anything.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
+        consumer_key (str): The WooCommerce REST API consumer key.
+        consumer_secret (str): The WooCommerce REST API consumer secret.
+
+    Returns:
+        dict: The number of combinations and of variations created, updated, deleted and
+            left unchanged, plus any per-variation errors reported by WooCommerce.
+    """
+    base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
+    price_adjustments = price_adjustments or {}
+    # Validate everything up front so a bad argument fails before any write (and in dry runs)
+    for label, value in (('regular_price', regular_price), ('sale_price', sale_price)):
+        if value != "" and _to_number(value) is None:
+            raise Exception(f"{label} must be a number, got '{value}'")
+    for name, adjustments in price_adjustments.items():
+        if name not in attributes:
+            raise Exception(f"price_adjustments names unknown attribute '{name}'")
+        for option, amount in adjustments.items():
+            if _to_number(amount) is None:
+                raise Exception(f"price_adjustments['{name}']['{option}'] must be a number, got '{amount}'")
+    if sku_template:
+        allowed = {'parent_sku', *attributes}
+        try:
+            fields = {field for _, field, _, _ in string.Formatter().parse(sku_template) if field is not None}
+        except ValueError as error:
+            raise Exception(f"Invalid sku_template '{sku_template}': {error}")
+        unknown = sorted(fields - allowed)
+        if unknown:
+            raise Exception(f"sku_template uses unknown placeholders {unknown}; "
+                            f"use {{parent_sku}} or an attribute name: {sorted(attributes)}")
+    index = get_taxonomy_index(base_url, headers)
+    response = tenant_request('GET', f"{base_url}/products/{product_id}", headers=headers)
     response.raise_for_status()
-    return response.json().get('meta_data', [])
+    product = response.json()
+    if product.get('type') != 'variable':
+        raise Exception(f"Product {product_id} is of type '{product.get('type')}'; variations need a variable product")
+
+    # Resolve global attributes and make sure the parent declares every option
+    names = list(attributes)
+    references = {}
+    parent_attributes = product.get('attributes', [])
+    parent_changed = False
+    for name in names:
+        global_attribute = index.lookup('attributes', name)
+        references[name] = {'id': global_attribute['id']} if global_attribute else {'name': name}
+        existing = next((a for a in parent_attributes if (global_attribute and a.get('id') == global_attribute['id'])
+                         or (not a.get('id') and str(a.get('name', '')).lower() == name.lower())), None)
+        if existing is None:
+            existing = {**references[name], 'options': [], 'visible': True, 'variation': True}
+            parent_attributes.append(existing)
+            parent_changed = True
+        missing_options = [option for option in attributes[name] if option not in existing.get('options', [])]
+        if missing_options or not existing.get('variation'):
+            existing['options'] = existing.get('options', []) + missing_options
+            existing['variation'] = True
+            parent_changed = True
+
+    # Desired matrix
+    desired = {}
+    for combination in itertools.product(*(attributes[name] for name in names)):
+        options = dict(zip(names, combination))
+        variation = {'attributes': [{**references[name], 'option': option} for name, option in options.items()]}
+        if regular_price:
+            price = _to_number(regular_price) + sum(
+                _to_number(price_adjustments.get(name, {}).get(option, 0)) for name, option in options.items())
+            variation['regular_price'] = f"{price:.2f}"
+        if sale_price:
+            variation['sale_price'] = sale_price
+        if sku_template:
+            variation['sku'] = sku_template.format_map({'parent_sku': product.get('sku', ''), **options})
+        desired[_variation_key(variation['attributes'])] = variation
+
+    existing_variations = _fetch_pages(f"{base_url}/products/{product_id}/variations", headers, {'per_page': 100})
+    existing_by_key = {}
+    for variation in existing_variations:
+        existing_by_key[_variation_key(variation.get('attributes', []))] = variation
+
+    creates, updates, deletes = [], [], []
+    unchanged = 0
+    for key, variation in desired.items():
+        current = existing_by_key.get(key)
+        if current is None:
+            if stock_quantity is not None:
+                variation = {**variation, 'manage_stock': True, 'stock_quantity': stock_quantity}
+            creates.append(variation)
+            continue
+        changes = {field: value for field, value in variation.items()
+                   if field != 'attributes' and str(current.get(field, '')) != str(value)}
+        if changes:
+            updates.append({'id': current['id'], **changes})
+        else:
+            unchanged += 1
+    if delete_missing:
+        deletes = [variation['id'] for key, variation in existing_by_key.items() if key not in desired]
+
+    result = {
+        'product_id': product_id,
+        'combinations': len(desired),
+        'created': len(creates),
+        'updated': len(updates),
+        'deleted': len(deletes),
+        'unchanged': unchanged,
+        'errors': [],
+    }
+    if dry_run:
+        result['dry_run'] = True
+        result['sample'] = (creates + updates)[:5]
+        return result
+
+    batches = ([{'create': chunk} for chunk in _chunks(creates, VARIATION_BATCH_SIZE)]
+               + [{'update': chunk} for chunk in _chunks(updates, VARIATION_BATCH_SIZE)]
+               + [{'delete': chunk} for chunk in _chunks(deletes, VARIATION_BATCH_SIZE)])
+
+    def send(batch):
+        try:
+            response = tenant_request('POST', f"{base_url}/products/{product_id}/variations/batch", json=batch, headers=headers)
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException as error:
+            # Report every row of a failed batch and let the other batches finish
+            return {action: [{'id': item if action == 'delete' else item.get('id'),
+                              'error': {'message': f'Batch request failed: {error}'}} for item in items]
+                    for action, items in batch.items()}
+
+    try:
+        if parent_changed:
+            woo_send('PUT', f"{base_url}/products/{product_id}", headers, json={'attributes': parent_attributes})
+        with ThreadPoolExecutor(max_workers=VARIATION_BATCH_WORKERS) as pool:
+            for outcome in pool.map(send, batches):
+                for action, items in outcome.items():
+                    for item in items:
+                        if item.get('error'):
+                            result['errors'].append({'action': action, 'id': item.get('id'), 'error': item['error'].get('message')})
+    finally:
+        # Batches that did go through changed the product even if others failed
+        entity_cache.invalidate(base_url, f"products/{product_id}")
+    return result
+
+# --- Order change feed ---
+# Persistent per-site cursors over date_modified_gmt, so polling for new or changed
+# orders costs requests in proportion to the number of changes, not the order count.
+ORDER_FEED_LOOKBACK_HOURS = int(os.environ.get('MCP_ORDER_FEED_LOOKBACK_HOURS', '24'))
+ORDER_CHANGE_FIELDS = ('id', 'number', 'status', 'currency', 'total', 'customer_id', 'billing.email',
+                       'payment_method', 'date_created_gmt', 'date_modified_gmt', 'line_items')
+
+_state_lock = threading.Lock()
+
+
+def load_state(name):
+    """Read a JSON state file from CACHE_DIR, or {} if it does not exist yet."""
+    path = os.path.join(CACHE_DIR, f'{name}.json')
+    with _state_lock:
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+
+def save_state(name, key, value):
+    """Atomically set `key` in the JSON state file `name`."""
+    path = os.path.join(CACHE_DIR, f'{name}.json')
+    with _state_lock:
+        state = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+        state[key] = value
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(state, f)
+        os.replace(path + '.tmp', path)
+
+
+def _gmt_timestamp(seconds):
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(seconds))
+
+
+@mcp.tool()
+def get_order_changes(since_cursor: str = "", limit: int = 50, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
+    """
+    Get orders created or modified since the last call, with the cursor for the next call.
+
+    The cursor is kept per site on local disk, so repeated calls without arguments return
+    only what changed in between. Only orders modified after the cursor are fetched.
+
+    Args:
+        since_cursor (str, optional): GMT date or timestamp (YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS,
+            an offset such as +02:00 is converted) to read changes from, e.g. to re-read a
+            period. It does not move the stored cursor. Defaults to the stored cursor, or
+            MCP_ORDER_FEED_LOOKBACK_HOURS ago on first use.
+        limit (int): Maximum number of changes to include inline. If there are more, all of
+            them are stored behind a handle for read_result/filter_result.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
+        consumer_key (str): The WooCommerce REST API consumer key.
+        consumer_secret (str): The WooCommerce REST API consumer secret.
+
+    Returns:
+        dict: 'changes' with one compact record per order (change is 'created' or
+            'updated'), the total count, 'next_cursor' and, if truncated, a 'handle'.
+    """
+    base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
+    stored = load_state('order_cursors').get(base_url, {})
+    if since_cursor:
+        cursor, delivered = _gmt_timestamp(_parse_gmt(since_cursor)), set()
+    elif stored:
+        cursor, delivered = stored['cursor'], set(stored.get('boundary_ids', []))
+    else:
+        cursor, delivered = _gmt_timestamp(time.time() - ORDER_FEED_LOOKBACK_HOURS * 3600), set()
+
+    # modified_after is exclusive, so re-read the cursor's own second and skip the orders
+    # already delivered at that timestamp
+    since = _gmt_timestamp(_parse_gmt(cursor) - 1)
+    params = {'per_page': 100, 'modified_after': since, 'dates_are_gmt': True}
+    orders = [order for order in _fetch_pages(f"{base_url}/orders", headers, params)
+              if not (order.get('date_modified_gmt') == cursor and order['id'] in delivered)]
+
+    changes = []
+    next_cursor = cursor
+    for order in orders:
+        change = {field: _field_value(order, field) for field in ORDER_CHANGE_FIELDS}
+        change['change'] = 'created' if (order.get('date_created_gmt') or '') > cursor else 'updated'
+        changes.append(change)
+        next_cursor = max(next_cursor, order.get('date_modified_gmt') or '')
+        entity_cache.invalidate(base_url, f"orders/{order['id']}")
+        entity_cache.set((base_url, f"orders/{order['id']}", '{}'), order)
+    boundary_ids = [order['id'] for order in orders if order.get('date_modified_gmt') == next_cursor]
+    if next_cursor == cursor:
+        boundary_ids += list(delivered)
+    if not since_cursor:
+        save_state('order_cursors', base_url, {'cursor': next_cursor, 'boundary_ids': boundary_ids})
+
+    result = {'count': len(changes), 'changes': changes[:limit], 'next_cursor': next_cursor}
+    if len(changes) > limit:
+        result['handle'] = _result_store.put(changes)
+    return result
+
+# --- Background jobs ---
+# Long operations (exports, imports, system tool runs, mass meta updates) can be run as
+# jobs so the MCP call returns immediately. Jobs run on a bounded worker pool; their
+# state is persisted under CACHE_DIR/jobs so status and results survive a restart.
+# Tools report progress through report_job_progress(), which is also where a running
+# job notices that it was cancelled.
+JOB_WORKERS = int(os.environ.get('MCP_JOB_WORKERS', '2'))
+JOB_RETENTION_HOURS = int(os.environ.get('MCP_JOB_RETENTION_HOURS', '168'))
+JOB_TOOLS_EXCLUDED = ('submit_job', 'get_job_status', 'get_job_result', 'cancel_job')
+# Passed to the job's tool but never written to the job files
+JOB_SECRET_ARGUMENTS = ('consumer_key', 'consumer_secret', 'jwt_token', 'wpe_auth_cookie')
+
+
+class JobCancelled(Exception):
+    pass
+
+
+_job_context = threading.local()
+
+
+def report_job_progress(done, total=None, message=''):
+    """Record progress for the job running on this thread; no-op outside jobs."""
+    job_id = getattr(_job_context, 'job_id', None)
+    if job_id is not None:
+        get_job_queue().progress(job_id, done, total, message)
+
+
+class JobQueue:
+    def __init__(self, directory, workers):
+        self.directory = directory
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='mcp-job')
+        self._jobs = {}
+        self._futures = {}
+        self._cancelled = set()
+        self._last_saved = {}
+        self._lock = threading.RLock()
+        self._load()
+
+    def _path(self, job_id, suffix=''):
+        return os.path.join(self.directory, f'{job_id}{suffix}.json')
+
+    def _load(self):
+        if not os.path.isdir(self.directory):
+            return
+        cutoff = time.time() - JOB_RETENTION_HOURS * 3600
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json') or name.endswith('.result.json'):
+                continue
+            with open(os.path.join(self.directory, name)) as f:
+                job = json.load(f)
+            if job.get('finished_at') and job['finished_at'] < cutoff:
+                for suffix in ('', '.result'):
+                    if os.path.exists(self._path(job['id'], suffix)):
+                        os.remove(self._path(job['id'], suffix))
+                continue
+            if job['status'] in ('queued', 'running'):
+                # The process that ran it is gone
+                job['status'] = 'interrupted'
+                job['finished_at'] = time.time()
+            self._jobs[job['id']] = job
+
+    def _save(self, job):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(job['id'])
+        with open(path + '.tmp', 'w') as f:
+            json.dump(job, f, default=str)
+        os.replace(path + '.tmp', path)
+        self._last_saved[job['id']] = time.time()
+
+    def submit(self, tool, arguments):
+        job = {
+            'id': uuid.uuid4().hex[:12],
+            'tool': tool,
+            'arguments': {key: value for key, value in arguments.items() if key not in JOB_SECRET_ARGUMENTS},
+            'status': 'queued',
+            'submitted_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'progress': None,
+            'error': None,
+        }
+        with self._lock:
+            self._jobs[job['id']] = job
+            self._save(job)
+            self._futures[job['id']] = self._executor.submit(self._run, job['id'], globals()[tool], arguments)
+        return job
+
+    def _run(self, job_id, func, arguments):
+        with self._lock:
+            job = self._jobs[job_id]
+            if job_id in self._cancelled:
+                # Cancelled after the worker picked it up, so future.cancel() could not stop it
+                job.update({'status': 'cancelled', 'finished_at': time.time()})
+                self._save(job)
+                return
+            job['status'] = 'running'
+            job['started_at'] = time.time()
+            self._save(job)
+        _job_context.job_id = job_id
+        try:
+            result = func(**arguments)
+            with open(self._path(job_id, '.result'), 'w') as f:
+                json.dump(result, f, default=str)
+            status, error = 'done', None
+        except JobCancelled:
+            status, error = 'cancelled', None
+        except Exception as e:
+            status, error = 'failed', str(e)
+        finally:
+            _job_context.job_id = None
+        with self._lock:
+            job.update({'status': status, 'error': error, 'finished_at': time.time()})
+            self._save(job)
+
+    def progress(self, job_id, done, total, message):
+        with self._lock:
+            job = self._jobs[job_id]
+            job['progress'] = {'done': done, 'total': total, 'message': message}
+            # Persist at most once per second; the final state is always saved by _run
+            if time.time() - self._last_saved.get(job_id, 0) >= 1:
+                self._save(job)
+            cancelled = job_id in self._cancelled
+        if cancelled:
+            raise JobCancelled()
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self.get(job_id)
+            if job['status'] in ('queued', 'running'):
+                self._cancelled.add(job_id)
+                if job['status'] == 'queued' and self._futures[job_id].cancel():
+                    job.update({'status': 'cancelled', 'finished_at': time.time()})
+                    self._save(job)
+            return job
+
+    def get(self, job_id):
+        with self._lock:
+            if job_id not in self._jobs:
+                raise Exception(f'Unknown job: {job_id}')
+            return self._jobs[job_id]
+
+    def status(self, job_id):
+        job = dict(self.get(job_id))
+        progress = job.get('progress') or {}
+        job['elapsed_seconds'] = round((job['finished_at'] or time.time()) - job['started_at'], 1) if job['started_at'] else 0
+        job['eta_seconds'] = None
+        if job['status'] == 'running' and progress.get('total') and progress.get('done'):
+            fraction = min(progress['done'] / progress['total'], 1)
+            job['eta_seconds'] = round(job['elapsed_seconds'] * (1 - fraction) / fraction, 1)
+        if job_id in self._cancelled and job['status'] == 'running':
+            job['status'] = 'cancelling'
+        return job
+
+    def result(self, job_id):
+        job = self.get(job_id)
+        if job['status'] != 'done':
+            raise Exception(f"Job {job_id} is {job['status']}" + (f": {job['error']}" if job['error'] else ''))
+        with open(self._path(job_id, '.result')) as f:
+            return json.load(f)
+
+    def list(self, limit=20):
+        with self._lock:
+            jobs = sorted(self._jobs, key=lambda job_id: self._jobs[job_id]['submitted_at'], reverse=True)
+        return [self.status(job_id) for job_id in jobs[:limit]]
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue(os.path.join(CACHE_DIR, 'jobs'), JOB_WORKERS)
+        return _job_queue
+
+
+@mcp.tool()
+def submit_job(tool: str, arguments: dict = None) -> dict:
+    """
+    Run any tool of this server as a background job and return immediately.
+
+    Use for long operations such as export_records, import_records,
+    run_system_status_tool or many meta updates. Poll with get_job_status and fetch
+    the output with get_job_result.
+
+    Args:
+        tool (str): The name of the tool to run (e.g. 'export_records').
+        arguments (dict, optional): The arguments to call the tool with.
+
+    Returns:
+        dict: The job ID and its initial status.
+    """
+    registered = mcp._tool_manager.get_tool(tool)
+    if tool in JOB_TOOLS_EXCLUDED or registered is None:
+        raise Exception(f'Unknown or unsupported job tool: {tool}')
+    job = get_job_queue().submit(tool, _validate_job_arguments(registered, arguments or {}))
+    return {'job_id': job['id'], 'tool': tool, 'status': job['status']}
+
+
+def _validate_job_arguments(tool, arguments):
+    """
+    Check a job's arguments against the tool's signature the way a direct call would,
+    so bad arguments are rejected at submission rather than when the job runs.
+    Returns the given arguments converted to the parameter types.
+    """
+    model = tool.fn_metadata.arg_model
+    names = {field.alias or name for name, field in model.model_fields.items()}
+    problems = [f'{name}: unexpected argument' for name in sorted(set(arguments) - names)]
+    try:
+        parsed = model.model_validate(tool.fn_metadata.pre_parse_json(arguments)).model_dump_one_level()
+    except ValidationError as error:
+        problems += [f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in error.errors()]
+    if problems:
+        raise Exception(f'Invalid arguments for {tool.name}: ' + '; '.join(problems))
+    return {name: value for name, value in parsed.items() if name in arguments}
+
+
+@mcp.tool()
+def get_job_status(job_id: str = "") -> Union[list, dict]:
+    """
+    Get the status, progress and ETA of a background job.
+
+    Args:
+        job_id (str, optional): The job ID returned by submit_job. Empty lists recent jobs.
+
+    Returns:
+        dict: Job state including status ('queued', 'running', 'cancelling', 'done',
+            'failed', 'cancelled' or 'interrupted'), progress, elapsed and ETA seconds
+            and the error message of failed jobs. A list of jobs when job_id is empty.
+    """
+    queue = get_job_queue()
+    return queue.status(job_id) if job_id else queue.list()
+
+
+@mcp.tool()
+@summarize_result('job_result')
+def get_job_result(job_id: str) -> Union[list, dict]:
+    """
+    Get the output of a finished background job.
+
+    Args:
+        job_id (str): The job ID returned by submit_job.
+
+    Returns:
+        The value the job's tool returned (large results are summarized with a handle).
+    """
+    return get_job_queue().result(job_id)
+
+
+@mcp.tool()
+def cancel_job(job_id: str) -> dict:
+    """
+    Cancel a queued or running background job.
+
+    Queued jobs are cancelled immediately. Running jobs stop at their next progress
+    report (exports after the current page, imports after the current batch); tools
+    that do not report progress run to completion.
+
+    Args:
+        job_id (str): The job ID returned by submit_job.
+
+    Returns:
+        dict: The job's current status.
+    """
+    get_job_queue().cancel(job_id)
+    return get_job_queue().status(job_id)
+
+# --- Composite views ---
+# One call per question instead of one agent step per subresource: the order, product
+# and customer views fetch the entity and its subresources concurrently and merge them
+# into a single compact document. Links are dropped, HTML is stripped from free text,
+# meta is folded into a key/value map and nested lists are reduced to their key fields.
+# A failing subresource is reported under 'errors' instead of failing the whole view.
+COMPOSITE_WORKERS = int(os.environ.get('MCP_COMPOSITE_WORKERS', '4'))
+COMPOSITE_TEXT_CHARS = int(os.environ.get('MCP_COMPOSITE_TEXT_CHARS', '300'))
+HTML_TAG = re.compile(r'<[^>]+>')
+
+
+def _clip(text, limit=COMPOSITE_TEXT_CHARS):
+    text = HTML_TAG.sub('', str(text or '')).strip()
+    return text if len(text) <= limit else text[:limit] + '...'
+
+
+def _meta_map(meta_data):
+    return {meta.get('key'): _clip(meta.get('value')) if isinstance(meta.get('value'), str) else meta.get('value')
+            for meta in meta_data or []}
+
+
+def _pick(record, fields):
+    return {field: _record_value(record, field) for field in fields}
+
+
+def _run_concurrently(calls, errors):
+    """Run {name: zero-argument callable} concurrently; failures are recorded in `errors`."""
+    results = {}
+    with ThreadPoolExecutor(max_workers=COMPOSITE_WORKERS) as pool:
+        futures = {name: pool.submit(call) for name, call in calls.items()}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                errors[name] = str(e)
+                results[name] = None
+    return results
+
+
+@mcp.tool()
+def get_order_360(order_id: int, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
+    """
+    Get everything about one order in a single call: the order with its line items,
+    meta, notes, refunds and the customer who placed it.
+
+    Use this instead of paging get_orders to find the order and then calling
+    get_order_notes, get_order_refunds, get_order_meta and get_customer one after another.
+
+    Args:
+        order_id (int): The ID of the order.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
+        consumer_key (str): The WooCommerce REST API consumer key.
+        consumer_secret (str): The WooCommerce REST API consumer secret.
+
+    Returns:
+        dict: 'order', 'meta', 'notes', 'refunds', 'customer' (None for guest orders),
+            'totals' (refunded and net amounts) and 'errors' for subresources that
+            could not be fetched.
+    """
+    base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
+    start = time.perf_counter()
+    errors = {}
+    with ThreadPoolExecutor(max_workers=COMPOSITE_WORKERS) as pool:
+        order_future = pool.submit(woo_get, f"{base_url}/orders/{order_id}", headers)
+        notes_future = pool.submit(woo_get, f"{base_url}/orders/{order_id}/notes", headers, {'per_page': 100})
+        refunds_future = pool.submit(woo_get, f"{base_url}/orders/{order_id}/refunds", headers, {'per_page': 100})
+        order = order_future.result()
+        # The customer ID is only known once the order is in; notes and refunds keep loading meanwhile
+        customer_future = None
+        if order.get('customer_id'):
+            customer_future = pool.submit(woo_get, f"{base_url}/customers/{order['customer_id']}", headers)
+        parts = {}
+        for name, future in (('notes', notes_future), ('refunds', refunds_future), ('customer', customer_future)):
+            try:
+                parts[name] = future.result() if future is not None else None
+            except Exception as e:
+                errors[name] = str(e)
+                parts[name] = None
+
+    refunds = [
+        {'id': r.get('id'), 'date_created': r.get('date_created'), 'amount': r.get('amount'),
+         'reason': _clip(r.get('reason')), 'refunded_by': r.get('refunded_by')}
+        for r in parts['refunds'] or []
+    ]
+    refunded = round(sum(_to_number(r['amount']) or 0.0 for r in refunds), 2)
+    customer = parts['customer']
+    return {
+        'order': {
+            **_pick(order, ['id', 'number', 'status', 'currency', 'date_created', 'date_modified', 'date_paid',
+                            'date_completed', 'total', 'total_tax', 'shipping_total', 'discount_total',
+                            'payment_method_title', 'transaction_id', 'customer_id', 'customer_note']),
+            'billing': order.get('billing'),
+            'shipping': order.get('shipping'),
+            'line_items': [_pick(item, ['product_id', 'variation_id', 'name', 'sku', 'quantity', 'total'])
+                           for item in order.get('line_items', [])],
+            'shipping_lines': [_pick(line, ['method_title', 'total']) for line in order.get('shipping_lines', [])],
+            'coupon_lines': [_pick(line, ['code', 'discount']) for line in order.get('coupon_lines', [])],
+        },
+        'meta': _meta_map(order.get('meta_data')),
+        'notes': [
+            {'id': n.get('id'), 'date_created': n.get('date_created'), 'author': n.get('author'),
+             'customer_note': n.get('customer_note'), 'note': _clip(n.get('note'))}
+            for n in parts['notes'] or []
+        ],
+        'refunds': refunds,
+        'customer': _pick(customer, ['id', 'email', 'first_name', 'last_name', 'username', 'date_created',
+                                     'is_paying_customer']) if customer else None,
+        'totals': {
+            'total': order.get('total'),
+            'refunded': refunded,
+            'net': round((_to_number(order.get('total')) or 0.0) - refunded, 2),
+        },
+        'errors': errors,
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+@mcp.tool()
+def get_product_360(product_id: int, review_limit: int = 10, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
+    """
+    Get everything about one product in a single call: the product, its variations,
+    recent reviews, meta and a stock summary.
+
+    Args:
+        product_id (int): The ID of the product.
+        review_limit (int): Number of most recent reviews to include.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
+        consumer_key (str): The WooCommerce REST API consumer key.
+        consumer_secret (str): The WooCommerce REST API consumer secret.
+
+    Returns:
+        dict: 'product', 'variations', 'reviews', 'meta', 'stock' (product and
+            variation stock totals) and 'errors' for subresources that could not be fetched.
+    """
+    base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
+    start = time.perf_counter()
+    errors = {}
+    # Variations are requested up front; for simple products the endpoint returns an empty list
+    parts = _run_concurrently({
+        'product': lambda: woo_get(f"{base_url}/products/{product_id}", headers),
+        'variations': lambda: _fetch_pages(f"{base_url}/products/{product_id}/variations", headers, {'per_page': 100}),
+        'reviews': lambda: woo_get(f"{base_url}/products/reviews", headers,
+                                   {'product': product_id, 'per_page': review_limit}),
+    }, errors)
+    product = parts['product']
+    if product is None:
+        raise Exception(f"Product {product_id} could not be fetched: {errors['product']}")
+
+    variations = [
+        {**_pick(v, ['id', 'sku', 'price', 'regular_price', 'sale_price', 'status', 'stock_status', 'stock_quantity']),
+         'attributes': {a.get('name'): a.get('option') for a in v.get('attributes', [])}}
+        for v in parts['variations'] or []
+    ]
+    stock = _pick(product, ['manage_stock', 'stock_status', 'stock_quantity', 'low_stock_amount', 'backorders'])
+    if variations:
+        stock['variation_stock_status'] = dict(Counter(v['stock_status'] for v in variations))
+        stock['variation_stock_quantity'] = sum(v['stock_quantity'] or 0 for v in variations)
+    return {
+        'product': {
+            **_pick(product, ['id', 'name', 'slug', 'type', 'status', 'sku', 'price', 'regular_price', 'sale_price',
+                              'on_sale', 'total_sales', 'average_rating', 'rating_count', 'date_created',
+                              'date_modified', 'permalink']),
+            'short_description': _clip(product.get('short_description')),
+            'categories': [c.get('name') for c in product.get('categories', [])],
+            'tags': [t.get('name') for t in product.get('tags', [])],
+            'attributes': {a.get('name'): a.get('options') for a in product.get('attributes', [])},
+        },
+        'variations': variations,
+        'reviews': [
+            {**_pick(r, ['id', 'date_created', 'reviewer', 'rating', 'status', 'verified']),
+             'review': _clip(r.get('review'))}
+            for r in parts['reviews'] or []
+        ],
+        'meta': _meta_map(product.get('meta_data')),
+        'stock': stock,
+        'errors': errors,
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+@mcp.tool()
+def get_customer_360(customer_id: int, order_limit: int = 20, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
+    """
+    Get everything about one customer in a single call: the customer, their recent
+    orders, meta and their row of the customers report.
+
+    Args:
+        customer_id (int): The ID of the customer.
+        order_limit (int): Number of most recent orders to include.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
+        consumer_key (str): The WooCommerce REST API consumer key.
+        consumer_secret (str): The WooCommerce REST API consumer secret.
+
+    Returns:
+        dict: 'customer', 'orders' (a compact table, see summarize_records), 'meta',
+            'report' and 'errors' for subresources that could not be fetched.
+    """
+    base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
+    start = time.perf_counter()
+    errors = {}
+    parts = _run_concurrently({
+        'customer': lambda: woo_get(f"{base_url}/customers/{customer_id}", headers),
+        'orders': lambda: woo_get(f"{base_url}/orders", headers, {'customer': customer_id, 'per_page': order_limit}),
+        'report': lambda: woo_get(f"{base_url}/reports/customers", headers, {'customer_id': customer_id}),
+    }, errors)
+    customer = parts['customer']
+    if customer is None:
+        raise Exception(f"Customer {customer_id} could not be fetched: {errors['customer']}")
+
+    report = parts['report']
+    if isinstance(report, list):
+        report = next((row for row in report if row.get('id', row.get('customer_id')) == customer_id), report[0] if report else None)
+    return {
+        'customer': {
+            **_pick(customer, ['id', 'email', 'first_name', 'last_name', 'username', 'role', 'date_created',
+                               'date_modified', 'is_paying_customer']),
+            'billing': customer.get('billing'),
+            'shipping': customer.get('shipping'),
+        },
+        'orders': summarize_records('orders', parts['orders'] or []),
+        'meta': _meta_map(customer.get('meta_data')),
+        'report': report,
+        'errors': errors,
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+# --- Cross-order subresources ---
+# Notes and refunds only exist per order. Instead of one sequential request per order,
+# matching orders are scanned (IDs and refund summaries only, see iter_scan) and their
+# subresources are fetched ORDER_SUBRESOURCE_WORKERS at a time while the scan goes on,
+# so per-order latency overlaps. Orders whose listing shows no refunds are skipped for
+# refunds altogether. Per-order responses go through the entity cache.
+ORDER_SUBRESOURCE_WORKERS = int(os.environ.get('MCP_ORDER_SUBRESOURCE_WORKERS', '6'))
+ORDER_SUBRESOURCES = ('notes', 'refunds')
+
+
+def iter_order_subresources(base_url, headers, subresource, filters, max_orders=0, workers=ORDER_SUBRESOURCE_WORKERS):
+    """
+    Yield the notes or refunds of every order matching `filters`, flattened with the
+    order's id, number, status and creation date. Orders are found with iter_scan.
+
+    At most `workers` requests run at once and at most a few batches of results are
+    buffered, so memory stays flat however many orders match.
+    """
+    filters = {**filters, '_fields': 'id,number,status,date_created,date_created_gmt,refunds'}
+    scanned = fetched = 0
+
+    def fetch(order):
+        records = woo_get(f"{base_url}/orders/{order['id']}/{subresource}", headers, {'per_page': 100})
+        return [
+            {'order_id': order['id'], 'order_number': order.get('number'), 'order_status': order.get('status'),
+             'order_date': order.get('date_created'),
+             **{key: value for key, value in record.items() if key != '_links'}}
+            for record in records
+        ]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for batch in iter_scan(base_url, headers, 'orders', filters):
+            for order in batch:
+                if max_orders and scanned >= max_orders:
+                    break
+                scanned += 1
+                if subresource == 'refunds' and not order.get('refunds'):
+                    continue
+                pending.append(pool.submit(fetch, order))
+                fetched += 1
+                while len(pending) > workers * 2:
+                    yield from pending.popleft().result()
+            if max_orders and scanned >= max_orders:
+                break
+        while pending:
+            yield from pending.popleft().result()
+
+
+@mcp.tool()
+def get_order_subresources(subresource: str = "refunds", status: str = "", after: str = "", before: str = "", modified_after: str = "", modified_before: str = "", customer: int = 0, max_orders: int = 0, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
+    """
+    Get notes or refunds across all orders matching a filter, e.g. "all refunds this month".
+
+    Use this instead of calling get_order_notes or get_order_refunds once per order.
+    Refunds issued in a period can belong to older orders; filter on modified_after /
+    modified_before (a refund updates its order) and narrow the result by its own
+    date_created with filter_result.
+
+    Args:
+        subresource (str): 'refunds' or 'notes'.
+        status (str, optional): Order status to match, e.g. 'completed' or 'refunded'.
+        after (str, optional): Only orders created after this GMT date, as YYYY-MM-DD
+            (midnight) or YYYY-MM-DDTHH:MM:SS.
+        before (str, optional): Only orders created before this GMT date (same formats).
+        modified_after (str, optional): Only orders modified after this GMT date (same formats).
+        modified_before (str, optional): Only orders modified before this GMT date (same formats).
+        customer (int, optional): Only orders of this customer ID.
+        max_orders (int): Stop after scanning this many orders (0 = all matching).
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
+        consumer_key (str): The WooCommerce REST API consumer key.
+        consumer_secret (str): The WooCommerce REST API consumer secret.
+
+    Returns:
+        dict: A summary of the flattened records (each with order_id, order_number,
+            order_status and order_date) with a handle for read_result/filter_result.
+    """
+    if subresource not in ORDER_SUBRESOURCES:
+        raise Exception(f"subresource must be one of {', '.join(ORDER_SUBRESOURCES)}")
+    base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
+    filters = {key: value for key, value in (
+        ('status', status), ('after', after), ('before', before), ('modified_after', modified_after),
+        ('modified_before', modified_before), ('customer', customer),
+    ) if value}
+    # Date-only values become midnight timestamps; malformed ones fail before any request
+    filters = _normalize_dates(filters)
+    records = list(iter_order_subresources(base_url, headers, subresource, filters, max_orders))
+    return summarize_with_handle(subresource, records)
+
+
+# --- Daily rollups ---
+# Per-day sales aggregates are materialized locally from order data so historical
+# reports are answered in O(days) without querying the store. The first refresh scans
+# every order (see iter_scan); later ones fetch only orders modified since the cursor,
+# including trashed ones. A ledger keeps what each counted order contributed, so a
+# changed order's previous contribution is subtracted before its new one is added, and
+# orders that are trashed, deleted (order.deleted webhooks) or moved to a status
+# outside ROLLUP_STATUSES are subtracted. Refunds count on the day they were issued,
+# read from the order's refunds when the ledger does not know them yet. Days are
+# store-local (the date part of date_created). Storage is columnar under
+# CACHE_DIR/rollups/<site>: one float64 file per metric, indexed by day, and per-SKU /
+# per-coupon figures as day-ordered arrays with per-day offsets, all read with
+# array.fromfile; the ledger is kept next to them as JSON.
+ROLLUP_DIR = os.path.join(CACHE_DIR, 'rollups')
+ROLLUP_METRICS = ('revenue', 'orders', 'items', 'refunds', 'tax', 'shipping', 'discount')
+ROLLUP_STATUSES = set(os.environ.get('MCP_ROLLUP_STATUSES', 'completed,processing,on-hold,refunded').split(','))
+ROLLUP_ORDER_FIELDS = 'id,status,date_created,date_created_gmt,total,total_tax,shipping_total,discount_total,line_items,coupon_lines,refunds'
+ROLLUP_GROUPS = ('day', 'week', 'month')
+ROLLUP_FORMAT = 2
+
+
+def _day_number(day):
+    return calendar.timegm(time.strptime(day[:10], '%Y-%m-%d')) // 86400
+
+
+def _day_string(number):
+    return time.strftime('%Y-%m-%d', time.gmtime(number * 86400))
+
+
+class RollupBreakdown:
+    """Per-day (key, a, b) entries, e.g. SKU units and revenue, stored day by day in flat arrays."""
+
+    def __init__(self):
+        self.keys = []
+        self._index = {}
+        self.offsets = array.array('q', [0])  # entries of day i are [offsets[i], offsets[i + 1])
+        self.ids = array.array('l')
+        self.a = array.array('d')
+        self.b = array.array('d')
+
+    def key_id(self, key):
+        if key not in self._index:
+            self._index[key] = len(self.keys)
+            self.keys.append(key)
+        return self._index[key]
+
+    def pad(self, before, after):
+        if before:
+            self.offsets = array.array('q', [0] * before) + self.offsets
+        self.offsets.extend([self.offsets[-1]] * after)
+
+    def set_day(self, i, entries):
+        """Replace day i's entries with {key: (a, b)}."""
+        start, end = self.offsets[i], self.offsets[i + 1]
+        rows = [(self.key_id(key), a, b) for key, (a, b) in entries.items()]
+        self.ids[start:end] = array.array('l', [row[0] for row in rows])
+        self.a[start:end] = array.array('d', [row[1] for row in rows])
+        self.b[start:end] = array.array('d', [row[2] for row in rows])
+        delta = len(rows) - (end - start)
+        if delta:
+            for j in range(i + 1, len(self.offsets)):
+                self.offsets[j] += delta
+
+    def add_day(self, i, entries, sign):
+        """Add (sign 1) or subtract (sign -1) {key: (a, b)} to day i's entries."""
+        current = {self.keys[self.ids[n]]: (self.a[n], self.b[n]) for n in range(self.offsets[i], self.offsets[i + 1])}
+        for key, (a, b) in entries.items():
+            old_a, old_b = current.get(key, (0.0, 0.0))
+            current[key] = (round(old_a + sign * a, 4), round(old_b + sign * b, 4))
+        self.set_day(i, {key: values for key, values in current.items() if values != (0.0, 0.0)})
+
+    def totals(self, i0, i1):
+        sums = {}
+        for n in range(self.offsets[i0], self.offsets[i1]):
+            entry = sums.setdefault(self.ids[n], [0.0, 0.0])
+            entry[0] += self.a[n]
+            entry[1] += self.b[n]
+        return {self.keys[key_id]: values for key_id, values in sums.items()}
+
+    def save(self, directory, name):
+        for suffix, values in (('offsets', self.offsets), ('ids', self.ids), ('a', self.a), ('b', self.b)):
+            with open(os.path.join(directory, f'{name}.{suffix}.bin'), 'wb') as f:
+                values.tofile(f)
+
+    def load(self, directory, name, keys):
+        self.keys = list(keys)
+        self._index = {key: i for i, key in enumerate(self.keys)}
+        for suffix in ('offsets', 'ids', 'a', 'b'):
+            path = os.path.join(directory, f'{name}.{suffix}.bin')
+            values = array.array(getattr(self, suffix).typecode)
+            with open(path, 'rb') as f:
+                values.fromfile(f, os.path.getsize(path) // values.itemsize)
+            setattr(self, suffix, values)
+
+
+class DailyRollups:
+    def __init__(self, base_url, headers, directory):
+        self.base_url = base_url
+        self.headers = headers
+        self.directory = directory
+        self.first_day = None  # day number of column index 0
+        self.columns = {metric: array.array('d') for metric in ROLLUP_METRICS}
+        self.skus = RollupBreakdown()  # units, revenue
+        self.coupons = RollupBreakdown()  # uses, discount
+        # order ID -> what it added: [day, {metric: value}, {sku: [units, revenue]},
+        # {coupon: [uses, discount]}, {refund ID: [day, amount]}]
+        self.ledger = {}
+        self.cursor = None
+        self.updated = None
+        self._lock = threading.RLock()
+        self._load()
+
+    def _reset(self):
+        self.first_day = None
+        self.columns = {metric: array.array('d') for metric in ROLLUP_METRICS}
+        self.skus, self.coupons, self.ledger = RollupBreakdown(), RollupBreakdown(), {}
+        self.cursor = self.updated = None
+
+    def __len__(self):
+        return len(self.columns['revenue'])
+
+    def _load(self):
+        meta_path = os.path.join(self.directory, 'meta.json')
+        if not os.path.exists(meta_path):
+            return
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get('format') != ROLLUP_FORMAT:
+            # Written without a ledger: rebuild from scratch
+            return
+        for metric in ROLLUP_METRICS:
+            path = os.path.join(self.directory, f'{metric}.bin')
+            column = array.array('d')
+            with open(path, 'rb') as f:
+                column.fromfile(f, os.path.getsize(path) // column.itemsize)
+            self.columns[metric] = column
+        self.skus.load(self.directory, 'skus', meta['skus'])
+        self.coupons.load(self.directory, 'coupons', meta['coupons'])
+        with open(os.path.join(self.directory, 'ledger.json')) as f:
+            self.ledger = {int(order_id): entry for order_id, entry in json.load(f).items()}
+        self.first_day = meta['first_day']
+        self.cursor = meta['cursor']
+        self.updated = meta['updated']
+
+    def _save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        for metric, column in self.columns.items():
+            with open(os.path.join(self.directory, f'{metric}.bin'), 'wb') as f:
+                column.tofile(f)
+        self.skus.save(self.directory, 'skus')
+        self.coupons.save(self.directory, 'coupons')
+        with open(os.path.join(self.directory, 'ledger.json'), 'w') as f:
+            json.dump(self.ledger, f)
+        # meta.json is written last; it is what marks the files as complete
+        meta = {'format': ROLLUP_FORMAT, 'first_day': self.first_day, 'cursor': self.cursor, 'updated': self.updated,
+                'skus': self.skus.keys, 'coupons': self.coupons.keys}
+        with open(os.path.join(self.directory, 'meta.json.tmp'), 'w') as f:
+            json.dump(meta, f)
+        os.replace(os.path.join(self.directory, 'meta.json.tmp'), os.path.join(self.directory, 'meta.json'))
+
+    def _index(self, day_number):
+        """Column index of a day, growing the columns to cover it."""
+        if self.first_day is None:
+            self.first_day = day_number
+        before = max(0, self.first_day - day_number)
+        after = max(0, day_number - (self.first_day + len(self)) + 1)
+        if before or after:
+            for metric, column in self.columns.items():
+                self.columns[metric] = array.array('d', [0.0] * before) + column + array.array('d', [0.0] * after)
+            self.skus.pad(before, after)
+            self.coupons.pad(before, after)
+            self.first_day -= before
+        return day_number - self.first_day
+
+    @staticmethod
+    def _contribution(order, refunds):
+        """The ledger entry of a counted order; `refunds` maps its refund IDs to [day, amount]."""
+        metrics = dict.fromkeys(('revenue', 'orders', 'items', 'tax', 'shipping', 'discount'), 0.0)
+        metrics['revenue'] = _to_number(order.get('total')) or 0.0
+        metrics['orders'] = 1
+        metrics['tax'] = _to_number(order.get('total_tax')) or 0.0
+        metrics['shipping'] = _to_number(order.get('shipping_total')) or 0.0
+        metrics['discount'] = _to_number(order.get('discount_total')) or 0.0
+        skus, coupons = {}, {}
+        for item in order.get('line_items') or []:
+            quantity = item.get('quantity') or 0
+            metrics['items'] += quantity
+            sku = item.get('sku') or f"product:{item.get('variation_id') or item.get('product_id')}"
+            units, revenue = skus.get(sku, (0.0, 0.0))
+            skus[sku] = [units + quantity, revenue + (_to_number(item.get('total')) or 0.0)]
+        for line in order.get('coupon_lines') or []:
+            uses, discount = coupons.get(line.get('code'), (0.0, 0.0))
+            coupons[line.get('code')] = [uses + 1, discount + (_to_number(line.get('discount')) or 0.0)]
+        return [_day_number(order['date_created']), metrics, skus, coupons, refunds]
+
+    @staticmethod
+    def _add(entry, sign, changes):
+        """Add (sign 1) or subtract (sign -1) a ledger entry to the per-day `changes`."""
+        day, metrics, skus, coupons, refunds = entry
+        change = changes.setdefault(day, (Counter(), {}, {}))
+        for metric, value in metrics.items():
+            change[0][metric] += sign * value
+        for breakdown, totals in ((skus, change[1]), (coupons, change[2])):
+            for key, (a, b) in breakdown.items():
+                old_a, old_b = totals.get(key, (0.0, 0.0))
+                totals[key] = (old_a + sign * a, old_b + sign * b)
+        for refund_day, amount in refunds.values():
+            changes.setdefault(refund_day, (Counter(), {}, {}))[0]['refunds'] += sign * amount
+
+    def apply(self, order_id, entry, changes):
+        """Replace what an order contributes (entry None removes it), collecting the difference in `changes`."""
+        previous = self.ledger.pop(order_id, None)
+        if previous is not None:
+            self._add(previous, -1, changes)
+        if entry is not None:
+            self._add(entry, 1, changes)
+            self.ledger[order_id] = entry
+
+    def _commit(self, changes):
+        """Write the collected per-day differences into the columns, each day once; returns the days changed."""
+        changed = 0
+        for day, (metrics, skus, coupons) in sorted(changes.items()):
+            if all(abs(value) < 1e-9 for values in (metrics.values(), *skus.values(), *coupons.values()) for value in values):
+                continue
+            changed += 1
+            i = self._index(day)
+            for metric, value in metrics.items():
+                self.columns[metric][i] = round(self.columns[metric][i] + value, 4)
+            self.skus.add_day(i, skus, 1)
+            self.coupons.add_day(i, coupons, 1)
+        return changed
+
+    def remove_order(self, order_id):
+        """Subtract a deleted order."""
+        with self._lock:
+            changes = {}
+            self.apply(order_id, None, changes)
+            if changes:
+                self._commit(changes)
+                self._save()
+            return len(changes)
+
+    def _refund_days(self, orders):
+        """{order ID: {refund ID: [day, amount]}} for the counted orders' refunds, fetching unknown ones."""
+        known, missing = {}, []
+        for order in orders:
+            listed = {refund['id']: abs(_to_number(refund.get('total')) or 0.0) for refund in order.get('refunds') or []}
+            previous = (self.ledger.get(order['id']) or [None] * 5)[4] or {}
+            known[order['id']] = {str(refund_id): [previous[str(refund_id)][0], amount]
+                                  for refund_id, amount in listed.items() if str(refund_id) in previous}
+            if len(known[order['id']]) < len(listed):
+                missing.append(order['id'])
+
+        def fetch(order_id):
+            # Bypasses the entity cache, which may not have the new refund yet
+            return order_id, _fetch_pages(f"{self.base_url}/orders/{order_id}/refunds", self.headers, {'per_page': 100})
+
+        with ThreadPoolExecutor(max_workers=ORDER_SUBRESOURCE_WORKERS) as pool:
+            for order_id, refunds in pool.map(fetch, missing):
+                known[order_id] = {str(refund['id']): [_day_number(refund['date_created']), abs(_to_number(refund.get('amount')) or 0.0)]
+                                   for refund in refunds}
+        return known
+
+    def _apply_orders(self, orders, changes):
+        counted = [order for order in orders if order.get('status') in ROLLUP_STATUSES]
+        refunds = self._refund_days(counted)
+        for order in orders:
+            if order.get('status') in ROLLUP_STATUSES:
+                self.apply(order['id'], self._contribution(order, refunds[order['id']]), changes)
+            else:
+                self.apply(order['id'], None, changes)
+
+    def refresh(self):
+        """Apply new, changed and trashed orders; returns the number of days whose figures changed."""
+        with self._lock:
+            started = time.time()
+            changes = {}
+            try:
+                if self.cursor is None:
+                    self._reset()
+                    for batch in iter_scan(self.base_url, self.headers, 'orders', {'_fields': ROLLUP_ORDER_FIELDS}):
+                        self._apply_orders(batch, changes)
+                else:
+                    params = {'per_page': 100, 'modified_after': self.cursor, 'dates_are_gmt': True, '_fields': ROLLUP_ORDER_FIELDS}
+                    for status in ('any', 'trash'):
+                        self._apply_orders(_fetch_pages(f"{self.base_url}/orders", self.headers, {**params, 'status': status}), changes)
+            except Exception:
+                # The ledger already holds part of the changes: go back to the saved state
+                self._reset()
+                self._load()
+                raise
+            changed = self._commit(changes)
+            # Re-applying an order is idempotent, so overlap the cursor a little to absorb clock skew
+            self.cursor = _gmt_timestamp(started - 60)
+            self.updated = _gmt_timestamp(time.time())
+            self._save()
+            return changed
+
+    def report(self, date_min, date_max, group_by='', top=10):
+        with self._lock:
+            if self.first_day is None:
+                return {'date_min': date_min, 'date_max': date_max, 'days': 0, 'totals': dict.fromkeys(ROLLUP_METRICS, 0.0)}
+            i0 = max(0, _day_number(date_min) - self.first_day)
+            i1 = min(len(self), _day_number(date_max) - self.first_day + 1)
+            i1 = max(i0, i1)
+            totals = {metric: round(sum(column[i0:i1]), 2) for metric, column in self.columns.items()}
+            totals['net_revenue'] = round(totals['revenue'] - totals['refunds'], 2)
+            result = {'date_min': date_min, 'date_max': date_max, 'days': i1 - i0, 'totals': totals}
+            if group_by:
+                series = OrderedDict()
+                for i in range(i0, i1):
+                    day = _day_string(self.first_day + i)
+                    if group_by == 'month':
+                        day = day[:7]
+                    elif group_by == 'week':
+                        day = _day_string(self.first_day + i - (self.first_day + i + 3) % 7)  # Monday
+                    bucket = series.setdefault(day, dict.fromkeys(ROLLUP_METRICS, 0.0))
+                    for metric, column in self.columns.items():
+                        bucket[metric] += column[i]
+                result['series'] = [{'period': period, **{m: round(v, 2) for m, v in values.items()}}
+                                    for period, values in series.items()]
+            skus = sorted(self.skus.totals(i0, i1).items(), key=lambda item: -item[1][0])[:top]
+            result['top_skus'] = [{'sku': sku, 'units': units, 'revenue': round(revenue, 2)} for sku, (units, revenue) in skus]
+            coupons = sorted(self.coupons.totals(i0, i1).items(), key=lambda item: -item[1][0])[:top]
+            result['coupons'] = [{'code': code, 'uses': int(uses), 'discount': round(discount, 2)} for code, (uses, discount) in coupons]
+            result['as_of'] = self.updated
+            return result
+
+
+_rollups = {}
+_rollups_lock = threading.Lock()
+
+
+def _site_rollups(base_url, headers):
+    with _rollups_lock:
+        rollups = _rollups.get(base_url)
+        if rollups is None:
+            directory = os.path.join(ROLLUP_DIR, hashlib.sha256(base_url.encode()).hexdigest()[:16])
+            rollups = _rollups[base_url] = DailyRollups(base_url, headers, directory)
+        return rollups
+
+
+def get_rollups(base_url, headers):
+    """Return the site's rollups, materializing them on first use."""
+    rollups = _site_rollups(base_url, headers)
+    if rollups.cursor is None:
+        rollups.refresh()
+    return rollups
+
+
+@mcp.tool()
+def refresh_rollups(site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
+    """
+    Bring the local daily sales rollups up to date with the store.
+
+    The first run scans every order, which takes a while on large stores; run it with
+    submit_job. Later runs only read orders modified (or trashed) since the last one and
+    replace what each of them contributed.
+
+    Args:
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
+        consumer_key (str): The WooCommerce REST API consumer key.
+        consumer_secret (str): The WooCommerce REST API consumer secret.
+
+    Returns:
+        dict: Number of days whose figures changed, the covered date range and the update time.
+    """
+    base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
+    started = time.time()
+    rollups = _site_rollups(base_url, headers)
+    changed = rollups.refresh()
+    return {
+        'days_changed': changed,
+        'first_day': _day_string(rollups.first_day) if rollups.first_day is not None else None,
+        'last_day': _day_string(rollups.first_day + len(rollups) - 1) if len(rollups) else None,
+        'updated': rollups.updated,
+        'seconds': round(time.time() - started, 2),
+    }
+
+
+@mcp.tool()
+def get_rollup_report(date_min: str, date_max: str, group_by: str = "", top: int = 10, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
+    """
+    Get sales totals for any date range from the local daily rollups, without querying the store.
+
+    Covers revenue, orders, items, refunds, tax, shipping and discounts of orders with a
+    counted status (MCP_ROLLUP_STATUSES), plus best-selling SKUs and coupon usage.
+    Figures are as of the last refresh_rollups run ('as_of').
+
+    Args:
+        date_min (str): First day of the range (YYYY-MM-DD, store time).
+        date_max (str): Last day of the range, inclusive (YYYY-MM-DD).
+        group_by (str, optional): Also return a 'series' per 'day', 'week' or 'month'.
+        top (int): Number of SKUs and coupons to list.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
+        consumer_key (str): The WooCommerce REST API consumer key.
+        consumer_secret (str): The WooCommerce REST API consumer secret.
+
+    Returns:
+        dict: 'totals' (including net_revenue), optional 'series', 'top_skus',
+            'coupons' and 'as_of'.
+    """
+    if group_by and group_by not in ROLLUP_GROUPS:
+        raise Exception(f"group_by must be one of {', '.join(ROLLUP_GROUPS)}")
+    base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
+    return get_rollups(base_url, headers).report(date_min, date_max, group_by, top)
+
+
+# --- Contact index ---
+# find_orders / find_customers look people up by email, name, phone, company or address
+# in a local inverted index instead of paging the store or using its slow search. Each
+# index keeps a sorted term list with per-term posting arrays (doc IDs) for prefix
+# matching by binary search. Documents changed since the arrays were built are served
+# from a small in-memory overlay with its own sorted term list, and the arrays are
+# rebuilt once the overlay holds more than 5% of the documents. On disk the arrays and
+# the documents they cover are rewritten only after a rebuild; other changes are
+# appended to a change log. Orders are fed from modified_after; customers, which have
+# no modified filter, by new IDs and a full rescan every CONTACT_CUSTOMER_RESCAN_HOURS.
+# A stale index answers at once and catches up on a background thread.
+CONTACT_DIR = os.path.join(CACHE_DIR, 'contacts')
+CONTACT_INDEX_MAX_AGE = int(os.environ.get('MCP_CONTACT_INDEX_MAX_AGE', '300'))
+CONTACT_CUSTOMER_RESCAN_HOURS = int(os.environ.get('MCP_CONTACT_CUSTOMER_RESCAN_HOURS', '24'))
+CONTACT_ORDER_FIELDS = 'id,number,status,date_created,date_created_gmt,total,currency,customer_id,billing,shipping'
+CONTACT_TEXT_FIELDS = ('name', 'company', 'address', 'shipping_name', 'shipping_address')
+PHONE_QUERY = re.compile(r'[\d\s()+.-]{5,}')
+
+
+def _address(address):
+    parts = [address.get(key) for key in ('address_1', 'address_2', 'city', 'state', 'postcode', 'country')]
+    return ', '.join(part for part in parts if part)
+
+
+def _contact_doc(record, kind):
+    """The compact record kept (and returned) for one order or customer."""
+    billing = record.get('billing') or {}
+    shipping = record.get('shipping') or {}
+    first = record.get('first_name') or billing.get('first_name') or ''
+    last = record.get('last_name') or billing.get('last_name') or ''
+    doc = {
+        'id': record['id'],
+        'name': f"{first} {last}".strip(),
+        'email': record.get('email') or billing.get('email') or '',
+        'phone': billing.get('phone') or '',
+        'company': billing.get('company') or '',
+        'address': _address(billing),
+        'shipping_name': f"{shipping.get('first_name', '')} {shipping.get('last_name', '')}".strip(),
+        'shipping_address': _address(shipping),
+    }
+    if kind == 'orders':
+        doc.update({key: record.get(key) for key in ('number', 'status', 'date_created', 'total', 'currency', 'customer_id')})
+    else:
+        doc.update({key: record.get(key) for key in ('username', 'date_created')})
+    return doc
+
+
+def _contact_tokens(doc):
+    tokens = set()
+    for field in CONTACT_TEXT_FIELDS:
+        tokens.update(re.findall(r'\w+', (doc.get(field) or '').lower()))
+    email = (doc.get('email') or '').lower()
+    if email:
+        local, _, domain = email.partition('@')
+        tokens.update((email, local, domain))
+        tokens.update(re.findall(r'[a-z0-9]+', local))
+    digits = re.sub(r'\D', '', doc.get('phone') or '')
+    if digits:
+        # Full number plus national and local tails, so numbers match with or without prefixes
+        tokens.update((digits, digits[-10:], digits[-7:]))
+    if doc.get('username'):
+        tokens.add(doc['username'].lower())
+    return tokens
+
+
+def _query_terms(query):
+    query = query.strip().lower()
+    if '@' in query:
+        return [query]
+    if PHONE_QUERY.fullmatch(query):
+        digits = re.sub(r'\D', '', query)
+        return [digits if len(digits) <= 10 else digits[-10:]]
+    return re.findall(r'\w+', query)
+
+
+class TokenIndex:
+    def __init__(self, directory, name):
+        self.directory = directory
+        self.name = name
+        self.docs = {}  # id -> compact record
+        self.terms = []  # sorted
+        self.offsets = array.array('q', [0])  # postings of terms[i] are [offsets[i], offsets[i + 1])
+        self.postings = array.array('l')
+        self.dirty = set()  # IDs whose postings in the arrays are out of date
+        self._overlay = {}  # term -> IDs, for dirty documents
+        self._overlay_terms = []  # sorted terms of the overlay
+        self._overlay_tokens = {}  # dirty ID -> the terms it is listed under in the overlay
+        self._unsaved = set()  # IDs changed since the last save
+        self._rebuilt = False  # the arrays changed since the last save
+
+    def _unlink(self, doc_id):
+        for token in self._overlay_tokens.pop(doc_id, ()):
+            ids = self._overlay[token]
+            ids.discard(doc_id)
+            if not ids:
+                del self._overlay[token]
+                del self._overlay_terms[bisect.bisect_left(self._overlay_terms, token)]
+
+    def put(self, doc_id, doc):
+        if isinstance(doc, dict):
+            current = self.docs.get(doc_id)
+            if current is not None and current.to_dict() == doc:
+                # Re-read without changes (e.g. the refresh overlap): nothing to re-index or save
+                return
+            doc = CompactRecord(doc)
+        self.docs[doc_id] = doc
+        self.dirty.add(doc_id)
+        self._unsaved.add(doc_id)
+        self._unlink(doc_id)
+        self._overlay_tokens[doc_id] = tokens = _contact_tokens(doc)
+        for token in tokens:
+            ids = self._overlay.get(token)
+            if ids is None:
+                ids = self._overlay[token] = set()
+                bisect.insort(self._overlay_terms, token)
+            ids.add(doc_id)
+
+    def remove(self, doc_id):
+        if self.docs.pop(doc_id, None) is None:
+            return
+        self.dirty.add(doc_id)
+        self._unsaved.add(doc_id)
+        self._unlink(doc_id)
+
+    def _match(self, term):
+        lo = bisect.bisect_left(self.terms, term)
+        hi = bisect.bisect_left(self.terms, term + '\uffff')
+        ids = set()
+        for i in range(lo, hi):
+            ids.update(self.postings[self.offsets[i]:self.offsets[i + 1]])
+        ids -= self.dirty
+        lo = bisect.bisect_left(self._overlay_terms, term)
+        hi = bisect.bisect_left(self._overlay_terms, term + '\uffff')
+        for token in self._overlay_terms[lo:hi]:
+            ids.update(self._overlay[token])
+        return ids
+
+    def search(self, terms):
+        """IDs of documents with a token starting with every term."""
+        result = None
+        for term in terms:
+            ids = self._match(term)
+            result = ids if result is None else result & ids
+            if not result:
+                break
+        return result or set()
+
+    def compact(self):
+        postings = {}
+        for doc_id in sorted(self.docs):
+            for token in _contact_tokens(self.docs[doc_id]):
+                postings.setdefault(token, []).append(doc_id)
+        self.terms = sorted(postings)
+        self.offsets = array.array('q', [0])
+        self.postings = array.array('l')
+        for term in self.terms:
+            self.postings.extend(postings[term])
+            self.offsets.append(len(self.postings))
+        self.dirty.clear()
+        self._overlay.clear()
+        self._overlay_terms.clear()
+        self._overlay_tokens.clear()
+        self._rebuilt = True
+
+    def _path(self, suffix):
+        return os.path.join(self.directory, f'{self.name}.{suffix}')
+
+    def _write_changes(self, f, doc_ids):
+        for doc_id in sorted(doc_ids):
+            doc = self.docs.get(doc_id)
+            f.write(json.dumps([doc_id, doc.to_dict() if doc is not None else None]) + '\n')
+
+    def save(self):
+        """
+        Write what changed since the last save. The arrays and the documents they cover
+        (docs.ndjson) are only rewritten after a rebuild; other changes are appended to
+        changes.ndjson, which is replayed into the overlay on load.
+        """
+        if not self._unsaved and not self._rebuilt:
+            return
+        if len(self.dirty) > max(100, len(self.docs) // 20):
+            self.compact()
+        os.makedirs(self.directory, exist_ok=True)
+        if self._rebuilt or not os.path.exists(self._path('docs.ndjson')):
+            with open(self._path('terms.txt'), 'w') as f:
+                f.write('\n'.join(self.terms))
+            for suffix, values in (('offsets.bin', self.offsets), ('postings.bin', self.postings)):
+                with open(self._path(suffix), 'wb') as f:
+                    values.tofile(f)
+            with open(self._path('docs.ndjson'), 'w') as f:
+                for doc_id, doc in self.docs.items():
+                    if doc_id not in self.dirty:
+                        f.write(json.dumps([doc_id, doc.to_dict()]) + '\n')
+            with open(self._path('changes.ndjson'), 'w') as f:
+                self._write_changes(f, self.dirty)
+        else:
+            with open(self._path('changes.ndjson'), 'a') as f:
+                self._write_changes(f, self._unsaved)
+        self._unsaved.clear()
+        self._rebuilt = False
+
+    def load(self):
+        if not os.path.exists(self._path('docs.ndjson')):
+            return
+        with open(self._path('terms.txt')) as f:
+            text = f.read()
+        self.terms = text.split('\n') if text else []
+        for suffix, attribute in (('offsets.bin', 'offsets'), ('postings.bin', 'postings')):
+            values = array.array(getattr(self, attribute).typecode)
+            with open(self._path(suffix), 'rb') as f:
+                values.fromfile(f, os.path.getsize(self._path(suffix)) // values.itemsize)
+            setattr(self, attribute, values)
+        with open(self._path('docs.ndjson')) as f:
+            for line in f:
+                doc_id, doc = json.loads(line)
+                self.docs[doc_id] = CompactRecord(doc)
+        if os.path.exists(self._path('changes.ndjson')):
+            with open(self._path('changes.ndjson')) as f:
+                for line in f:
+                    doc_id, doc = json.loads(line)
+                    if doc is None:
+                        self.remove(doc_id)
+                    else:
+                        self.put(doc_id, doc)
+        self._unsaved.clear()
+
+
+class ContactIndex:
+    def __init__(self, base_url, headers, directory):
+        self.base_url = base_url
+        self.headers = headers
+        self.directory = directory
+        self.orders = TokenIndex(directory, 'orders')
+        self.customers = TokenIndex(directory, 'customers')
+        self.state = {'order_cursor': None, 'customer_max_id': 0, 'customers_scanned_at': None, 'updated': None}
+        self._lock = threading.RLock()  # guards the indexes; held only while applying changes
+        self._refresh_lock = threading.Lock()  # one refresh at a time
+        self._background = None
+        state_path = os.path.join(directory, 'state.json')
+        # Without the order documents (e.g. files of an older layout) the cursor is useless
+        if os.path.exists(state_path) and os.path.exists(self.orders._path('docs.ndjson')):
+            with open(state_path) as f:
+                self.state.update(json.load(f))
+            self.orders.load()
+            self.customers.load()
+
+    def refresh(self):
+        """Index orders modified and customers added since the last refresh."""
+        with self._refresh_lock:
+            started = time.time()
+            url = f"{self.base_url}/orders"
+            if self.state['order_cursor'] is None:
+                batches = iter_scan(self.base_url, self.headers, 'orders', {'_fields': CONTACT_ORDER_FIELDS})
+            else:
+                batches = [_fetch_pages(url, self.headers, {'per_page': 100, 'modified_after': self.state['order_cursor'],
+                                                            'dates_are_gmt': True, '_fields': CONTACT_ORDER_FIELDS})]
+            orders = 0
+            # Pages are fetched without the lock so searches are not held up by the store
+            for batch in batches:
+                with self._lock:
+                    for order in batch:
+                        self.orders.put(order['id'], _contact_doc(order, 'orders'))
+                orders += len(batch)
+            # Re-indexing is idempotent, so overlap the cursor a little to absorb clock skew
+            self.state['order_cursor'] = _gmt_timestamp(started - 60)
+
+            scanned_at = self.state['customers_scanned_at']
+            if scanned_at is None or started - scanned_at > CONTACT_CUSTOMER_RESCAN_HOURS * 3600:
+                seen = set()
+                for batch in iter_scan(self.base_url, self.headers, 'customers', {'role': 'all'}):
+                    with self._lock:
+                        for customer in batch:
+                            self.customers.put(customer['id'], _contact_doc(customer, 'customers'))
+                            seen.add(customer['id'])
+                with self._lock:
+                    for doc_id in set(self.customers.docs) - seen:
+                        self.customers.remove(doc_id)
+                self.state['customers_scanned_at'] = started
+                self.state['customer_max_id'] = max(seen, default=0)
+            else:
+                newest, _ = _get_page(f"{self.base_url}/customers", self.headers,
+                                      {'role': 'all', 'orderby': 'id', 'order': 'desc', 'per_page': 1, '_fields': 'id'})
+                last_id = newest[0]['id'] if newest else 0
+                for lo in range(self.state['customer_max_id'] + 1, last_id + 1, SCAN_MAX_INCLUDE_IDS):
+                    batch = _scan_id_window(f"{self.base_url}/customers", self.headers, {'role': 'all'},
+                                            lo, min(lo + SCAN_MAX_INCLUDE_IDS, last_id + 1))
+                    with self._lock:
+                        for customer in batch:
+                            self.customers.put(customer['id'], _contact_doc(customer, 'customers'))
+                self.state['customer_max_id'] = max(self.state['customer_max_id'], last_id)
+
+            with self._lock:
+                self.state['updated'] = time.time()
+                self.orders.save()
+                self.customers.save()
+                # Replaced atomically, so a crash mid-write cannot leave a truncated state file
+                state_path = os.path.join(self.directory, 'state.json')
+                with open(state_path + '.tmp', 'w') as f:
+                    json.dump(self.state, f)
+                os.replace(state_path + '.tmp', state_path)
+            return {'orders_indexed': orders, 'seconds': round(time.time() - started, 2)}
+
+    def refresh_in_background(self):
+        """Start a refresh on a daemon thread unless one is already running."""
+        with self._lock:
+            if self._background is not None and self._background.is_alive():
+                return
+            self._background = threading.Thread(target=self._refresh_quietly, daemon=True)
+            self._background.start()
+
+    def _refresh_quietly(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print('Contact index refresh error:', str(e), file=sys.stderr)
+
+
+_contact_indexes = {}
+_contact_indexes_lock = threading.Lock()
+
+
+def get_contact_index(base_url, headers, refresh=False):
+    """
+    Return the site's contact index. It is built on first use and refreshed first when
+    `refresh` is set; a stale index answers at once and is refreshed in the background.
+    """
+    with _contact_indexes_lock:
+        index = _contact_indexes.get(base_url)
+        if index is None:
+            directory = os.path.join(CONTACT_DIR, hashlib.sha256(base_url.encode()).hexdigest()[:16])
+            index = _contact_indexes[base_url] = ContactIndex(base_url, headers, directory)
+    updated = index.state['updated']
+    if refresh or updated is None:
+        index.refresh()
+    elif time.time() - updated > CONTACT_INDEX_MAX_AGE:
+        index.refresh_in_background()
+    return index
+
+
+def _find(kind, query, limit, site_url, consumer_key, consumer_secret, refresh, status=''):
+    base_url, headers = get_woo_client(site_url, consumer_key, consumer_secret)
+    contacts = get_contact_index(base_url, headers, refresh)
+    index = getattr(contacts, kind)
+    start = time.perf_counter()
+    terms = _query_terms(query)
+    if not terms:
+        raise Exception('Query has no searchable words')
+    with contacts._lock:
+        ids = sorted(index.search(terms), reverse=True)
+        docs = [index.docs[doc_id] for doc_id in ids if not status or index.docs[doc_id].get('status') == status]
+    return {
+        'query': query,
+        'count': len(docs),
+        kind: [doc.to_dict() for doc in docs[:limit]],
+        'lookup_ms': round((time.perf_counter() - start) * 1000, 2),
+        'indexed_at': _gmt_timestamp(contacts.state['updated']),
+    }
+
+
+@mcp.tool()
+def find_orders(query: str, status: str = "", limit: int = 20, refresh: bool = False, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
+    """
+    Find orders by customer email, name, phone number, company or billing/shipping address.
+
+    Every word of the query must match the start of a word in the order (prefix
+    matching), e.g. "jane@example.com", "555 0134", "jane do" or "baker street".
+    Answers come from a local index that is brought up to date with recently modified
+    orders when it is more than a few minutes old. Newest orders first.
+
+    Args:
+        query (str): Email, phone number, or name/company/address words.
+        status (str, optional): Only orders with this status.
+        limit (int): Maximum number of orders to return.
+        refresh (bool): Pull changes from the store before searching.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
+        consumer_key (str): The WooCommerce REST API consumer key.
+        consumer_secret (str): The WooCommerce REST API consumer secret.
+
+    Returns:
+        dict: The total 'count' of matches and up to `limit` compact 'orders'.
+    """
+    return _find('orders', query, limit, site_url, consumer_key, consumer_secret, refresh, status)
+
+
+@mcp.tool()
+def find_customers(query: str, limit: int = 20, refresh: bool = False, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
+    """
+    Find customers by email, name, username, phone number, company or address.
+
+    Matching works like find_orders. Customer details that changed in the store are
+    picked up by the periodic full rescan (MCP_CONTACT_CUSTOMER_RESCAN_HOURS); new
+    customers are indexed on every refresh.
+
+    Args:
+        query (str): Email, phone number, or name/company/address words.
+        limit (int): Maximum number of customers to return.
+        refresh (bool): Pull changes from the store before searching.
+        site_url (str): The base URL of the WooCommerce site, or a tenant ID from the tenant registry.
+        consumer_key (str): The WooCommerce REST API consumer key.
+        consumer_secret (str): The WooCommerce REST API consumer secret.
+
+    Returns:
+        dict: The total 'count' of matches and up to `limit` compact 'customers'.
+    """
+    return _find('customers', query, limit, site_url, consumer_key, consumer_secret, refresh)
+
+
+# --- Warm-restart snapshots ---
+# Every MCP_SNAPSHOT_INTERVAL seconds (and at exit) the entity cache, taxonomy index and
+# inventory index of each site are written to one file per site under CACHE_DIR. A file
+# is a short JSON header (format version, site fingerprint, offsets) followed by the
+# JSON-encoded values. At startup the files are memory-mapped and only the headers are
+# parsed: cache entries become lazy references into the mapping that are decoded on
+# their first hit, and the indexes are restored when the site is first used. Entries
+# past their TTL (unless they can be revalidated), snapshots older than
+# MCP_SNAPSHOT_MAX_AGE and files written by another format version or for another site
+# are ignored. The contact index and daily rollups keep their own files.
+SNAPSHOT_DIR = os.path.join(CACHE_DIR, 'snapshots')
+SNAPSHOT_INTERVAL = int(os.environ.get('MCP_SNAPSHOT_INTERVAL', '60'))
+SNAPSHOT_MAX_AGE = int(os.environ.get('MCP_SNAPSHOT_MAX_AGE', '86400'))
+SNAPSHOT_MAGIC = b'WCMCPSNP'
+SNAPSHOT_FORMAT = 2
+
+
+def _site_fingerprint(base_url):
+    return hashlib.sha256(f'{SNAPSHOT_FORMAT}:{base_url}'.encode()).hexdigest()
+
+
+def _snapshot_path(base_url):
+    return os.path.join(SNAPSHOT_DIR, _site_fingerprint(base_url)[:16] + '.snap')
+
+
+class Snapshot:
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:8] != SNAPSHOT_MAGIC:
+            raise Exception(f'Not a snapshot file: {path}')
+        (header_length,) = struct.unpack('<Q', self._map[8:16])
+        self.header = json.loads(self._map[16:16 + header_length])
+        self._base = 16 + header_length
+
+    def raw(self, offset, length):
+        return self._map[self._base + offset:self._base + offset + length]
+
+    def load(self, offset, length):
+        return json.loads(self.raw(offset, length))
+
+
+class SnapshotValue:
+    """A cache entry still encoded in a memory-mapped snapshot."""
+    __slots__ = ('snapshot', 'offset', 'length')
+
+    def __init__(self, snapshot, offset, length):
+        self.snapshot = snapshot
+        self.offset = offset
+        self.length = length
+
+    def raw(self):
+        return self.snapshot.raw(self.offset, self.length)
+
+    def load(self):
+        return self.snapshot.load(self.offset, self.length)
+
+
+_snapshots = {}  # base_url -> Snapshot restored at startup
+_snapshot_state = {}  # base_url -> change counters at the last write
+
+
+def write_snapshot(base_url):
+    blobs = []
+    offset = 0
+
+    def add(blob):
+        nonlocal offset
+        blobs.append(blob)
+        offset += len(blob)
+        return [offset - len(blob), len(blob)]
+
+    entities = []
+    for key, expires_at, value, validators in entity_cache.export(base_url):
+        blob = value.raw() if isinstance(value, SnapshotValue) else json.dumps(expand(value), default=str).encode()
+        entities.append([key[1], key[2], expires_at] + add(blob) + [validators])
+    sections = {}
+    if base_url in _taxonomy_indexes:
+        sections['taxonomy'] = add(json.dumps(_taxonomy_indexes[base_url].snapshot()).encode())
+    if base_url in _inventory_trackers:
+        sections['inventory'] = add(json.dumps(_inventory_trackers[base_url].snapshot()).encode())
+    header = json.dumps({
+        'format': SNAPSHOT_FORMAT,
+        'site': base_url,
+        'fingerprint': _site_fingerprint(base_url),
+        'written_at': time.time(),
+        'entities': entities,
+        'sections': sections,
+    }).encode()
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    path = _snapshot_path(base_url)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(SNAPSHOT_MAGIC + struct.pack('<Q', len(header)) + header)
+        f.writelines(blobs)
+    os.replace(path + '.tmp', path)
+    return len(entities)
+
+
+def write_snapshots():
+    """Write a snapshot for every site whose caches changed since its last one."""
+    sites = entity_cache.sites() | set(_taxonomy_indexes) | set(_inventory_trackers)
+    for base_url in sites:
+        taxonomy = _taxonomy_indexes.get(base_url)
+        tracker = _inventory_trackers.get(base_url)
+        state = (entity_cache.changes, taxonomy.changes if taxonomy else None,
+                 (tracker.cursor, len(tracker.items)) if tracker else None)
+        if _snapshot_state.get(base_url) == state:
+            continue
+        try:
+            write_snapshot(base_url)
+            _snapshot_state[base_url] = state
+        except Exception as e:
+            print('Snapshot error:', str(e), file=sys.stderr)
+
+
+def restore_snapshots():
+    """Map every valid snapshot and queue its cache entries for lazy decoding."""
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return 0
+    restored = 0
+    now = time.time()
+    for name in os.listdir(SNAPSHOT_DIR):
+        if not name.endswith('.snap'):
+            continue
+        path = os.path.join(SNAPSHOT_DIR, name)
+        try:
+            snapshot = Snapshot(path)
+        except Exception as e:
+            print('Skipping snapshot', name, str(e), file=sys.stderr)
+            continue
+        header = snapshot.header
+        if (header.get('format') != SNAPSHOT_FORMAT or path != _snapshot_path(header.get('site', ''))
+                or header.get('fingerprint') != _site_fingerprint(header['site'])
+                or now - header['written_at'] > SNAPSHOT_MAX_AGE):
+            continue
+        base_url = header['site']
+        _snapshots[base_url] = snapshot
+        # Entries are written least recently used first; restoring newest first keeps that order
+        for entity_path, params, expires_at, offset, length, validators in reversed(header['entities']):
+            # Expired entries with validators come back for revalidation
+            if expires_at > now or validators:
+                entity_cache.restore((base_url, entity_path, params), expires_at,
+                                     SnapshotValue(snapshot, offset, length), validators)
+                restored += 1
+    return restored
+
+
+def restore_section(base_url, name, restore):
+    snapshot = _snapshots.get(base_url)
+    section = snapshot.header['sections'].get(name) if snapshot else None
+    if section:
+        restore(snapshot.load(*section))
+
+
+def start_snapshots():
+    if SNAPSHOT_INTERVAL <= 0:
+        return
+
+    def run():
+        while True:
+            time.sleep(SNAPSHOT_INTERVAL)
+            write_snapshots()
+
+    threading.Thread(target=run, daemon=True).start()
+    atexit.register(write_snapshots)
+
+
+# --- Warm-up ---
+# At startup a background thread opens MCP_WARMUP_CONNECTIONS pooled connections to each
+# configured store (DNS and TLS handshakes) and prefetches the MCP_WARMUP_ENDPOINTS
+# reference data concurrently into the entity cache, or the taxonomy index for
+# taxonomy collections, so the first agent turn does not pay for them. The MCP
+# initialize handshake is not held up; tools called before warm-up finishes simply
+# fetch as usual. Endpoints already restored from a snapshot cost nothing.
+WARMUP_ENDPOINTS = [path.strip().strip('/') for path in os.environ.get(
+    'MCP_WARMUP_ENDPOINTS',
+    'data/currencies/current,payment_gateways,settings,products/categories,products/tags,products/attributes',
+).split(',') if path.strip()]
+WARMUP_CONNECTIONS = int(os.environ.get('MCP_WARMUP_CONNECTIONS', '4'))
+WARMUP_WORKERS = int(os.environ.get('MCP_WARMUP_WORKERS', '4'))
+
+
+def _warm_endpoint(base_url, headers, path):
+    match = TAXONOMY_PATH.match(path)
+    if match and not match.group(2):
+        get_taxonomy_index(base_url, headers)._ensure(match.group(1))
+    else:
+        woo_get(f"{base_url}/{path}", headers)
+
+
+def warm_up_site(site_url=""):
+    """Open pooled connections to one store and prefetch its hot endpoints."""
+    started = time.time()
+    base_url, headers = get_woo_client(site_url)
+    errors = {}
+    with ThreadPoolExecutor(max_workers=max(WARMUP_CONNECTIONS, WARMUP_WORKERS, 1)) as pool:
+        # Concurrent requests make the session keep that many connections open
+        connections = [pool.submit(tenant_request, 'HEAD', base_url, headers=headers)
+                       for _ in range(WARMUP_CONNECTIONS)]
+        wait(connections)
+        connected = time.time()
+        futures = {path: pool.submit(_warm_endpoint, base_url, headers, path) for path in WARMUP_ENDPOINTS}
+    for path, future in futures.items():
+        if future.exception() is not None:
+            errors[path] = str(future.exception())
+    result = {
+        'connections': sum(1 for future in connections if future.exception() is None),
+        'connect_seconds': round(connected - started, 3),
+        'endpoints': len(futures) - len(errors),
+        'seconds': round(time.time() - started, 3),
+        'errors': errors,
+    }
+    tenant = tenants.for_url(base_url)
+    if tenant is not None:
+        tenant.warmup = result
+    return result
+
+
+def warm_up():
+    """Warm up the default store and every registered tenant."""
+    sites = [''] if DEFAULT_SITE_URL and DEFAULT_WOCOMMERCE_CONSUMER_KEY and DEFAULT_WOCOMMERCE_CONSUMER_SECRET else []
+    sites += tenants.ids()
+    for site in sites:
+        try:
+            result = warm_up_site(site)
+            print(f"Warm-up of {site or DEFAULT_SITE_URL} took {result['seconds']}s "
+                  f"({result['endpoints']}/{len(WARMUP_ENDPOINTS)} endpoints)", file=sys.stderr)
+        except Exception as e:
+            print(f'Warm-up of {site or DEFAULT_SITE_URL} failed:', str(e), file=sys.stderr)
+
+
+def start_warm_up():
+    if WARMUP_ENDPOINTS or WARMUP_CONNECTIONS:
+        threading.Thread(target=warm_up, daemon=True).start()
+
 
 if __name__ == "__main__":
-   print("WordPress MCP Server is Running")
+   restore_snapshots()
+   start_snapshots()
+   start_warm_up()
+   print("WordPress MCP Server is Running", file=sys.stderr)
    mcp.run(transport="stdio")
 
@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Keep caches and the tenant registry away from the working tree
+os.environ.setdefault('MCP_CACHE_DIR', tempfile.mkdtemp(prefix='mcp-tests-'))
+os.environ.setdefault('MCP_TENANTS_FILE', os.path.join(os.environ['MCP_CACHE_DIR'], 'tenants.json'))
+# main.py builds an mcp_use client, which reports usage unless told not to
+os.environ.setdefault('MCP_USE_ANONYMIZED_TELEMETRY', 'false')
@@ -0,0 +1,49 @@
+import asyncio
+from types import SimpleNamespace
+
+import main
+
+
+def test_least_recently_used_session_is_dropped(monkeypatch):
+    monkeypatch.setattr(main, '_chat_sessions', main.OrderedDict())
+    monkeypatch.setattr(main, 'CHAT_SESSION_LIMIT', 2)
+    first, session = main.get_chat_session(None)
+    second, _ = main.get_chat_session(None)
+    assert main.get_chat_session(first) == (first, session)
+    main.get_chat_session(None)
+    assert list(main._chat_sessions)[0] == first and second not in main._chat_sessions
+    assert main.get_chat_session('unknown')[0] != 'unknown'
+
+
+class Summarizer:
+    def __init__(self):
+        self.prompts = []
+
+    async def ainvoke(self, messages):
+        self.prompts.append(messages[1].content)
+        return SimpleNamespace(content='Asked about order 42.')
+
+
+def test_old_turns_are_folded_into_the_summary(monkeypatch):
+    monkeypatch.setattr(main, 'CHAT_HISTORY_TOKENS', 40)
+    monkeypatch.setattr(main, 'CHAT_KEEP_TURNS', 2)
+    session, llm = main.ChatSession(), Summarizer()
+    for number in range(4):
+        session.add_turn(f'question {number} ' * 5, f'answer {number} ' * 5)
+    asyncio.run(session.compact(llm))
+    assert session.summary == 'Asked about order 42.'
+    assert [message for message, _ in session.turns] == ['question 2 ' * 5, 'question 3 ' * 5]
+    assert 'question 0' in llm.prompts[0] and 'question 2' not in llm.prompts[0]
+    assert 'Summary of our conversation so far' in session.history()[0].content
+
+    # Within budget nothing is summarized
+    asyncio.run(session.compact(llm))
+    assert len(llm.prompts) == 1
+
+
+def test_long_reply_is_truncated_in_history(monkeypatch):
+    monkeypatch.setattr(main, 'CHAT_HISTORY_TOKENS', 100)
+    monkeypatch.setattr(main, 'CHAT_KEEP_TURNS', 3)
+    session = main.ChatSession()
+    session.add_turn('list everything', 'x' * 1000)
+    assert session.turns[0][1] == 'x' * 100 + '\n... (truncated)'
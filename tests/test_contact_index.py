@@ -0,0 +1,88 @@
+import server
+
+
+def order(order_id, email, name='Jane Doe', phone='+1 (212) 555-0134', city='London'):
+    first, last = name.split()
+    return server._contact_doc({'id': order_id, 'number': str(order_id), 'status': 'processing',
+                                'billing': {'first_name': first, 'last_name': last, 'email': email,
+                                            'phone': phone, 'city': city}}, 'orders')
+
+
+def search(index, query):
+    return sorted(index.search(server._query_terms(query)))
+
+
+def test_prefix_matching_on_every_term(tmp_path):
+    index = server.TokenIndex(str(tmp_path), 'orders')
+    index.put(1, order(1, 'jane@example.com'))
+    index.put(2, order(2, 'john@example.org', name='John Dover', phone='0161 555 9999', city='Leeds'))
+    assert search(index, 'jane@exa') == [1]
+    assert search(index, 'do') == [1, 2]
+    assert search(index, 'jo dov') == [2]
+    assert search(index, '555-0134') == [1]
+    assert search(index, '2125550134') == [1]
+    assert search(index, 'nobody') == []
+
+
+def test_changed_and_removed_documents(tmp_path):
+    index = server.TokenIndex(str(tmp_path), 'orders')
+    index.put(1, order(1, 'jane@example.com'))
+    index.put(2, order(2, 'sam@example.com', name='Sam Smith'))
+    index.compact()
+    index.put(1, order(1, 'jane@newmail.net'))
+    index.remove(2)
+    assert search(index, 'jane@example') == []
+    assert search(index, 'jane@newmail') == [1]
+    assert search(index, 'smith') == []
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = server.TokenIndex(str(tmp_path), 'orders')
+    for i in range(1, 51):
+        index.put(i, order(i, f'user{i}@example.com'))
+    index.save()
+    index.put(7, order(7, 'changed@example.com'))
+    index.remove(8)
+    index.save()
+
+    loaded = server.TokenIndex(str(tmp_path), 'orders')
+    loaded.load()
+    assert search(loaded, 'user7@') == []
+    assert search(loaded, 'changed') == [7]
+    assert search(loaded, 'user8@') == []
+    assert search(loaded, 'user1') == [1] + list(range(10, 20))
+    assert loaded.docs[7]['email'] == 'changed@example.com'
+
+
+def test_save_writes_only_changes(tmp_path):
+    index = server.TokenIndex(str(tmp_path), 'orders')
+    for i in range(1, 51):
+        index.put(i, order(i, f'user{i}@example.com'))
+    index.save()
+    docs = (tmp_path / 'orders.docs.ndjson').read_text()
+    changes = (tmp_path / 'orders.changes.ndjson').read_text()
+
+    index.put(3, order(3, 'user3@example.com'))  # unchanged re-read
+    index.save()
+    assert (tmp_path / 'orders.changes.ndjson').read_text() == changes
+
+    index.put(3, order(3, 'moved@example.com'))
+    index.remove(4)
+    index.save()
+    assert (tmp_path / 'orders.docs.ndjson').read_text() == docs
+    appended = (tmp_path / 'orders.changes.ndjson').read_text()[len(changes):].splitlines()
+    assert [line[:3] for line in appended] == ['[3,', '[4,']
+
+
+def test_stale_index_refreshes_in_background(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, 'CONTACT_DIR', str(tmp_path))
+    base_url = 'https://contacts.test/wp-json/wc/v3'
+    index = server.ContactIndex(base_url, {}, str(tmp_path))
+    index.state['updated'] = 0
+    calls = []
+    monkeypatch.setattr(index, 'refresh', lambda: calls.append('sync'))
+    monkeypatch.setattr(index, 'refresh_in_background', lambda: calls.append('background'))
+    monkeypatch.setitem(server._contact_indexes, base_url, index)
+    server.get_contact_index(base_url, {})
+    server.get_contact_index(base_url, {}, refresh=True)
+    assert calls == ['background', 'sync']
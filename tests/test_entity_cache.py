@@ -0,0 +1,35 @@
+import server
+
+BASE_URL = 'https://shop.test/wp-json/wc/v3'
+
+
+def cached(cache, *paths):
+    return {path for path in paths if cache.get((BASE_URL, path, '{}')) is not None}
+
+
+def fill(*paths):
+    cache = server.EntityCache(300, 100)
+    for path in paths:
+        cache.set((BASE_URL, path, '{}'), {'path': path})
+    return cache
+
+
+def test_subresource_write_invalidates_parent_order():
+    paths = ('orders', 'orders/5', 'orders/5/refunds', 'orders/5/notes', 'orders/6', 'reports/sales')
+    cache = fill(*paths)
+    cache.invalidate(BASE_URL, 'orders/5/refunds')
+    assert cached(cache, *paths) == {'orders/5/notes', 'orders/6'}
+
+
+def test_variation_write_invalidates_parent_product():
+    paths = ('products', 'products/12', 'products/12/variations', 'products/12/variations/34', 'products/13')
+    cache = fill(*paths)
+    cache.invalidate(BASE_URL, 'products/12/variations/34')
+    assert cached(cache, *paths) == {'products/13'}
+
+
+def test_entity_write_keeps_siblings():
+    paths = ('orders', 'orders/5', 'orders/5/notes', 'orders/6')
+    cache = fill(*paths)
+    cache.invalidate(BASE_URL, 'orders/5')
+    assert cached(cache, *paths) == {'orders/6'}
@@ -0,0 +1,43 @@
+import csv
+
+import pytest
+
+import server
+
+BASE_URL = 'https://shop.test/wp-json/wc/v3'
+PAGES = [
+    [{'id': 1, 'billing': {'city': 'York'}}],
+    [{'id': 2, 'billing': {'city': 'Leeds', 'phone': '0113'}, 'coupon_lines': []}],
+]
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    monkeypatch.setattr(server, 'EXPORT_DIR', str(tmp_path))
+    monkeypatch.setattr(server, 'get_woo_client', lambda *args: (BASE_URL, {}))
+
+    def iter_pages(url, headers, params):
+        for page in range(params['page'], len(PAGES) + 1):
+            yield page, len(PAGES), PAGES[page - 1]
+
+    monkeypatch.setattr(server, '_iter_pages', iter_pages)
+    return tmp_path
+
+
+def test_csv_header_covers_columns_of_later_pages(store):
+    result = server.export_records('orders', format='csv')
+    with open(result['path'], newline='') as f:
+        reader = csv.DictReader(f)
+        rows = list(reader)
+    assert reader.fieldnames == ['billing.city', 'billing.phone', 'coupon_lines', 'id']
+    assert rows[0] == {'billing.city': 'York', 'billing.phone': '', 'coupon_lines': '', 'id': '1'}
+    assert rows[1] == {'billing.city': 'Leeds', 'billing.phone': '0113', 'coupon_lines': '[]', 'id': '2'}
+    assert sorted(p.name for p in store.iterdir()) == ['orders.csv']
+
+
+def test_export_path_must_stay_in_export_dir(store):
+    with pytest.raises(Exception, match='outside'):
+        server.export_records('orders', path='../orders.ndjson')
+    with pytest.raises(Exception, match='outside'):
+        server.export_records('orders', path='/tmp/orders.ndjson')
+    assert server.export_records('orders', path='nested/orders.ndjson')['rows'] == 2
@@ -0,0 +1,106 @@
+import json
+
+import pytest
+import requests
+
+import server
+
+BASE_URL = 'https://shop.test/wp-json/wc/v3'
+
+
+class Response:
+    def __init__(self, data, status=200):
+        self._data = data
+        self.status_code = status
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f'{self.status_code} Server Error')
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    monkeypatch.setattr(server, 'IMPORT_DIR', str(tmp_path))
+    monkeypatch.setattr(server, 'IMPORT_BATCH_SIZE', 2)
+    scans, batches = [], []
+
+    def iter_scan(base_url, headers, resource, filters=None):
+        scans.append(filters)
+        yield [{'id': 7, 'email': 'Subscriber@example.com'}]
+
+    def tenant_request(method, url, params=None, headers=None, json=None):
+        assert method == 'POST', 'existing customers are looked up by one scan'
+        batches.append(json)
+        if any(record['first_name'] == 'Broken' for record in json['create'] + json['update']):
+            return Response({}, 500)
+        return Response({'create': [{'id': 100 + i} for i in range(len(json['create']))],
+                         'update': [{'id': record['id']} for record in json['update']]})
+
+    monkeypatch.setattr(server, 'get_woo_client', lambda *args: (BASE_URL, {}))
+    monkeypatch.setattr(server, 'iter_scan', iter_scan)
+    monkeypatch.setattr(server, 'tenant_request', tenant_request)
+    return tmp_path, scans, batches
+
+
+def write_rows(path, names):
+    with open(path, 'w') as f:
+        for name in names:
+            email = 'subscriber@example.com' if name == 'Sub' else f'{name.lower()}@example.com'
+            f.write(json.dumps({'email': email, 'first_name': name, 'last_name': 'Test'}) + '\n')
+
+
+def test_failed_chunk_is_reported_and_others_continue(store):
+    directory, scans, batches = store
+    write_rows(directory / 'people.ndjson', ['Sub', 'Ann', 'Broken', 'Bob', 'Cy'])
+    result = server.import_records('customers', 'people.ndjson')
+    assert scans == [{'role': 'all', '_fields': 'id,email'}]
+    assert result['counts'] == {'updated': 1, 'created': 2, 'error': 2}
+    with open(result['report_path']) as f:
+        rows = {row['line']: row for row in map(json.loads, f)}
+    assert rows[1]['status'] == 'updated' and rows[1]['id'] == 7
+    assert rows[3]['status'] == 'error' and '500' in rows[3]['error']
+    assert rows[4]['status'] == 'error'
+    assert rows[5]['status'] == 'created'
+
+
+def test_paths_must_stay_in_import_dir(store):
+    directory, scans, batches = store
+    with pytest.raises(Exception, match='outside'):
+        server.import_records('customers', '../people.ndjson')
+    with pytest.raises(Exception, match='outside'):
+        server.import_records('customers', '/etc/passwd')
+    write_rows(directory / 'people.ndjson', ['Ann'])
+    with pytest.raises(Exception, match='outside'):
+        server.import_records('customers', 'people.ndjson', report_path='/tmp/report.ndjson')
+    assert batches == []
+
+
+def test_unparseable_lines_are_reported_as_invalid(store):
+    directory, scans, batches = store
+    with open(directory / 'people.ndjson', 'w') as f:
+        f.write(json.dumps({'email': 'ann@example.com', 'first_name': 'Ann', 'last_name': 'Test'}) + '\n')
+        f.write('{"email": \n')
+        f.write('[1, 2]\n')
+        f.write(json.dumps({'email': 'bob@example.com', 'first_name': 'Bob', 'last_name': 'Test'}) + '\n')
+    result = server.import_records('customers', 'people.ndjson')
+    assert result['counts'] == {'invalid': 2, 'created': 2}
+    with open(result['report_path']) as f:
+        rows = {row['line']: row for row in map(json.loads, f)}
+    assert 'invalid JSON' in rows[2]['error']
+    assert 'expected a JSON object' in rows[3]['error']
+
+
+def test_repeated_email_updates_the_customer_created_earlier(store):
+    directory, scans, batches = store
+    write_rows(directory / 'people.ndjson', ['Ann', 'Ann', 'Bob', 'Ann'])
+    result = server.import_records('customers', 'people.ndjson')
+    assert result['counts'] == {'created': 2, 'updated': 2}
+    assert [len(batch['create']) for batch in batches] == [1, 1, 0]
+    with open(result['report_path']) as f:
+        rows = {row['line']: row for row in map(json.loads, f)}
+    assert rows[1]['status'] == 'created'
+    assert rows[2]['status'] == 'updated' and rows[2]['id'] == rows[1]['id']
+    assert rows[4]['status'] == 'updated' and rows[4]['id'] == rows[1]['id']
@@ -0,0 +1,62 @@
+import server
+
+BASE_URL = 'https://shop.test/wp-json/wc/v3'
+
+
+def product(product_id, modified, quantity=3, **fields):
+    return {'id': product_id, 'type': 'simple', 'sku': f'SKU-{product_id}', 'name': f'P{product_id}',
+            'manage_stock': True, 'stock_quantity': quantity, 'stock_status': 'instock',
+            'date_modified_gmt': modified, 'status': 'publish', **fields}
+
+
+def listing(store, requests):
+    def fetch_pages(url, headers, params):
+        if url.endswith('/variations'):
+            return store.get(url.split('/')[-2], [])
+        requests.append((params['modified_after'], params.get('status', 'any')))
+        return [p for p in store['products'] if p['date_modified_gmt'] > params['modified_after']
+                and (p['status'] == 'trash') == (params.get('status') == 'trash')]
+    return fetch_pages
+
+
+def test_poll_rereads_the_cursor_second(monkeypatch):
+    store = {'products': [product(1, '2024-05-01T10:00:00'), product(2, '2024-05-01T10:00:05')]}
+    requests = []
+    monkeypatch.setattr(server, 'scan_all', lambda base_url, headers, resource: list(store['products']))
+    monkeypatch.setattr(server, '_fetch_pages', listing(store, requests))
+    tracker = server.InventoryTracker(BASE_URL, {})
+    assert tracker.poll() == 2
+    assert (tracker.cursor, tracker.boundary_ids) == ('2024-05-01T10:00:05', {2})
+
+    # Product 3 changed in the cursor's own second after the previous poll read it
+    store['products'].append(product(3, '2024-05-01T10:00:05', quantity=0))
+    assert tracker.poll() == 1
+    assert requests == [('2024-05-01T10:00:04', 'any'), ('2024-05-01T10:00:04', 'trash')]
+    assert tracker.items[(3, 0)]['stock_quantity'] == 0
+    assert tracker.boundary_ids == {2, 3}
+    assert tracker.poll() == 0
+
+    # A webhook does not move the cursor past unpolled changes
+    tracker.apply(product(4, '2024-05-01T11:00:00'))
+    store['products'].append(product(5, '2024-05-01T10:30:00'))
+    assert tracker.poll() == 1
+    assert tracker.cursor == '2024-05-01T10:30:00'
+
+
+def test_poll_drops_trashed_products_and_deleted_variations(monkeypatch):
+    shirt = product(1, '2024-05-01T10:00:00', type='variable')
+    store = {'products': [shirt, product(2, '2024-05-01T10:00:00')],
+             '1': [{'id': 11, 'sku': 'SHIRT-S', 'stock_quantity': 1}, {'id': 12, 'sku': 'SHIRT-L', 'stock_quantity': 1}]}
+    monkeypatch.setattr(server, 'scan_all', lambda base_url, headers, resource: list(store['products']))
+    monkeypatch.setattr(server, '_fetch_pages', listing(store, []))
+    tracker = server.InventoryTracker(BASE_URL, {})
+    tracker.poll()
+    assert set(tracker.items) == {(1, 0), (1, 11), (1, 12), (2, 0)}
+
+    shirt['date_modified_gmt'] = '2024-05-01T10:05:00'
+    store['1'] = [{'id': 11, 'sku': 'SHIRT-S', 'stock_quantity': 0}]
+    store['products'][1].update(status='trash', date_modified_gmt='2024-05-01T10:05:00')
+    assert tracker.poll() == 1
+    assert set(tracker.items) == {(1, 0), (1, 11)}
+    assert tracker.find_sku('SHIRT-L') is None and tracker.find_sku('SKU-2') is None
+    assert tracker.find_sku('SHIRT-S')['stock_quantity'] == 0
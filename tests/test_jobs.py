@@ -0,0 +1,52 @@
+import json
+import time
+
+import pytest
+
+import server
+
+
+def wait_for(queue, job_id, statuses, timeout=5):
+    deadline = time.time() + timeout
+    while queue.get(job_id)['status'] not in statuses:
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+
+def test_cancel_while_worker_waits_for_lock(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setitem(server.__dict__, 'slow_tool', lambda **kwargs: calls.append(kwargs))
+    queue = server.JobQueue(str(tmp_path), 1)
+    with queue._lock:
+        job = queue.submit('slow_tool', {})
+        time.sleep(0.1)  # the worker is now blocked on the lock in _run
+        queue.cancel(job['id'])
+    wait_for(queue, job['id'], ('cancelled',))
+    assert queue.get(job['id'])['finished_at']
+    assert calls == []
+    with open(tmp_path / f"{job['id']}.json") as f:
+        assert json.load(f)['status'] == 'cancelled'
+
+
+def test_credentials_are_not_persisted(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setitem(server.__dict__, 'echo_tool', lambda **kwargs: calls.append(kwargs) or 'ok')
+    queue = server.JobQueue(str(tmp_path), 1)
+    job = queue.submit('echo_tool', {'resource': 'orders', 'consumer_key': 'ck_x', 'consumer_secret': 'cs_x'})
+    wait_for(queue, job['id'], ('done',))
+    assert calls == [{'resource': 'orders', 'consumer_key': 'ck_x', 'consumer_secret': 'cs_x'}]
+    with open(tmp_path / f"{job['id']}.json") as f:
+        saved = f.read()
+    assert 'ck_x' not in saved and 'cs_x' not in saved
+
+
+def test_submit_job_rejects_bad_arguments_up_front(monkeypatch):
+    submitted = []
+    monkeypatch.setattr(server, 'get_job_queue', lambda: type('Queue', (), {
+        'submit': lambda self, tool, arguments: submitted.append(arguments) or {'id': 'j1', 'status': 'queued'}})())
+    with pytest.raises(Exception, match='Invalid arguments for export_records: colour: unexpected argument; filters:'):
+        server.submit_job('export_records', {'resource': 'orders', 'format': 'csv', 'filters': 'x', 'colour': 1})
+    assert submitted == []
+
+    server.submit_job('get_order_changes', {'limit': '10'})
+    assert submitted == [{'limit': 10}]
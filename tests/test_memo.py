@@ -0,0 +1,80 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import main
+
+
+class Tools:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, name, arguments):
+        self.calls.append(name)
+        if name == 'submit_job':
+            return SimpleNamespace(isError=False, content=[SimpleNamespace(text=json.dumps({'job_id': 'j1'}))])
+        return SimpleNamespace(isError=False, content=[SimpleNamespace(text=f'{name} #{len(self.calls)}')])
+
+
+def call(memo, tools, name, **arguments):
+    return asyncio.run(memo.call(tools, name, arguments)).content[0].text
+
+
+def test_repeated_read_is_a_hit():
+    memo, tools = main.ToolResultMemo(), Tools()
+    first = call(memo, tools, 'get_orders', status='processing')
+    assert call(memo, tools, 'get_orders', status='processing') == first
+    call(memo, tools, 'get_orders', status='completed')
+    assert tools.calls == ['get_orders', 'get_orders']
+    assert memo.report()['hits'] == 1 and memo.report()['misses'] == 2
+
+
+def test_write_invalidates_reads_of_its_resource():
+    memo, tools = main.ToolResultMemo(), Tools()
+    for name in ('get_order_notes', 'get_customer_360', 'get_low_stock', 'get_sales_report', 'get_coupons'):
+        call(memo, tools, name, id=1)
+    call(memo, tools, 'update_order', order_id=1)
+    tools.calls.clear()
+    for name in ('get_order_notes', 'get_customer_360', 'get_low_stock', 'get_sales_report', 'get_coupons'):
+        call(memo, tools, name, id=1)
+    assert tools.calls == ['get_order_notes', 'get_customer_360', 'get_sales_report']
+
+    call(memo, tools, 'generate_variations', product_id=5)
+    tools.calls.clear()
+    call(memo, tools, 'get_low_stock', id=1)
+    assert tools.calls == ['get_low_stock']
+
+
+def test_results_expire_after_ttl(monkeypatch):
+    memo, tools = main.ToolResultMemo(ttl=60), Tools()
+    now = [1000.0]
+    monkeypatch.setattr(main.time, 'monotonic', lambda: now[0])
+    call(memo, tools, 'get_products')
+    now[0] += 30
+    call(memo, tools, 'get_products')
+    now[0] += 61
+    call(memo, tools, 'get_products')
+    assert tools.calls == ['get_products', 'get_products']
+
+
+def test_job_writes_invalidate_when_the_job_is_polled():
+    memo, tools = main.ToolResultMemo(), Tools()
+    call(memo, tools, 'get_products')
+    call(memo, tools, 'submit_job', tool='import_records', arguments={'resource': 'products'})
+    call(memo, tools, 'get_products')
+    # The job has run in the meantime; polling it drops what was read since submitting
+    call(memo, tools, 'get_job_status', job_id='j1')
+    call(memo, tools, 'get_job_status', job_id='j1')
+    call(memo, tools, 'get_products')
+    assert tools.calls == ['get_products', 'submit_job', 'get_products', 'get_job_status',
+                           'get_job_status', 'get_products']
+
+
+def test_report_since_gives_the_change():
+    memo, tools = main.ToolResultMemo(), Tools()
+    call(memo, tools, 'get_products')
+    before = memo.report()
+    call(memo, tools, 'get_products')
+    turn = memo.report(since=before)
+    assert (turn['hits'], turn['misses'], turn['invalidations']) == (1, 0, 0)
+    assert memo.report()['misses'] == 1
@@ -0,0 +1,41 @@
+import pytest
+
+import server
+
+BASE_URL = 'https://feed.test/wp-json/wc/v3'
+
+
+@pytest.fixture
+def orders(monkeypatch):
+    store, requests = [], []
+
+    def fetch_pages(url, headers, params):
+        requests.append(params['modified_after'])
+        return [order for order in store if order['date_modified_gmt'] > params['modified_after']]
+
+    monkeypatch.setattr(server, 'get_woo_client', lambda *args: (BASE_URL, {}))
+    monkeypatch.setattr(server, '_fetch_pages', fetch_pages)
+    return store, requests
+
+
+def order(order_id, modified):
+    return {'id': order_id, 'status': 'processing', 'date_created_gmt': modified, 'date_modified_gmt': modified}
+
+
+def test_explicit_cursor_is_normalised_and_not_stored(orders):
+    store, requests = orders
+    store += [order(1, '2024-05-01T08:00:00'), order(2, '2024-05-02T09:00:00')]
+    result = server.get_order_changes(since_cursor='2024-05-02T10:30:00+02:00')
+    assert requests == ['2024-05-02T08:29:59']
+    assert [change['id'] for change in result['changes']] == [2]
+    assert server.load_state('order_cursors').get(BASE_URL) is None
+
+    assert server.get_order_changes(since_cursor='2024-05-01')['count'] == 2
+    server.get_order_changes()
+    assert BASE_URL in server.load_state('order_cursors')
+
+
+def test_malformed_cursor_is_rejected(orders):
+    with pytest.raises(Exception, match="Invalid date '2024-05-02 later'"):
+        server.get_order_changes(since_cursor='2024-05-02 later')
+    assert orders[1] == []
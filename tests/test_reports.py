@@ -0,0 +1,76 @@
+import pytest
+
+import server
+
+BASE_URL = 'https://shop.test/wp-json/wc/v3'
+
+
+class Response:
+    def __init__(self, data, headers=None):
+        self._data = data
+        self.headers = headers or {}
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.fixture
+def report_store(monkeypatch, tmp_path):
+    monkeypatch.setattr(server, 'REPORT_CACHE_DIR', str(tmp_path))
+    requests = []
+
+    def tenant_request(method, url, params=None, headers=None):
+        requests.append(params)
+        month = int(params['date_min'][5:7])
+        if url.endswith('reports/sales'):
+            return Response([{'total_sales': f'{month * 100}.00', 'net_sales': f'{month * 100}.00',
+                              'average_sales': '999.00', 'total_orders': month,
+                              'totals': {params['date_min']: {'sales': f'{month * 100}.00', 'orders': month}}}])
+        return Response([{'product_id': 7, 'name': 'Hat', 'quantity': month},
+                         {'product_id': month + 10, 'name': 'Other', 'quantity': 1}])
+
+    monkeypatch.setattr(server, 'tenant_request', tenant_request)
+    return requests
+
+
+def test_report_periods_cover_range_once():
+    assert server._report_periods('2024-01-30', '2024-03-02', 'month') == [
+        ('2024-01-30', '2024-01-31'), ('2024-02-01', '2024-02-29'), ('2024-03-01', '2024-03-02')]
+    assert server._report_periods('2024-01-01', '2024-01-10', 'week') == [
+        ('2024-01-01', '2024-01-07'), ('2024-01-08', '2024-01-10')]
+    assert server._report_periods('2024-01-01', '2024-01-01', 'day') == [('2024-01-01', '2024-01-01')]
+
+
+def test_split_sales_report_sums_and_recomputes_average(report_store):
+    params = {'period': 'month', 'date_min': '2024-01-01', 'date_max': '2024-03-31'}
+    merged = server.split_report(BASE_URL, {}, 'reports/sales', params, 'month')
+    summary = merged[0]
+    assert summary['total_sales'] == '600.00'
+    assert summary['total_orders'] == 6
+    assert summary['average_sales'] == f'{600 / 91:.2f}'
+    assert sorted(summary['totals']) == ['2024-01-01', '2024-02-01', '2024-03-01']
+    assert all('period' not in params for params in report_store)
+
+
+def test_split_top_sellers_merges_rows_by_product(report_store):
+    params = {'date_min': '2024-01-01', 'date_max': '2024-02-29'}
+    rows = {row['product_id']: row for row in server.split_report(BASE_URL, {}, 'reports/top_sellers', params, 'month')}
+    assert rows[7]['quantity'] == 3
+    assert sorted(rows) == [7, 11, 12]
+
+
+def test_closed_periods_are_cached(report_store):
+    params = {'date_min': '2024-01-01', 'date_max': '2024-02-29'}
+    server.split_report(BASE_URL, {}, 'reports/sales', dict(params), 'month')
+    server.split_report(BASE_URL, {}, 'reports/sales', dict(params), 'month')
+    assert len(report_store) == 2
+
+
+def test_totals_reports_cannot_be_split(report_store):
+    params = {'date_min': '2024-01-01', 'date_max': '2024-02-29'}
+    with pytest.raises(Exception, match='only supported'):
+        server.split_report(BASE_URL, {}, 'reports/coupons/totals', params, 'month')
+    assert report_store == []
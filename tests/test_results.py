@@ -0,0 +1,45 @@
+import os
+import time
+
+import server
+
+RECORDS = [
+    {'id': 1, 'total': '150.00', 'billing': {'company': 'Smith and Sons'}, 'note': 'size > 10'},
+    {'id': 2, 'total': '90.00', 'billing': {'company': 'Smith'}, 'note': ''},
+]
+
+
+def matching(expr):
+    clauses = server._parse_filter(expr)
+    return [record['id'] for record in RECORDS if server._matches(record, clauses)]
+
+
+def test_quoted_values_may_contain_and_and_operators():
+    assert matching("billing.company == 'Smith and Sons'") == [1]
+    assert matching('billing.company == "Smith and Sons" and total > 100') == [1]
+    assert matching("billing.company == Smith and total < 100") == [2]
+    assert matching("note contains 'size > 1'") == [1]
+    assert matching("note contains size > 1") == [1]
+
+
+def test_spill_directories_are_per_process_and_swept(tmp_path):
+    old = tmp_path / '123-deadbeef'
+    old.mkdir()
+    (old / 'abc.json').write_text('[]')
+    legacy = tmp_path / 'abcdef123456.json'
+    legacy.write_text('[]')
+    recent = tmp_path / '456-cafebabe'
+    recent.mkdir()
+    for path in (old, legacy):
+        os.utime(path, (time.time() - 7200, time.time() - 7200))
+
+    store = server.ResultStore(str(tmp_path), memory_bytes=10, max_handles=10)
+    store.sweep(3600)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['456-cafebabe']
+
+    first = store.put(list(range(100)))
+    store.put(list(range(100)))  # spills the first result
+    assert os.listdir(store.directory) == [f'{first}.json']
+    assert store.get(first) == list(range(100))
+    store.close()
+    assert not os.path.exists(store.directory)
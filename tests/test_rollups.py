@@ -0,0 +1,62 @@
+import server
+
+BASE_URL = 'https://shop.test/wp-json/wc/v3'
+
+
+def order(order_id, day, status='completed', total='100.00', refunds=()):
+    return {'id': order_id, 'status': status, 'date_created': f'{day}T10:00:00', 'total': total,
+            'total_tax': '0.00', 'shipping_total': '0.00', 'discount_total': '0.00',
+            'line_items': [{'sku': 'HAT', 'quantity': 1, 'total': total}], 'coupon_lines': [],
+            'refunds': [{'id': refund_id, 'total': f'-{amount}'} for refund_id, amount, _ in refunds]}
+
+
+def totals(rollups, day):
+    return rollups.report(day, day)['totals']
+
+
+def test_changes_replace_previous_contributions(monkeypatch, tmp_path):
+    refunds = {1: [(9, '10.00', '2024-05-03')]}
+    store = [order(1, '2024-05-01', refunds=refunds[1]), order(2, '2024-05-01', 'processing', '50.00'),
+             order(3, '2024-05-02', 'cancelled'), order(4, '2024-05-02', total='30.00')]
+    changed, trashed, fetched = [], [], []
+
+    def fetch_pages(url, headers, params):
+        if url.endswith('/refunds'):
+            order_id = int(url.split('/')[-2])
+            fetched.append(order_id)
+            return [{'id': refund_id, 'amount': amount, 'date_created': f'{day}T12:00:00'}
+                    for refund_id, amount, day in refunds[order_id]]
+        return trashed if params['status'] == 'trash' else changed
+
+    monkeypatch.setattr(server, 'iter_scan', lambda base_url, headers, resource, filters: iter([store]))
+    monkeypatch.setattr(server, '_fetch_pages', fetch_pages)
+    rollups = server.DailyRollups(BASE_URL, {}, str(tmp_path))
+    rollups.refresh()
+    assert totals(rollups, '2024-05-01')['revenue'] == 150
+    assert totals(rollups, '2024-05-01')['refunds'] == 0
+    assert totals(rollups, '2024-05-03')['refunds'] == 10
+    assert totals(rollups, '2024-05-02')['orders'] == 1
+
+    refunds[1].append((11, '5.00', '2024-05-04'))
+    changed[:] = [order(1, '2024-05-01', total='120.00', refunds=refunds[1]),
+                  order(2, '2024-05-01', 'cancelled', '50.00')]
+    trashed[:] = [order(4, '2024-05-02', 'trash', '30.00')]
+    fetched.clear()
+    assert rollups.refresh() == 3
+    assert fetched == [1]
+    day = totals(rollups, '2024-05-01')
+    assert (day['revenue'], day['orders'], day['items']) == (120, 1, 1)
+    assert totals(rollups, '2024-05-02')['orders'] == 0
+    assert totals(rollups, '2024-05-03')['refunds'] == 10
+    assert totals(rollups, '2024-05-04')['refunds'] == 5
+    assert rollups.report('2024-05-01', '2024-05-04')['top_skus'] == [{'sku': 'HAT', 'units': 1.0, 'revenue': 120.0}]
+
+    # Re-reading the same orders changes nothing
+    assert rollups.refresh() == 0
+
+    reloaded = server.DailyRollups(BASE_URL, {}, str(tmp_path))
+    assert reloaded.report('2024-05-01', '2024-05-04') == rollups.report('2024-05-01', '2024-05-04')
+    reloaded.remove_order(1)
+    assert reloaded.report('2024-05-01', '2024-05-04')['totals']['revenue'] == 0
+    assert reloaded.report('2024-05-01', '2024-05-04')['totals']['refunds'] == 0
+    assert reloaded.report('2024-05-01', '2024-05-04')['top_skus'] == []
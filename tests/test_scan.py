@@ -0,0 +1,133 @@
+import calendar
+import time
+
+import pytest
+
+import server
+
+BASE_URL = 'https://shop.test/wp-json/wc/v3'
+T0 = calendar.timegm((2024, 1, 1, 0, 0, 0))
+
+
+def gmt(seconds):
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(seconds))
+
+
+class FakeStore:
+    """Serves _get_page from a list of records, honouring the filters the scan uses."""
+
+    def __init__(self, records):
+        self.records = records
+        self.requests = []
+
+    def get_page(self, url, headers, params):
+        self.requests.append(params)
+        rows = self.records
+        if 'include' in params:
+            ids = {int(i) for i in params['include'].split(',')}
+            rows = [r for r in rows if r['id'] in ids]
+        if 'after' in params:
+            after = server._parse_gmt(params['after'])
+            rows = [r for r in rows if r['date_created_gmt'] and server._parse_gmt(r['date_created_gmt']) > after]
+        if 'before' in params:
+            before = server._parse_gmt(params['before'])
+            rows = [r for r in rows if r['date_created_gmt'] and server._parse_gmt(r['date_created_gmt']) < before]
+        if params.get('orderby') == 'id':
+            rows = sorted(rows, key=lambda r: r['id'])
+        else:
+            rows = sorted(rows, key=lambda r: (r['date_created_gmt'] or '', r['id']))
+        if params.get('order') == 'desc':
+            rows = rows[::-1]
+        per_page, page = params.get('per_page', 10), params.get('page', 1)
+        return rows[(page - 1) * per_page:page * per_page], len(rows)
+
+
+@pytest.fixture
+def store(monkeypatch):
+    def install(records):
+        fake = FakeStore(records)
+        monkeypatch.setattr(server, '_get_page', fake.get_page)
+        return fake
+    return install
+
+
+def dated(ids_and_seconds):
+    return [{'id': i, 'date_created_gmt': gmt(ts) if ts is not None else None} for i, ts in ids_and_seconds]
+
+
+def scan(resource, filters=None):
+    return [record for batch in server.iter_scan(BASE_URL, {}, resource, filters, workers=2) for record in batch]
+
+
+def test_dense_first_second_is_read_alone(store, monkeypatch):
+    monkeypatch.setattr(server, 'SCAN_MAX_WINDOW_ROWS', 400)
+    records = dated([(i, T0) for i in range(1, 1001)] + [(1000 + i, T0 + 1 + i) for i in range(1, 301)])
+    fake = store(records)
+
+    kept, windows = server._scan_date_window(f'{BASE_URL}/orders', {}, {}, T0, T0 + 1000)
+    assert kept == []
+    assert windows == [(T0, T0 + 1), (T0 + 1, T0 + 1000)]
+
+    rows = scan('orders')
+    assert sorted(r['id'] for r in rows) == [r['id'] for r in records]
+    for params in fake.requests:
+        if (params.get('page', 1) - 1) * params['per_page'] >= server.SCAN_MAX_WINDOW_ROWS:
+            # Only the one-second slice may be paged past a normal window
+            assert server._parse_gmt(params['before']) - server._parse_gmt(params['after']) == 2
+
+
+def test_empty_window(store):
+    store(dated([(1, T0)]))
+    assert server._scan_date_window(f'{BASE_URL}/orders', {}, {}, T0 + 10, T0 + 20) == ([], [])
+    assert server._scan_id_window(f'{BASE_URL}/customers', {}, {}, 50, 60) == []
+
+
+def test_window_boundaries_are_half_open(store):
+    store(dated([(1, T0 - 1), (2, T0), (3, T0 + 5), (4, T0 + 10)]))
+    kept, windows = server._scan_date_window(f'{BASE_URL}/orders', {}, {}, T0, T0 + 10)
+    assert [r['id'] for r in kept] == [2, 3]
+    assert windows == []
+
+
+def test_rows_split_across_windows_are_returned_once(store, monkeypatch):
+    monkeypatch.setattr(server, 'SCAN_MAX_WINDOW_ROWS', 150)
+    monkeypatch.setattr(server, 'SCAN_TARGET_ROWS', 50)
+    records = dated([(i, T0 + i // 3) for i in range(1, 2001)])
+    store(records)
+    rows = scan('orders')
+    assert sorted(r['id'] for r in rows) == list(range(1, 2001))
+
+
+def test_id_windows_cover_sparse_ids(store):
+    records = [{'id': i, 'date_created_gmt': gmt(T0)} for i in range(1, 3000, 7)]
+    store(records)
+    assert [r['id'] for r in server._scan_id_window(f'{BASE_URL}/customers', {}, {}, 1, 30)] == [1, 8, 15, 22, 29]
+    rows = scan('customers')
+    assert sorted(r['id'] for r in rows) == [r['id'] for r in records]
+
+
+def test_date_only_filters_and_undated_records(store):
+    day = 86400
+    fake = store(dated([(1, None), (2, T0), (3, T0 + day), (4, T0 + 2 * day)]))
+    rows = scan('orders', {'after': '2024-01-01', 'before': '2024-01-03'})
+    assert sorted(r['id'] for r in rows) == [3]
+    assert all(len(p['after']) == 19 for p in fake.requests if 'after' in p)
+
+
+def test_parse_gmt():
+    assert server._parse_gmt('2024-01-01') == T0
+    assert server._parse_gmt('2024-01-01T00:00:05') == T0 + 5
+    assert server._parse_gmt(None) is None
+    with pytest.raises(Exception, match='Invalid date'):
+        server._parse_gmt('01/02/2024')
+
+
+def test_order_subresources_accept_date_only_filters(store, monkeypatch):
+    store([dict(r, refunds=[{'id': r['id'] * 10}]) for r in dated([(1, T0), (2, T0 + 86400)])])
+    monkeypatch.setattr(server, 'woo_get', lambda url, headers, params=None: [{'id': int(url.split('/')[-2]) * 10}])
+    result = server.get_order_subresources('refunds', after='2024-01-01', site_url=BASE_URL.split('/wp-json')[0],
+                                           consumer_key='ck', consumer_secret='cs')
+    assert result['count'] == 1
+    with pytest.raises(Exception, match='Invalid date'):
+        server.get_order_subresources('refunds', after='May 1st', site_url=BASE_URL.split('/wp-json')[0],
+                                      consumer_key='ck', consumer_secret='cs')
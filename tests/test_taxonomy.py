@@ -0,0 +1,79 @@
+import pytest
+
+import server
+
+BASE_URL = 'https://shop.test/wp-json/wc/v3'
+
+
+class Response:
+    def __init__(self, data):
+        self._data = data
+        self.headers = {}
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.fixture
+def categories(monkeypatch):
+    terms = [
+        {'id': 1, 'name': 'Men', 'slug': 'men', 'parent': 0},
+        {'id': 2, 'name': 'Women', 'slug': 'women', 'parent': 0},
+        {'id': 3, 'name': 'Shoes', 'slug': 'men-shoes', 'parent': 1},
+        {'id': 4, 'name': 'Shoes', 'slug': 'women-shoes', 'parent': 2},
+        {'id': 5, 'name': 'Bags &amp; Belts', 'slug': 'bags-belts', 'parent': 0},
+        {'id': 6, 'name': '2024', 'slug': 'collection-2024', 'parent': 0},
+    ]
+    loads = []
+
+    def tenant_request(method, url, params=None, headers=None):
+        if params['page'] > 1:
+            return Response([])
+        loads.append(url)
+        return Response(list(terms))
+
+    monkeypatch.setattr(server, 'tenant_request', tenant_request)
+    return terms, loads
+
+
+def test_names_are_unescaped_and_digit_strings_are_names(categories):
+    index = server.TaxonomyIndex(BASE_URL, {})
+    assert index.lookup('categories', 'bags & belts')['id'] == 5
+    assert index.lookup('categories', 'Bags &amp; Belts')['name'] == 'Bags & Belts'
+    assert index.lookup('categories', '2024')['id'] == 6
+    assert index.lookup('categories', 2)['name'] == 'Women'
+
+
+def test_shared_names_need_a_path(categories):
+    index = server.TaxonomyIndex(BASE_URL, {})
+    with pytest.raises(Exception, match=r"Men > Shoes.*Women > Shoes"):
+        index.lookup('categories', 'Shoes')
+    assert index.lookup('categories', 'Women > Shoes')['id'] == 4
+    assert index.lookup('categories', 'men>shoes')['id'] == 3
+    assert index.lookup('categories', 'women-shoes')['id'] == 4
+
+
+def test_miss_reloads_once_when_old(categories, monkeypatch):
+    terms, loads = categories
+    index = server.TaxonomyIndex(BASE_URL, {})
+    assert index.lookup('categories', 'Hats') is None
+    assert len(loads) == 1  # freshly loaded: no reload on a miss
+    terms.append({'id': 7, 'name': 'Hats', 'slug': 'hats', 'parent': 0})
+    monkeypatch.setattr(server, 'TAXONOMY_MISS_RELOAD', -1)
+    assert index.lookup('categories', 'Hats')['id'] == 7
+    assert len(loads) == 2
+
+
+def test_old_snapshot_is_not_restored(categories):
+    terms, loads = categories
+    index = server.TaxonomyIndex(BASE_URL, {})
+    index.lookup('categories', 'Men')
+    state = index.snapshot()
+    state['categories']['loaded_at'] -= server.TAXONOMY_MAX_AGE + 1
+    restored = server.TaxonomyIndex(BASE_URL, {})
+    restored.restore(state)
+    restored.lookup('categories', 'Men')
+    assert len(loads) == 2
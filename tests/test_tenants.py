@@ -0,0 +1,53 @@
+import json
+import os
+
+import pytest
+
+import server
+
+
+def write(path, config):
+    path.write_text(json.dumps(config))
+    # Make the change visible to the mtime check even within the same second
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 1))
+
+
+def test_unknown_keys_give_a_clear_error(tmp_path):
+    path = tmp_path / 'tenants.json'
+    write(path, {'acme': {'site_url': 'https://acme.test', 'consumer_key': 'ck', 'consumer_secret': 'cs',
+                          'rate_limt': 5},
+                 'beta': {'site_url': 'https://beta.test', 'consumer_key': 'ck', 'consumer_secret': 'cs'}})
+    registry = server.TenantRegistry(str(path))
+    with pytest.raises(Exception, match=r"Tenant 'acme'.*unknown keys \['rate_limt'\]"):
+        registry.get('acme')
+    assert registry.get('beta').site_url == 'https://beta.test'
+
+
+def test_rebuilt_tenant_keeps_other_tenants_routes(tmp_path):
+    path = tmp_path / 'tenants.json'
+    entry = {'site_url': 'https://shop.test', 'consumer_key': 'ck', 'consumer_secret': 'cs'}
+    write(path, {'acme': entry})
+    registry = server.TenantRegistry(str(path))
+    direct = registry.resolve('https://shop.test', 'ck_other', 'cs_other')
+    registered = registry.get('acme')
+    assert registry.for_url('https://shop.test/wp-json/wc/v3/orders') is direct
+
+    write(path, {'acme': {**entry, 'rate_limit': 1}})
+    registry.ids()
+    assert registry.for_url('https://shop.test/wp-json/wc/v3/orders') is direct
+    assert registry.get('acme') is not registered
+
+
+def test_server_credentials_are_left_out_of_tool_signatures(monkeypatch):
+    monkeypatch.setattr(server, 'server_credential_params', lambda: {'consumer_key', 'consumer_secret'})
+    app = server.WordPressMCP('test')
+
+    @app.tool()
+    def lookup(order_id: int, site_url: str = "", consumer_key: str = "", consumer_secret: str = "") -> dict:
+        return {'order_id': order_id, 'consumer_key': consumer_key}
+
+    tool = app._tool_manager.get_tool('lookup')
+    assert sorted(tool.parameters['properties']) == ['order_id', 'site_url']
+    assert sorted(tool.fn_metadata.arg_model.model_fields) == ['order_id', 'site_url']
+    assert tool.fn(order_id=3) == {'order_id': 3, 'consumer_key': ''}
@@ -0,0 +1,92 @@
+import pytest
+
+import server
+
+BASE_URL = 'https://shop.test/wp-json/wc/v3'
+
+
+class Response:
+    def __init__(self, data):
+        self._data = data
+        self.headers = {}
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        pass
+
+
+class NoAttributes:
+    def lookup(self, kind, name):
+        return None
+
+
+@pytest.fixture
+def store(monkeypatch):
+    product = {'id': 5, 'type': 'variable', 'sku': 'TEE', 'attributes': []}
+    writes = []
+
+    def tenant_request(method, url, params=None, headers=None, json=None):
+        if method != 'GET':
+            writes.append((method, url))
+            return Response({})
+        return Response(product if url.endswith('/products/5') else [])
+
+    monkeypatch.setattr(server, 'get_woo_client', lambda *args: (BASE_URL, {}))
+    monkeypatch.setattr(server, 'get_taxonomy_index', lambda *args: NoAttributes())
+    monkeypatch.setattr(server, 'tenant_request', tenant_request)
+    monkeypatch.setattr(server, 'woo_send', lambda method, url, *args, **kwargs: writes.append((method, url)))
+    return product, writes
+
+
+@pytest.mark.parametrize('arguments, message', [
+    ({'regular_price': 'ten'}, 'regular_price must be a number'),
+    ({'regular_price': '10', 'price_adjustments': {'Size': {'L': 'two'}}}, "price_adjustments['Size']['L']"),
+    ({'sku_template': '{parent_sku}-{Colour}'}, "unknown placeholders ['Colour']"),
+    ({'sku_template': '{parent_sku'}, 'Invalid sku_template'),
+])
+def test_bad_arguments_fail_before_any_write(store, arguments, message):
+    product, writes = store
+    for dry_run in (True, False):
+        with pytest.raises(Exception, match=message.replace('[', r'\[').replace(']', r'\]')):
+            server.generate_variations(5, {'Size': ['S', 'L']}, dry_run=dry_run, **arguments)
+    assert writes == []
+
+
+def test_parent_must_be_variable(store):
+    product, writes = store
+    product['type'] = 'simple'
+    with pytest.raises(Exception, match="type 'simple'"):
+        server.generate_variations(5, {'Size': ['S', 'L']}, dry_run=True)
+    assert writes == []
+
+
+def test_dry_run_builds_prices_and_skus(store):
+    result = server.generate_variations(5, {'Size': ['S', 'L']}, regular_price='10', sku_template='{parent_sku}-{Size}',
+                                        price_adjustments={'Size': {'L': '2.50'}}, dry_run=True)
+    assert result['created'] == 2
+    assert [(v['sku'], v['regular_price']) for v in result['sample']] == [('TEE-S', '10.00'), ('TEE-L', '12.50')]
+
+
+def test_failed_batch_is_reported_and_cache_still_invalidated(store, monkeypatch):
+    product, writes = store
+    invalidated = []
+
+    class Failing(Response):
+        def raise_for_status(self):
+            raise server.requests.HTTPError('500 Server Error')
+
+    def tenant_request(method, url, params=None, headers=None, json=None):
+        if method == 'GET':
+            return Response(product if url.endswith('/products/5') else [])
+        if json['create'][0]['attributes'][0]['option'] == 'S':
+            return Failing({})
+        return Response({'create': [{'id': 60 + i} for i in range(len(json['create']))]})
+
+    monkeypatch.setattr(server, 'VARIATION_BATCH_SIZE', 1)
+    monkeypatch.setattr(server, 'tenant_request', tenant_request)
+    monkeypatch.setattr(server.entity_cache, 'invalidate', lambda base_url, path: invalidated.append(path))
+    result = server.generate_variations(5, {'Size': ['S', 'L']}, regular_price='10')
+    assert result['errors'] == [{'action': 'create', 'id': None, 'error': 'Batch request failed: 500 Server Error'}]
+    assert invalidated == ['products/5']